@@ -0,0 +1,71 @@
+"""
+EU ETS product benchmarks and CBAM factors, read from reference/cbamBenchmarks.js.
+
+The JS module is where the benchmark values from EU IR 2025/2620 Annex I are
+maintained.  This module parses its two object literals (BENCHMARKS and
+CBAM_FACTOR) so the Python pipeline uses exactly the same numbers without
+keeping a second copy.
+
+Benchmark keys follow cbamBenchmarks.js: the CN code at its regulation digit
+level (4, 6 or 8 digits), optionally suffixed with ":<route>".
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+ROOT          = Path(__file__).resolve().parents[1]
+BENCHMARKS_JS = ROOT / "reference" / "cbamBenchmarks.js"
+
+_OBJECT_RE = r"export const {name}\s*=\s*\{{(.*?)\n\}};"
+_ENTRY_RE  = re.compile(r'^\s*"?([\w:]+)"?\s*:\s*([0-9.]+)\s*,', re.MULTILINE)
+
+
+def _parse_object(name: str, path: Path) -> dict[str, float]:
+    text  = path.read_text(encoding="utf-8")
+    match = re.search(_OBJECT_RE.format(name=name), text, re.DOTALL)
+    if match is None:
+        raise ValueError(f"{name} not found in {path}")
+    return {k: float(v) for k, v in _ENTRY_RE.findall(match.group(1))}
+
+
+@lru_cache(maxsize=None)
+def load_benchmarks(path: Path = BENCHMARKS_JS) -> dict[str, float]:
+    """Return BENCHMARKS as {key: tCO2e per tonne of product}."""
+    return _parse_object("BENCHMARKS", path)
+
+
+@lru_cache(maxsize=None)
+def load_cbam_factor(path: Path = BENCHMARKS_JS) -> dict[int, float]:
+    """Return CBAM_FACTOR as {year: share of benchmark still freely allocated}."""
+    return {int(y): v for y, v in _parse_object("CBAM_FACTOR", path).items()}
+
+
+@lru_cache(maxsize=None)
+def _by_code(path: Path = BENCHMARKS_JS) -> dict[str, float]:
+    # One value per bare code.  Where a code has several routes (e.g. grey and
+    # white cement clinker, routes A/B) the alphabetically first route is used,
+    # which in Annex I is the main production route.
+    bm = load_benchmarks(path)
+    out: dict[str, float] = {}
+    for key in sorted(bm):
+        out.setdefault(key.split(":")[0], bm[key])
+    return out
+
+
+def benchmark_for_code(code: str, path: Path = BENCHMARKS_JS) -> float | None:
+    """Benchmark for a CN/HS code at any digit level, or None if out of scope.
+
+    Tries the code itself, then its shorter prefixes (a CN8 code under a
+    4-digit heading entry), then the mean of the longer benchmark keys under
+    a short code (e.g. HS 7303 → 730300, HS6 310210 → the four urea CN8s).
+    """
+    table = _by_code(path)
+    code  = str(code).strip().replace(" ", "")
+    for n in range(len(code), 3, -1):
+        if code[:n] in table:
+            return table[code[:n]]
+    longer = [k for k in table if k.startswith(code)]
+    return sum(table[k] for k in longer) / len(longer) if longer else None
@@ -2,33 +2,69 @@
 Build docs/data/trade_data.json from Census Bureau + Eurostat Comext APIs.
 
 Annual EU27 US exports (ae, aew) come from the existing CSV produced by
-fetch_us_trade_raw.py.  World totals (awx, awm) and monthly series (me, mew,
-mw) come from the Census Bureau API.  EU imports from US come from Comext.
+fetch_us_trade_raw.py.  World totals (awx, awm) and monthly series come from
+the Census Bureau API: exports me, mew, mw and imports mi, miw, mwm, from two
+year-to-date walks that run in parallel.  EU27 imports come from Comext, keyed by
+partner in RAWEU ({partner: {sector: {YYYYMM: [eur, tonnes]}}}); the US by
+default, --partners US,CA,CN,… pulls more in the same requests.
+
+Values are int USD / EUR and weights int kg from parse to output (units.py);
+tonnes are derived once, when a series point is written.
 
 Existing trade_data.json is loaded as a baseline; fields are only overwritten
 when new data is non-empty, so an API failure never wipes good old data.
+Every build is recorded in the vintage store (vintages.py), so revisions to
+past months remain visible after they are overwritten.
+
+The same monthly responses also yield a partner × HS6 dataset, stored one
+partition per month in data/partitions/us_partner/{Export,Import}/ (partitions.py),
+EU27 aggregate rows included.  Partitions hold signed point-in-time diffs, so
+a month's series can be rebuilt from its partition exactly: the walk refetches
+only the last REFETCH_YEARS calendar years (Census revises the prior year) and
+reads older years back from the partitions when all twelve months are stored.
+
+Before writing, every RAW / RAWEU series goes through the data-quality gate
+(quality.py).  Hard errors (a month missing from every series, a Census
+response without the "EUROPEAN UNION" row, non-finite values) abort the build
+and leave the published file untouched; --allow-errors publishes anyway.
+
+After writing, the KPI and sector cards of the default view are rendered into
+docs/index.html as static HTML/SVG (prerender.py), so the page paints before
+its JS has fetched the JSON.
+
+With --comext-bulk, RAWEU is read from the eu_partner partitions written by
+comext_bulk.py (Comext bulk archives) instead of the Comext API.
+
+--plan lists the Census and Comext requests a build would send, without
+sending them (fetch_plan.py).
 """
 from __future__ import annotations
 
-import json, os, time
-from datetime import date
+import argparse, json, sys, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
 from io import StringIO
 from pathlib import Path
-from typing import Optional
 
 import pandas as pd
 import requests
-from dotenv import load_dotenv
+
+import comext_bulk
+import concordance
+import config
+import fetch_plan
+import partitions
+import partners
+import prerender
+import quality
+import units
+import vintages
+from sectors import COMEXT_SECTORS, RAW_KEYS, hs6_to_key, is_cbam
 
 ROOT    = Path(__file__).resolve().parents[1]
 OUT     = ROOT / "docs" / "data" / "trade_data.json"
 EU27_CSV = ROOT / "data" / "raw" / "us_eu27_trade_raw.csv"
 
-load_dotenv(ROOT / ".env")
-CENSUS_KEY = os.getenv("CENSUS_API_KEY", "")
-if not CENSUS_KEY:
-    raise RuntimeError("CENSUS_API_KEY not found — add it to the project .env file")
-
 EXPORT_URL  = "https://api.census.gov/data/timeseries/intltrade/exports/hs"
 IMPORT_URL  = "https://api.census.gov/data/timeseries/intltrade/imports/hs"
 COMEXT_BASE = "https://ec.europa.eu/eurostat/api/comext/dissemination/sdmx/2.1/data/DS-045409"
@@ -36,123 +72,17 @@ COMEXT_BASE = "https://ec.europa.eu/eurostat/api/comext/dissemination/sdmx/2.1/d
 START_YEAR   = 2019
 CURRENT_YEAR = date.today().year
 MONTHLY_FROM = (2024, 1)
-
-# ---------------------------------------------------------------------------
-# CBAM sector definitions — kept in sync with fetch_us_trade_raw.py
-# ---------------------------------------------------------------------------
-SECTOR_HEADINGS: dict[str, set[str]] = {
-    "iron_steel_72": {
-        "260112",
-        "7201", "7203", "7205",
-        "7208", "7209", "7210",
-        "7212", "7213", "7215", "7216", "7221",
-        "720211", "720241", "720260",
-        "720610",
-        "721113",
-        "721420",
-        "721710", "721720",
-        "721810", "721911", "721931",
-        "722300",
-        "722410", "722511", "722530", "722550",
-    },
-    "iron_steel_73": {
-        "7301", "7302",
-        "7305", "7308", "7309", "7310",
-        "730300",
-        "730419", "730439",
-        "730619", "730630",
-        "730721", "730791",
-        "731100",
-        "731815", "731816",
-        "731822", "731823",
-        "732690",
-    },
-    "aluminum_76": {
-        "7601", "7603",
-        "7605", "7606", "7607", "7608",
-        "7612", "7614",
-        "760410", "760421", "760429",
-        "760900",
-        "761010", "761100",
-        "761300",
-        "761610", "761691", "761699",
-    },
-    "cement_2523": {
-        "250700",
-        "252310", "252321", "252329",
-        "252330", "252390",
-    },
-    "hydrogen_2804": {
-        "280410",
-    },
-    "fertilizers": {
-        "280800",
-        "281410", "281420",
-        "283421",
-        "310210",
-        "310221", "310229",
-        "310230",
-        "310240",
-        "310250", "310260",
-        "310280", "310290",
-        "310510", "310520",
-        "310530", "310540",
-        "310551", "310559",
-        "310590",
-    },
-}
-
-HS6_EXACT: set[str]    = {c for codes in SECTOR_HEADINGS.values() for c in codes if len(c) == 6}
-HS4_PREFIXES: set[str] = {c for codes in SECTOR_HEADINGS.values() for c in codes if len(c) == 4}
-
-def _is_cbam(hs6: str) -> bool:
-    return hs6 in HS6_EXACT or hs6[:4] in HS4_PREFIXES
-
-def hs6_to_key(hs6: str) -> Optional[str]:
-    if hs6 == "260112" or hs6.startswith("72"): return "72"
-    if hs6.startswith("73"):                     return "73"
-    if hs6.startswith("76"):                     return "76"
-    if hs6.startswith("2523") or hs6.startswith("2507"): return "2523"
-    if hs6 == "280410":                          return "280410"
-    if hs6.startswith("2814"):                   return "2814"
-    if hs6.startswith("31"):                     return "31"
-    return None
-
-# ---------------------------------------------------------------------------
-# Aggregate-country detection (mirrors fetch_us_trade_raw.py)
-# ---------------------------------------------------------------------------
-_AGG_MARKERS = {
-    "OECD","APEC","USMCA","NAFTA","NATO","EUROPEAN UNION","G20","G7","OPEC","ASEAN",
-    "TOTAL","WORLD","REST OF WORLD","LATIN AMERICAN","PACIFIC RIM","EURO AREA",
-    "CAFTA","LAFTA","AND OCEANIA",
-}
-_AGG_EXACT = {
-    "AFRICA","NORTH AFRICA","SUB-SAHARAN AFRICA",
-    "ASIA","EAST ASIA","SOUTH ASIA","SOUTHEAST ASIA","CENTRAL ASIA",
-    "EUROPE","AMERICAS","NORTH AMERICA","SOUTH AMERICA","CENTRAL AMERICA",
-    "LATIN AMERICA","LATIN AMERICA AND CARIBBEAN","CARIBBEAN","OCEANIA","PACIFIC",
-    "MIDDLE EAST","NEAR EAST",
-}
-
-def _is_eu27(name: str) -> bool:
-    return "EUROPEAN UNION" in name.upper()
-
-def _is_aggregate(name: str) -> bool:
-    n = name.upper()
-    return n in _AGG_EXACT or any(m in n for m in _AGG_MARKERS)
-
-def _to_float(v) -> float:
-    if v is None: return 0.0
-    try: return float(v)
-    except (ValueError, TypeError): return 0.0
+REFETCH_YEARS = 2       # current + previous year; older stored years come from us_partner
 
 # ---------------------------------------------------------------------------
 # Generic Census HTTP helper
 # ---------------------------------------------------------------------------
-def _census_fetch(url: str, params: dict, label: str) -> list:
+def _census_fetch(url: str, params: dict, label: str, kind: str = "annual_hs6") -> list:
     for attempt in range(4):
         try:
-            r = requests.get(url, params=params, timeout=180)
+            with fetch_plan.timed("census", kind, label) as t:
+                r = requests.get(url, params=params, timeout=180)
+                t.nbytes = len(r.content) if r.ok else 0
         except requests.RequestException as exc:
             print(f"\n    network error ({label}, attempt {attempt+1}): {exc}")
             time.sleep(2 ** attempt)
@@ -182,32 +112,28 @@ def _census_fetch(url: str, params: dict, label: str) -> list:
 # ---------------------------------------------------------------------------
 def load_annual_from_csv() -> tuple[dict, dict]:
     """Return (ae, aew) dicts: ae[key][year]=USD, aew[key][year]=tonnes."""
-    ae_raw:  dict[str, dict] = {k: {} for k in RAW_KEYS}
-    aew_raw: dict[str, dict] = {k: {} for k in RAW_KEYS}
-
     if not EU27_CSV.exists():
         print(f"  WARNING: {EU27_CSV} not found — annual EU27 data will be empty")
-        return ae_raw, aew_raw
+        return {k: {} for k in RAW_KEYS}, {k: {} for k in RAW_KEYS}
 
     df = pd.read_csv(EU27_CSV, dtype=str)
-    df["primaryValue"] = pd.to_numeric(df["primaryValue"], errors="coerce").fillna(0)
-    df["quantity_kg"]  = pd.to_numeric(df["quantity_kg"],  errors="coerce").fillna(0)
-
-    exports = df[df["flow"].str.strip().str.lower() == "export"]
-    for _, row in exports.iterrows():
-        hs6 = str(row.get("hs6", "")).strip()
-        key = hs6_to_key(hs6)
-        if key is None:
-            continue
-        year = str(row.get("period", "")).strip()[:4]
-        if not year.isdigit():
-            continue
-        ae_raw[key][year]  = ae_raw[key].get(year,  0.0) + float(row["primaryValue"])
-        aew_raw[key][year] = aew_raw[key].get(year, 0.0) + float(row["quantity_kg"])
-
-    # Round at the end (not per-row) to avoid accumulated rounding error
-    ae:  dict[str, dict] = {k: {y: round(v)          for y, v in ae_raw[k].items()}  for k in RAW_KEYS}
-    aew: dict[str, dict] = {k: {y: round(v/1000, 1)  for y, v in aew_raw[k].items()} for k in RAW_KEYS}
+    df = df[df["flow"].str.strip().str.lower() == "export"]
+    hs6  = df["hs6"].fillna("").str.strip()
+    keys = {c: hs6_to_key(c) for c in hs6.unique()}
+    df = pd.DataFrame({
+        "key":  hs6.map(keys),
+        "year": df["period"].fillna("").str.strip().str[:4],
+        "usd":  units.whole(df["primaryValue"]),
+        "kg":   units.whole(df["quantity_kg"]),
+    })
+    df = df[df["key"].notna() & df["year"].str.isdigit()]
+    totals = df.groupby(["key", "year"])[["usd", "kg"]].sum()
+
+    ae:  dict[str, dict] = {k: {} for k in RAW_KEYS}
+    aew: dict[str, dict] = {k: {} for k in RAW_KEYS}
+    for (key, year), (usd, kg) in zip(totals.index, totals.to_numpy()):
+        ae[key][year]  = int(usd)
+        aew[key][year] = units.tonnes(int(kg))
 
     sectors_ok = sum(1 for k in RAW_KEYS if ae[k])
     years_found = sorted({y for k in RAW_KEYS for y in ae[k]})
@@ -224,25 +150,24 @@ def fetch_annual_exports_world(year: int) -> dict:
         "YEAR":     str(year),
         "MONTH":    "12",
         "COMM_LVL": "HS6",
-        "key":      CENSUS_KEY,
+        "key":      config.census_key(),
     }, f"export world {year}")
     if len(data) < 2:
         print("no data")
         return {}
 
     headers = data[0]
-    awx: dict[str, float] = {}
+    awx: dict[str, int] = {}
     for row_list in data[1:]:
         row  = dict(zip(headers, row_list))
         hs6  = row.get("E_COMMODITY", "")
-        if not _is_cbam(hs6):
+        if not is_cbam(hs6):
             continue
         key = hs6_to_key(hs6)
         if key is None:
             continue
-        name = (row.get("CTY_NAME") or "").upper()
-        if not _is_aggregate(name):
-            awx[key] = awx.get(key, 0.0) + _to_float(row.get("ALL_VAL_YR"))
+        if not partners.is_aggregate(partners.census_id(row.get("CTY_NAME"))):
+            awx[key] = awx.get(key, 0) + units.parse(row.get("ALL_VAL_YR"))
 
     print(f"{len(data)-1:,} rows")
     return awx
@@ -257,190 +182,382 @@ def fetch_annual_imports(year: int) -> dict:
         "YEAR":     str(year),
         "MONTH":    "12",
         "COMM_LVL": "HS6",
-        "key":      CENSUS_KEY,
+        "key":      config.census_key(),
     }, f"import world {year}")
     if len(data) < 2:
         print("no data")
         return {}
 
     headers = data[0]
-    awm: dict[str, float] = {}
+    awm: dict[str, int] = {}
     for row_list in data[1:]:
         row = dict(zip(headers, row_list))
         hs6 = row.get("I_COMMODITY", "")
-        if not _is_cbam(hs6):
+        if not is_cbam(hs6):
             continue
         key = hs6_to_key(hs6)
         if key is None:
             continue
-        name = (row.get("CTY_NAME") or "").upper()
-        if not _is_aggregate(name):
-            awm[key] = awm.get(key, 0.0) + _to_float(row.get("GEN_VAL_YR"))
+        if not partners.is_aggregate(partners.census_id(row.get("CTY_NAME"))):
+            awm[key] = awm.get(key, 0) + units.parse(row.get("GEN_VAL_YR"))
 
     print(f"{len(data)-1:,} rows")
     return awm
 
 # ---------------------------------------------------------------------------
-# Census exports YTD (cumulative through a given month)
-# Returns (eu_ytd_val, eu_ytd_kg, world_ytd_kg) — all year-to-date cumulative.
+# Census YTD (cumulative through a given month), exports and imports
+# Returns (eu_ytd_val, eu_ytd_kg, world_ytd_val, world_ytd_kg, partner_ytd) —
+# all year-to-date cumulative, in int USD and int kg; world totals exclude
+# aggregates; partner_ytd is {(hs6, partner_id): [usd, kg]} for single countries
+# and the EU27 aggregate.
 #
-# Uses ALL_VAL_YR (cumulative Jan–month) instead of ALL_VAL_MO (point-in-time)
-# because the Census exports/hs endpoint only includes the "EUROPEAN UNION"
-# aggregate row in cumulative queries; it is absent in monthly-only responses.
-# The caller diffs consecutive months to derive point-in-time monthly values.
+# Uses ALL_VAL_YR / GEN_VAL_YR (cumulative Jan–month) instead of the _MO
+# fields (point-in-time) because the Census exports/hs endpoint only includes
+# the "EUROPEAN UNION" aggregate row in cumulative queries; it is absent in
+# monthly-only responses.  The caller diffs consecutive months to derive
+# point-in-time monthly values.  The December import response is the same
+# query as the annual world-import total, so it also yields awm.
 # ---------------------------------------------------------------------------
-def fetch_exports_ytd(year: int, month: int) -> tuple[dict, dict, dict]:
+YTD_FLOWS: dict[str, tuple[str, str, str]] = {
+    "export": (EXPORT_URL, "E_COMMODITY", "ALL_VAL_YR"),
+    "import": (IMPORT_URL, "I_COMMODITY", "GEN_VAL_YR"),
+}
+
+def fetch_ytd(flow: str, year: int, month: int) -> tuple[dict, dict, dict, dict, dict]:
+    url, cmd, val_col = YTD_FLOWS[flow]
     label = f"{year}{month:02d}"
-    print(f"  export YTD {label} … ", end="", flush=True)
-    data = _census_fetch(EXPORT_URL, {
-        "get":      "E_COMMODITY,CTY_CODE,CTY_NAME,ALL_VAL_YR,AIR_WGT_YR,VES_WGT_YR",
+    data = _census_fetch(url, {
+        "get":      f"{cmd},CTY_CODE,CTY_NAME,{val_col},AIR_WGT_YR,VES_WGT_YR",
         "YEAR":     str(year),
         "MONTH":    f"{month:02d}",
         "COMM_LVL": "HS6",
-        "key":      CENSUS_KEY,
-    }, f"export YTD {label}")
+        "key":      config.census_key(),
+    }, f"{flow} YTD {label}", kind="ytd_hs6")
     if len(data) < 2:
-        print("no data")
-        return {}, {}, {}
-
-    headers = data[0]
-    eu_ytd_val:   dict[str, float] = {}
-    eu_ytd_kg:    dict[str, float] = {}
-    world_ytd_kg: dict[str, float] = {}
-
-    for row_list in data[1:]:
-        row  = dict(zip(headers, row_list))
-        hs6  = row.get("E_COMMODITY", "")
-        if not _is_cbam(hs6):
-            continue
-        key = hs6_to_key(hs6)
+        print(f"  {flow} YTD {label} … no data")
+        return {}, {}, {}, {}, {}
+
+    # Column positions once, and one sector / partner lookup per distinct
+    # code / name, instead of a dict per row (responses run to ~380k rows)
+    head = data[0]
+    i_hs6, i_name, i_val = head.index(cmd), head.index("CTY_NAME"), head.index(val_col)
+    i_air, i_ves = head.index("AIR_WGT_YR"), head.index("VES_WGT_YR")
+    eu_id = partners.iso2_id("EU")
+    keys: dict[str, str | None] = {}
+    pids: dict[str, int] = {}
+    eu_ytd_val:    dict[str, int] = {}
+    eu_ytd_kg:     dict[str, int] = {}
+    world_ytd_val: dict[str, int] = {}
+    world_ytd_kg:  dict[str, int] = {}
+    partner_ytd:   dict[tuple[str, int], list[int]] = {}
+
+    for row in data[1:]:
+        hs6 = row[i_hs6] or ""
+        if hs6 not in keys:
+            keys[hs6] = hs6_to_key(hs6) if is_cbam(hs6) else None
+        key = keys[hs6]
         if key is None:
             continue
-        val = _to_float(row.get("ALL_VAL_YR"))
-        wgt = _to_float(row.get("AIR_WGT_YR")) + _to_float(row.get("VES_WGT_YR"))
-        name = (row.get("CTY_NAME") or "").upper()
-        if _is_eu27(name):
-            eu_ytd_val[key] = eu_ytd_val.get(key, 0.0) + val
-            eu_ytd_kg[key]  = eu_ytd_kg.get(key,  0.0) + wgt
-        elif not _is_aggregate(name):
-            world_ytd_kg[key] = world_ytd_kg.get(key, 0.0) + wgt
+        name = row[i_name]
+        if name not in pids:
+            pids[name] = partners.census_id(name)
+        pid = pids[name]
+        val = units.parse(row[i_val])
+        wgt = units.parse(row[i_air]) + units.parse(row[i_ves])
+        if pid == eu_id:
+            eu_ytd_val[key] = eu_ytd_val.get(key, 0) + val
+            eu_ytd_kg[key]  = eu_ytd_kg.get(key,  0) + wgt
+        elif not partners.is_aggregate(pid):
+            world_ytd_val[key] = world_ytd_val.get(key, 0) + val
+            world_ytd_kg[key]  = world_ytd_kg.get(key, 0) + wgt
+        else:
+            continue
+        acc = partner_ytd.setdefault((hs6, pid), [0, 0])
+        acc[0] += val
+        acc[1] += wgt
 
     eu_n = sum(1 for v in eu_ytd_val.values() if v > 0)
-    print(f"{len(data)-1:,} rows → {eu_n} EU sectors")
-    return eu_ytd_val, eu_ytd_kg, world_ytd_kg
+    print(f"  {flow} YTD {label} … {len(data)-1:,} rows → {eu_n} EU sectors")
+    return eu_ytd_val, eu_ytd_kg, world_ytd_val, world_ytd_kg, partner_ytd
+
+
+PARTNER_COLUMNS = ["sector", "hs6", "partner_id", "value_usd", "quantity_kg"]
+
+def partner_month(curr: dict, prev: dict) -> pd.DataFrame:
+    """Point-in-time partner × HS6 rows for one month from two YTD snapshots.
+
+    Diffs are kept signed (a negative one is a downward revision of earlier
+    months) so that the rows sum to the month's series exactly.
+    """
+    rows = []
+    for hs6, pid in dict.fromkeys([*curr, *prev]):
+        val, kg = curr.get((hs6, pid), (0, 0))
+        pv,  pk = prev.get((hs6, pid), (0, 0))
+        v, w = val - pv, kg - pk
+        if v or w:
+            rows.append((hs6_to_key(hs6), hs6, pid, v, w))
+    return pd.DataFrame(rows, columns=PARTNER_COLUMNS)
+
+
+def stored_years(part_flow: str) -> set[int]:
+    """Years with all twelve months in the us_partner partitions."""
+    months = [p for p in partitions.periods("us_partner", part_flow) if len(p) == 6]
+    return {y for y in {int(p[:4]) for p in months}
+            if sum(p[:4] == str(y) for p in months) == 12}
+
+
+def stored_month(flow: str, label: str) -> tuple[dict | None, dict | None]:
+    """(EU27 {key: (usd, kg)}, world {key: kg (exports) / usd (imports)}) from one partition.
+
+    A side is None when the partition has no rows for it, i.e. the month was
+    not diffed for that component when it was fetched.
+    """
+    df = partitions.read("us_partner", flow.capitalize(), only=[label], dtype={"sector": str, "hs6": str})
+    if df.empty:
+        return None, None
+    is_eu = df["partner_id"] == partners.iso2_id("EU")
+    eu    = df[is_eu].groupby("sector")[["value_usd", "quantity_kg"]].sum()
+    world = df[~is_eu].groupby("sector")["quantity_kg" if flow == "export" else "value_usd"].sum()
+    eu_d = ({k: (int(eu.at[k, "value_usd"]), int(eu.at[k, "quantity_kg"])) if k in eu.index else (0, 0)
+             for k in RAW_KEYS} if is_eu.any() else None)
+    world_d = {k: int(world.get(k, 0)) for k in RAW_KEYS} if (~is_eu).any() else None
+    return eu_d, world_d
 
 # ---------------------------------------------------------------------------
-# Comext: monthly EU27 imports from US per CBAM sector
+# Census monthly series per flow, from consecutive YTD snapshots
+#   export: me (USD to EU27), mew (t to EU27), mw (kg to the world)
+#   import: mi (USD from EU27), miw (t from EU27), mwm (USD from the world)
 # ---------------------------------------------------------------------------
-COMEXT_SECTORS: dict[str, list[str]] = {
-    "steel": [
-        "26011200",
-        "7201", "720211", "720241", "72026000",
-        "7203", "7205", "72061000",
-        "7208", "7209", "7210", "72111300", "7212", "7213", "72142000",
-        "7215", "7216", "721710", "721720",
-        "72181000", "72191100", "72193100",
-        "7221", "722300",
-        "722410", "72251100", "722530", "722550",
-        "730300", "7301", "7302",
-        "730419", "730439",
-        "7305", "73061900", "73063080",
-        "73072100", "73079100",
-        "7308", "7309", "7310", "731100",
-        "731815", "731816", "73182200", "73182300",
-        "73269098",
-    ],
-    "alu": [
-        "7601", "7603",
-        "76041010", "76041090", "76042100", "76042910", "76042990",
-        "7605", "7606", "7607", "7608",
-        "76090000", "76101000", "76110000",
-        "7612", "76130000", "7614",
-        "76161000", "76169100", "76169910", "76169990",
-    ],
-    "cement": [
-        "25070080", "25231000", "25232100", "25232900", "25233000", "25239000",
-    ],
-    "fert": [
-        "28080000", "28141000", "28142000", "28342100",
-        "31021012", "31021015", "31021019", "31021090",
-        "31022100", "31022900", "31023010", "31023090",
-        "31024010", "31024090", "31025000", "31026000",
-        "31028000", "31029000",
-        "31051000", "31052010", "31052090",
-        "31053000", "31054000",
-        "31055100", "31055900", "31059020", "31059080",
-    ],
-    "h2": ["28041000"],
+MONTHLY_SERIES: dict[str, tuple[str, str, str]] = {
+    "export": ("me", "mew", "mw"),
+    "import": ("mi", "miw", "mwm"),
 }
 
-_COMEXT_BATCH = 10
-
-def fetch_comext_monthly(sector: str, cn_codes: list[str]) -> dict[str, list]:
-    """Returns {YYYYMM: [eur, tonnes]} for EU27 imports from US."""
-    print(f"  Comext {sector} ({len(cn_codes)} codes) … ", end="", flush=True)
-    result: dict[str, list] = {}
-    batches = [cn_codes[i:i+_COMEXT_BATCH] for i in range(0, len(cn_codes), _COMEXT_BATCH)]
-
-    for batch in batches:
-        url    = f"{COMEXT_BASE}/M.EU27_2020.US.{'+'.join(batch)}.1./"
-        params = {"format": "SDMX-CSV", "startPeriod": "2022-01", "lang": "EN"}
-        df     = pd.DataFrame()
+def ytd_walk(flow: str, RAW: dict, notes: dict) -> int:
+    """Fill one flow's monthly series (and awm from December imports); returns partitions written."""
+    f_val, f_t, f_world = MONTHLY_SERIES[flow]
+    world_of = 3 if flow == "export" else 2          # world kg (mw) / world USD (mwm)
+    part_flow = flow.capitalize()
+    today   = date.today()
+    stored  = {y for y in stored_years(part_flow) if y <= today.year - REFETCH_YEARS}
+    eu_id   = partners.iso2_id("EU")
+    prev    = ({}, {}, {}, {}, {})
+    written = 0
+    year_world: dict | None = {}
+
+    for y, m in _months(MONTHLY_FROM, (today.year, today.month)):
+        label = f"{y}{m:02d}"
+        if m == 1:                  # New calendar year — YTD accumulators reset
+            prev, year_world = ({}, {}, {}, {}, {}), {}
+
+        if y in stored:
+            # Settled year: the month's diffs come back from its partition
+            eu_d, world_d = stored_month(flow, label)
+        else:
+            curr = fetch_ytd(flow, y, m)
+            eu_val, eu_kg, world, partner = curr[0], curr[1], curr[world_of], curr[4]
+            p_val,  p_kg,  p_world, p_partner = prev[0], prev[1], prev[world_of], prev[4]
+
+            # Partner rows came back but the EU aggregate did not: the EU series
+            # for this month would silently be missing
+            if partner and not eu_val:
+                notes["eu_row_missing"].append((f_val, label))
+
+            # Diff only against a present previous month, per component: the EU
+            # row and the world rows can each be missing from a response on their
+            # own, and a diff against an absent month would publish a
+            # year-to-date total.  The partition keeps the same components.
+            diff_eu    = bool(eu_val) and (m == 1 or bool(p_val))
+            diff_world = bool(world)  and (m == 1 or bool(p_world))
+            eu_d = ({k: (eu_val.get(k, 0) - p_val.get(k, 0), eu_kg.get(k, 0) - p_kg.get(k, 0))
+                     for k in RAW_KEYS} if diff_eu else None)
+            world_d = {k: world.get(k, 0) - p_world.get(k, 0) for k in RAW_KEYS} if diff_world else None
+
+            if diff_eu or diff_world:
+                rows  = partner_month(partner, p_partner)
+                is_eu = rows["partner_id"] == eu_id
+                rows  = rows[(is_eu & diff_eu) | (~is_eu & diff_world)]
+                written += partitions.write("us_partner", part_flow, label, rows)
 
-        for attempt in range(4):
-            try:
-                r = requests.get(url, params=params, timeout=120)
-            except requests.RequestException as exc:
-                print(f"\n    network error (attempt {attempt+1}): {exc}")
-                time.sleep(2 ** attempt)
-                continue
-            if r.ok:
-                df = pd.read_csv(StringIO(r.text))
-                break
-            if r.status_code in (400, 404):
-                break
-            if r.status_code == 429:
-                time.sleep(10 * (attempt + 1))
-                continue
-            print(f"\n    HTTP {r.status_code}: {r.text[:80]}")
-            break
+        for k in RAW_KEYS:
+            series = []
+            if eu_d is not None:
+                usd, kg = eu_d[k]
+                series += [(f_val, usd), (f_t, units.tonnes(kg))]     # USD; kg → t, once
+            if world_d is not None:
+                series += [(f_world, world_d[k])]                     # kg (exports) / USD (imports)
+            for field, v in series:
+                if v < 0:
+                    notes["negative_diffs"].append((k, field, label, v))
+                elif v > 0:
+                    RAW[k][field][label] = v
+
+        # December YTD imports from the world are the annual total; for a
+        # stored year, the sum of its twelve monthly diffs
+        if year_world is not None and world_d is not None:
+            for k, v in world_d.items():
+                year_world[k] = year_world.get(k, 0) + v
+        else:
+            year_world = None
+        if flow == "import" and m == 12:
+            total = (year_world or {}) if y in stored else curr[world_of]
+            for k in RAW_KEYS:
+                if total.get(k):
+                    RAW[k]["awm"][str(y)] = total[k]
+
+        if y not in stored:
+            prev = curr
+            time.sleep(0.5)
+
+    return written
 
-        if df.empty:
-            time.sleep(0.3)
-            continue
+# ---------------------------------------------------------------------------
+# Comext: monthly EU27 imports per partner × CBAM sector (sectors.COMEXT_SECTORS)
+#
+# One request per sector batch carries every partner in the PARTNER slot
+# (US+CA+CN…), so a partner adds its own rows to responses that are fetched
+# anyway rather than another full round of requests.  Batches run on a small
+# thread pool; each keeps the retry / rate-limit handling of a serial call.
+# ---------------------------------------------------------------------------
+_COMEXT_BATCH   = 10
+COMEXT_PARTNERS = ["US"]
+COMEXT_WORKERS  = 4
 
-        df.columns = [c.lower() for c in df.columns]
-        if not {"time_period", "obs_value", "indicators"}.issubset(df.columns):
-            time.sleep(0.3)
-            continue
+def _comext_batches() -> list[tuple[str, list[str]]]:
+    return [(sector, codes[i:i + _COMEXT_BATCH])
+            for sector, ref in COMEXT_SECTORS.items()
+            for codes in [concordance.source_codes(ref, "cn")]
+            for i in range(0, len(codes), _COMEXT_BATCH)]
 
-        df["period"]    = df["time_period"].astype(str).str.replace("-", "", regex=False)
-        df["obs_value"] = pd.to_numeric(df["obs_value"], errors="coerce").fillna(0)
 
-        for _, row in df[df["indicators"].str.upper() == "VALUE_IN_EUROS"].iterrows():
-            p = str(row["period"])
-            if len(p) == 6:
-                result.setdefault(p, [0.0, 0.0])
-                result[p][0] += float(row["obs_value"])
+def _comext_request(batch: list[str], partner_codes: list[str]) -> pd.DataFrame:
+    """One SDMX-CSV request (all partners, one batch of CN codes), with retries."""
+    slot   = "+".join(partner_codes)
+    url    = f"{COMEXT_BASE}/M.EU27_2020.{slot}.{'+'.join(batch)}.1./"
+    params = {"format": "SDMX-CSV", "startPeriod": "2022-01", "lang": "EN"}
 
-        for _, row in df[df["indicators"].str.upper() == "QUANTITY_IN_100KG"].iterrows():
-            p = str(row["period"])
-            if len(p) == 6:
-                result.setdefault(p, [0.0, 0.0])
-                result[p][1] += float(row["obs_value"]) / 10.0  # 100 kg → tonnes
+    for attempt in range(4):
+        try:
+            with fetch_plan.timed("comext", "monthly", f"{slot}:{'+'.join(batch)}") as t:
+                r = requests.get(url, params=params, timeout=120)
+                t.nbytes = len(r.content) if r.ok else 0
+        except requests.RequestException as exc:
+            print(f"\n    network error (attempt {attempt+1}): {exc}")
+            time.sleep(2 ** attempt)
+            continue
+        if r.ok:
+            time.sleep(0.4)
+            return pd.read_csv(StringIO(r.text))
+        if r.status_code in (400, 404):
+            break
+        if r.status_code == 429:
+            time.sleep(10 * (attempt + 1))
+            continue
+        print(f"\n    HTTP {r.status_code}: {r.text[:80]}")
+        break
+    return pd.DataFrame()
+
+
+def fetch_comext_monthly(partner_codes: list[str] = COMEXT_PARTNERS,
+                         workers: int = COMEXT_WORKERS) -> dict[str, dict[str, dict[str, list]]]:
+    """Returns {partner: {sector: {YYYYMM: [eur, tonnes]}}} for EU27 imports."""
+    jobs   = _comext_batches()
+    frames = []
+    print(f"  Comext {len(jobs)} batches × {len(partner_codes)} partners "
+          f"({'+'.join(partner_codes)}), {workers} at a time … ", end="", flush=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_comext_request, batch, partner_codes): sector for sector, batch in jobs}
+        for fut in as_completed(futures):
+            df = fut.result()
+            df.columns = [c.lower() for c in df.columns]
+            if df.empty or not {"partner", "time_period", "obs_value", "indicators"} <= set(df.columns):
+                continue
+            cols = [c for c in ("partner", "time_period", "indicators", "obs_value", "product") if c in df]
+            frames.append(df[cols].assign(sector=futures[fut]))
 
-        time.sleep(0.4)
+    if not frames:
+        print("no data")
+        return {}
 
-    rounded = {p: [round(v, 2), round(t, 1)] for p, (v, t) in sorted(result.items())}
-    print(f"{len(rounded)} months")
-    return rounded
+    df = pd.concat(frames, ignore_index=True)
+    df["period"]    = df["time_period"].astype(str).str.replace("-", "", regex=False)
+    df["obs_value"] = pd.to_numeric(df["obs_value"], errors="coerce").fillna(0)
+    if "product" in df:
+        df = concordance.remap(df, "product", "period", "cn", ("obs_value",))
+    df["indicators"] = df["indicators"].str.upper()
+    df = df[(df["period"].str.len() == 6)
+            & df["indicators"].isin(["VALUE_IN_EUROS", "QUANTITY_IN_100KG"])]
+    # int EUR and int kg per row, so the sums below are exact
+    is_q = df["indicators"] == "QUANTITY_IN_100KG"
+    df = df.assign(obs_value=units.whole(df["obs_value"]).where(~is_q, units.kg(df["obs_value"])))
+    wide = (df.groupby(["partner", "sector", "period", "indicators"])["obs_value"].sum()
+              .unstack("indicators", fill_value=0)
+              .reindex(columns=["VALUE_IN_EUROS", "QUANTITY_IN_100KG"], fill_value=0))
+
+    result: dict[str, dict[str, dict[str, list]]] = {}
+    for (partner, sector, period), (eur, kg) in zip(wide.index, wide.to_numpy().tolist()):
+        result.setdefault(partner, {}).setdefault(sector, {})[period] = [eur, units.tonnes(kg)]
+
+    print(", ".join(f"{p} {sum(len(v) for v in result[p].values())} sector-months" for p in sorted(result)))
+    return result
+
+
+def raweu_by_partner(raweu: dict) -> dict[str, dict]:
+    """RAWEU from an older trade_data.json ({sector: …}, US only) in the {partner: {sector: …}} layout."""
+    return {"US": raweu} if set(raweu) & set(COMEXT_SECTORS) else raweu
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
-RAW_KEYS = ["72", "73", "76", "2523", "280410", "31", "2814"]
+def _months(start: tuple[int, int], end: tuple[int, int]) -> list[tuple[int, int]]:
+    y, m = start
+    out = []
+    while (y, m) <= end:
+        out.append((y, m))
+        m += 1
+        if m > 12:
+            m, y = 1, y + 1
+    return out
+
+def plan(partner_codes: list[str] = COMEXT_PARTNERS) -> list[fetch_plan.Request]:
+    """Every request build() would send, marked cached if trade_data.json has its
+    period; YTD months of stored settled years are marked skip."""
+    RAW, RAWEU = {}, {}
+    if OUT.exists():
+        existing = json.loads(OUT.read_text())
+        RAW, RAWEU = existing.get("RAW", {}), raweu_by_partner(existing.get("RAWEU", {}))
+
+    def has(field: str, period: str) -> bool:
+        return any(period in RAW.get(k, {}).get(field, {}) for k in RAW_KEYS)
 
-def build() -> None:
+    today = date.today()
+    reqs: list[fetch_plan.Request] = []
+    for field, flow, years in (("awx", "export", range(START_YEAR, CURRENT_YEAR + 1)),
+                               ("awm", "import", range(START_YEAR, MONTHLY_FROM[0]))):
+        for year in years:
+            reqs.append(fetch_plan.Request("census", "annual_hs6", f"{flow} world {year}",
+                                           cached=has(field, str(year)), sleep=0.5))
+    # the two YTD walks run side by side; settled stored years are read from
+    # the us_partner partitions instead of being requested
+    for flow, (field, _, _) in MONTHLY_SERIES.items():
+        stored = {y for y in stored_years(flow.capitalize()) if y <= today.year - REFETCH_YEARS}
+        for y, m in _months(MONTHLY_FROM, (today.year, today.month)):
+            label = f"{y}{m:02d}"
+            reqs.append(fetch_plan.Request("census", "ytd_hs6", f"{flow} YTD {label}",
+                                           cached=has(field, label), sleep=0.5,
+                                           workers=len(MONTHLY_SERIES), skip=y in stored))
+    last = (today.replace(day=1) - timedelta(days=1)).strftime("%Y%m")   # latest month Comext may have
+    slot = "+".join(partner_codes)
+    for sector, batch in _comext_batches():
+        reqs.append(fetch_plan.Request("comext", "monthly", f"{sector} {slot} {batch[0]}…",
+                                       cached=all(last in RAWEU.get(p, {}).get(sector, {}) for p in partner_codes),
+                                       sleep=0.4, workers=COMEXT_WORKERS))
+    return reqs
+
+
+def build(allow_errors: bool = False, bulk_comext: bool = False,
+          partner_codes: list[str] = COMEXT_PARTNERS) -> None:
     # Load existing file as baseline so API failures never wipe good old data
     ex_raw: dict = {}
     ex_eu:  dict = {}
@@ -448,7 +565,7 @@ def build() -> None:
         try:
             existing = json.loads(OUT.read_text())
             ex_raw = existing.get("RAW", {})
-            ex_eu  = existing.get("RAWEU", {})
+            ex_eu  = raweu_by_partner(existing.get("RAWEU", {}))
             print(f"Loaded baseline from {OUT}  ({OUT.stat().st_size//1024} KB)")
         except Exception as e:
             print(f"Warning: could not parse existing {OUT} ({e}) — starting fresh")
@@ -461,9 +578,14 @@ def build() -> None:
         "me":  dict(ex_raw.get(k, {}).get("me",  {})),
         "mw":  dict(ex_raw.get(k, {}).get("mw",  {})),
         "mew": dict(ex_raw.get(k, {}).get("mew", {})),
+        "mi":  dict(ex_raw.get(k, {}).get("mi",  {})),
+        "miw": dict(ex_raw.get(k, {}).get("miw", {})),
+        "mwm": dict(ex_raw.get(k, {}).get("mwm", {})),
     } for k in RAW_KEYS}
 
-    RAWEU: dict = {k: dict(ex_eu.get(k, {})) for k in COMEXT_SECTORS}
+    # {partner: {sector: {YYYYMM: [eur, tonnes]}}}; partners not fetched this run are kept
+    RAWEU: dict = {p: {k: dict(ex_eu.get(p, {}).get(k, {})) for k in COMEXT_SECTORS}
+                   for p in dict.fromkeys([*partner_codes, *ex_eu])}
 
     # ---- Annual EU27 exports from CSV (ae, aew) ----
     print("\n=== Annual EU27 exports (from us_eu27_trade_raw.csv) ===")
@@ -479,66 +601,53 @@ def build() -> None:
         y = str(year)
         for k in RAW_KEYS:
             if awx.get(k):
-                RAW[k]["awx"][y] = round(awx[k])
+                RAW[k]["awx"][y] = awx[k]
         time.sleep(0.5)
 
-    # ---- Annual world imports from Census (awm) ----
+    # ---- Annual world imports from Census (awm), years before the YTD walk ----
     print("\n=== Census annual imports (world total for awm) ===")
-    for year in range(START_YEAR, CURRENT_YEAR + 1):
+    for year in range(START_YEAR, MONTHLY_FROM[0]):
         awm = fetch_annual_imports(year)
         y = str(year)
         for k in RAW_KEYS:
             if awm.get(k):
-                RAW[k]["awm"][y] = round(awm[k])
+                RAW[k]["awm"][y] = awm[k]
         time.sleep(0.5)
 
-    # ---- Monthly exports from Census (me, mew, mw) ----
+    # ---- Monthly exports and imports from Census ----
     # Each call fetches the cumulative YTD total through that month from the
     # annual endpoint (which includes the EU27 aggregate row).  Point-in-time
-    # monthly values are the diff between consecutive months.
-    print("\n=== Census monthly exports (me, mew, mw via YTD diff) ===")
-    today = date.today()
-    y, m  = MONTHLY_FROM
-    prev_eu_val:   dict[str, float] = {}
-    prev_eu_kg:    dict[str, float] = {}
-    prev_world_kg: dict[str, float] = {}
-    cur_year = y
-
-    while (y, m) <= (today.year, today.month):
-        if y != cur_year:           # New calendar year — YTD accumulators reset
-            prev_eu_val   = {}
-            prev_eu_kg    = {}
-            prev_world_kg = {}
-            cur_year      = y
-
-        curr_eu_val, curr_eu_kg, curr_world_kg = fetch_exports_ytd(y, m)
-        label = f"{y}{m:02d}"
-
-        for k in RAW_KEYS:
-            me_val  = curr_eu_val.get(k, 0)   - prev_eu_val.get(k, 0)
-            mew_val = (curr_eu_kg.get(k, 0)   - prev_eu_kg.get(k, 0))   / 1000  # kg→t
-            mw_val  = curr_world_kg.get(k, 0)  - prev_world_kg.get(k, 0)         # kg
-
-            if me_val  > 0: RAW[k]["me"][label]  = round(me_val)
-            if mew_val > 0: RAW[k]["mew"][label] = round(mew_val, 1)
-            if mw_val  > 0: RAW[k]["mw"][label]  = round(mw_val)
-
-        prev_eu_val   = curr_eu_val
-        prev_eu_kg    = curr_eu_kg
-        prev_world_kg = curr_world_kg
-
-        m += 1
-        if m > 12:
-            m, y = 1, y + 1
-        time.sleep(0.5)
-
-    # ---- Comext monthly EU27 imports from US (RAWEU) ----
-    print("\n=== Comext monthly EU imports from US ===")
-    for sector, codes in COMEXT_SECTORS.items():
-        fresh = fetch_comext_monthly(sector, codes)
-        if fresh:
-            RAWEU[sector] = fresh
-        time.sleep(1.0)
+    # monthly values are the diff between consecutive months.  The two flows
+    # are independent request chains, so they run side by side; December
+    # imports also fill awm for the years the walk covers.
+    print("\n=== Census monthly exports (me, mew, mw) and imports (mi, miw, mwm) via YTD diff ===")
+    notes: dict[str, list] = {"eu_row_missing": [], "negative_diffs": []}
+    with ThreadPoolExecutor(max_workers=len(MONTHLY_SERIES)) as pool:
+        walks = {flow: pool.submit(ytd_walk, flow, RAW, notes) for flow in MONTHLY_SERIES}
+        for flow, walk in walks.items():
+            print(f"  partner partitions ({flow}): {walk.result()} months written/changed "
+                  f"in {partitions.STORE / 'us_partner'}")
+
+    # ---- Comext monthly EU27 imports per partner (RAWEU) ----
+    if bulk_comext:
+        print(f"\n=== Comext monthly EU imports from {', '.join(partner_codes)} (bulk partitions) ===")
+        fresh = comext_bulk.raweu(partner_codes)
+    else:
+        print(f"\n=== Comext monthly EU imports from {', '.join(partner_codes)} ===")
+        fresh = fetch_comext_monthly(partner_codes)
+    for partner, sectors in fresh.items():
+        for sector, series in sectors.items():
+            if series:
+                RAWEU.setdefault(partner, {})[sector] = series
+
+    # ---- Quality gate ----
+    print("\n=== Data-quality checks ===")
+    findings = quality.check(RAW, RAWEU, notes)
+    n_err = quality.summarize(findings)
+    quality.write_report(findings)
+    if n_err and not allow_errors:
+        print(f"\n{n_err} hard errors — {OUT} not updated (see {quality.REPORT}; --allow-errors to publish)")
+        sys.exit(1)
 
     # ---- Write ----
     OUT.parent.mkdir(parents=True, exist_ok=True)
@@ -547,15 +656,46 @@ def build() -> None:
 
     size_kb = OUT.stat().st_size / 1024
     print(f"\nWrote {OUT}  ({size_kb:.0f} KB)")
+    if prerender.embed({"RAW": RAW, "RAWEU": RAWEU}):
+        print(f"  first paint pre-rendered into {prerender.INDEX_HTML}")
+
+    # ---- Vintage ----
+    prev = vintages.runs()
+    run  = vintages.record(RAW, RAWEU).stem
+    if prev:
+        changes = vintages.diff(prev[-1], run)
+        revised = sum(1 for c in changes if c["old"] is not None and c["new"] is not None)
+        print(f"  vintage {run}: {revised} revised, {len(changes) - revised} added/dropped vs {prev[-1]}")
+    else:
+        print(f"  vintage {run}: first snapshot")
 
     # Quick sanity check
     ae_ok  = sum(1 for k in RAW_KEYS if RAW[k]["ae"])
     me_ok  = sum(1 for k in RAW_KEYS if RAW[k]["me"])
-    eu_ok  = sum(1 for k in RAWEU if RAWEU[k])
+    mi_ok  = sum(1 for k in RAW_KEYS if RAW[k]["mi"])
     print(f"  ae populated: {ae_ok}/{len(RAW_KEYS)} sectors")
     print(f"  me populated: {me_ok}/{len(RAW_KEYS)} sectors")
-    print(f"  RAWEU populated: {eu_ok}/{len(COMEXT_SECTORS)} sectors")
+    print(f"  mi populated: {mi_ok}/{len(RAW_KEYS)} sectors")
+    for p in RAWEU:
+        eu_ok = sum(1 for k in RAWEU[p] if RAWEU[p][k])
+        print(f"  RAWEU[{p}] populated: {eu_ok}/{len(COMEXT_SECTORS)} sectors")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Build docs/data/trade_data.json.")
+    ap.add_argument("--plan", action="store_true", help="list the requests without sending them")
+    ap.add_argument("--allow-errors", action="store_true", help="publish despite data-quality errors")
+    ap.add_argument("--comext-bulk", action="store_true", help="RAWEU from comext_bulk.py partitions")
+    ap.add_argument("--partners", default=",".join(COMEXT_PARTNERS),
+                    help="Comext partner codes for RAWEU, comma-separated (e.g. US,CA,CN,IN,TR,UA)")
+    args = ap.parse_args()
+    partner_codes = [p.strip().upper() for p in args.partners.split(",") if p.strip()]
+
+    if args.plan:
+        fetch_plan.report("build_data", plan(partner_codes))
+    else:
+        build(allow_errors=args.allow_errors, bulk_comext=args.comext_bulk, partner_codes=partner_codes)
 
 
 if __name__ == "__main__":
-    build()
+    main()
@@ -0,0 +1,69 @@
+"""
+Build the processed EU partner dataset from the raw Comext CSV.
+
+Converts EUR values to USD with the annual-average ECB rate from fx.py and
+100 kg quantities to metric tonnes.
+
+Input:  data/raw/eu_trade_hard_to_abate_partner_raw.csv   (EUR, 100 kg)
+Output: data/processed/eu_trade_hard_to_abate_partner.csv (USD, tonnes)
+        docs/data/eu_trade.json                           (same rows, quantity rounded to 0.1 t)
+          {"meta": {"fx": <fx.version()>, "fx_approximate": bool, "note": …}, "rows": [...]}
+
+Until the ECB table has been fetched (fx.py), every value is converted at the
+flat fallback rate; "fx_approximate" is then true and the note says so.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+import fx
+
+ROOT     = Path(__file__).resolve().parents[1]
+RAW_CSV  = ROOT / "data" / "raw" / "eu_trade_hard_to_abate_partner_raw.csv"
+OUT_CSV  = ROOT / "data" / "processed" / "eu_trade_hard_to_abate_partner.csv"
+OUT_JSON = ROOT / "docs" / "data" / "eu_trade.json"
+
+COLUMNS = ["period", "flow", "sector", "partner_id", "partnerDesc", "trade_value_usd", "quantity_mt"]
+
+
+def build() -> pd.DataFrame:
+    df = pd.read_csv(RAW_CSV)
+    df["trade_value_usd"] = (df["primaryValue"] * fx.rates_for(df["period"])).round()
+    df["quantity_mt"]     = df["quantity_100kg"] / 10
+    return df[COLUMNS]
+
+
+def meta() -> dict:
+    """FX provenance of the USD values, published with the rows."""
+    if fx.is_fallback():
+        note = (f"approximate: EUR converted at the flat fallback rate {fx.FALLBACK_USD_PER_EUR} USD/EUR, "
+                f"not the ECB monthly rates")
+    else:
+        note = "EUR converted at the ECB annual-average EUR/USD rate"
+    return {"fx": fx.version(), "fx_approximate": fx.is_fallback(), "note": note}
+
+
+def main() -> None:
+    if not RAW_CSV.exists():
+        print(f"{RAW_CSV} not found — run fetch_eu_trade_raw.py first.")
+        return
+
+    out = build()
+    print(f"FX table: {fx.version()}")
+
+    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+    out.to_csv(OUT_CSV, index=False)
+    print(f"Saved: {OUT_CSV}  ({len(out):,} rows)")
+
+    records = out.assign(quantity_mt=out["quantity_mt"].round(1)).to_dict("records")
+    with OUT_JSON.open("w") as fh:
+        json.dump({"meta": meta(), "rows": records}, fh, separators=(",", ":"), ensure_ascii=False)
+    print(f"Saved: {OUT_JSON}" + ("  (approximate: flat fallback FX rate)" if fx.is_fallback() else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Monte Carlo uncertainty bands for the CBAM cost exposure of US exports to the EU.
+
+Applies the cost formula from reference/cbamBenchmarks.js
+
+    cost/t = max(0, DV×(1+markup) − Benchmark × CBAM_FACTOR[year]) × ETS × EUR_USD
+
+to the CN-level tonnage in data/raw/comext_us_cbam_trade_by_year.csv (average
+2022–2024 EU imports from the US), for every sector and CBAM phase-in year.
+
+Sampled inputs, per draw:
+  - ETS price path: geometric random walk from ETS_START (EUR/tCO2e)
+  - EUR/USD path:   geometric random walk from the latest ECB monthly rate (fx.py)
+  - Emission intensity (DV): lognormal around the product benchmark, one
+    multiplier per sector per draw (producers within a sector move together)
+
+Draws are evaluated in fixed-size chunks as (draw × year × CN) arrays, and each
+chunk is folded into per-sector × year log-spaced histograms, so memory stays
+flat however many draws are requested.  Percentiles are read off the
+histograms (relative resolution ≈ 0.3%).
+
+Output: docs/data/cbam_exposure.json
+        {sector: {year: {"p5": …, "p25": …, "p50": …, "p75": …, "p95": …, "mean": …}}}
+        USD per year; sector keys match RAWEU in trade_data.json.
+        A standalone output: the dashboard (docs/index.html, prerender.py)
+        does not read it.
+"""
+
+from __future__ import annotations
+
+import argparse, json, time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import fx
+from benchmarks import benchmark_for_code, load_cbam_factor
+
+ROOT       = Path(__file__).resolve().parents[1]
+TONNES_CSV = ROOT / "data" / "raw" / "comext_us_cbam_trade_by_year.csv"
+OUT        = ROOT / "docs" / "data" / "cbam_exposure.json"
+
+# CSV sector label → RAWEU / dashboard key
+SECTOR_KEYS: dict[str, str] = {
+    "Iron & Steel": "steel",
+    "Aluminium":    "alu",
+    "Cement":       "cement",
+    "Fertilisers":  "fert",
+    "Hydrogen":     "h2",
+}
+
+# ---------------------------------------------------------------------------
+# Sampling assumptions
+# ---------------------------------------------------------------------------
+ETS_START = 80.0     # EUR/tCO2e, first CBAM year
+ETS_VOL   = 0.25     # annual log-volatility of the ETS price
+FX_VOL    = 0.07     # annual log-volatility of EUR/USD
+DV_SIGMA  = 0.20     # log-sd of emission intensity around the benchmark
+
+# Default-value mark-up (Implementing Regulation on default values)
+MARKUP: dict[int, float] = {2026: 0.10, 2027: 0.20}
+MARKUP_LATER = 0.30
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Histogram bins: log-spaced USD edges, bin 0 holds exact zeros
+_EDGES = np.logspace(0, 13, 10_001)
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+
+def load_inputs() -> tuple[pd.DataFrame, list[str]]:
+    """CN rows with tonnes, benchmark and sector index; plus ordered sector keys."""
+    df = pd.read_csv(TONNES_CSV, dtype={"cn_code": str})
+    df["sector_key"] = df["sector"].map(SECTOR_KEYS)
+    df["benchmark"]  = df["cn_code"].map(benchmark_for_code)
+
+    missing = df[df["benchmark"].isna()]["cn_code"].tolist()
+    if missing:
+        print(f"  no benchmark for {len(missing)} codes (skipped): {missing}")
+
+    df = df[df["sector_key"].notna() & df["benchmark"].notna() & (df["avg_tonnes"] > 0)].copy()
+    sectors = [k for k in SECTOR_KEYS.values() if k in set(df["sector_key"])]
+    df["sector_idx"] = df["sector_key"].map({k: i for i, k in enumerate(sectors)})
+    return df.reset_index(drop=True), sectors
+
+
+# ---------------------------------------------------------------------------
+# Sampler
+# ---------------------------------------------------------------------------
+
+def _walk(rng: np.random.Generator, n: int, years: int, start: float, vol: float) -> np.ndarray:
+    """Martingale geometric random walk, shape (n, years); year 0 is start·exp(shock)."""
+    steps = rng.standard_normal((n, years)) * vol - 0.5 * vol * vol
+    return start * np.exp(np.cumsum(steps, axis=1))
+
+
+def _chunk(rng: np.random.Generator, n: int, tonnes: np.ndarray, bm: np.ndarray,
+           sector_idx: np.ndarray, n_sectors: int, factor: np.ndarray,
+           markup: np.ndarray, eur_usd: float) -> np.ndarray:
+    """Exposure in USD for n draws, shape (n, years, sectors)."""
+    years = len(factor)
+    ets   = _walk(rng, n, years, ETS_START, ETS_VOL)                     # (n, Y)
+    fxr   = _walk(rng, n, years, eur_usd, FX_VOL)                        # (n, Y)
+    mult  = np.exp(rng.standard_normal((n, n_sectors)) * DV_SIGMA)       # (n, S)
+
+    dv    = bm * mult[:, sector_idx]                                     # (n, C)
+    net   = dv[:, None, :] * (1 + markup)[None, :, None] \
+            - (bm[None, :] * factor[:, None])[None, :, :]                # (n, Y, C)
+    np.maximum(net, 0, out=net)
+    net  *= tonnes                                                       # tCO2e charged
+
+    onehot = np.zeros((len(bm), n_sectors))
+    onehot[np.arange(len(bm)), sector_idx] = 1.0
+    charged = net @ onehot                                               # (n, Y, S)
+    return charged * (ets * fxr)[:, :, None]
+
+
+def simulate(draws: int = 1_000_000, chunk: int = 4096, seed: int = 2026) -> dict:
+    df, sectors = load_inputs()
+    factor_by_year = load_cbam_factor()
+    years  = sorted(factor_by_year)
+    factor = np.array([factor_by_year[y] for y in years])
+    markup = np.array([MARKUP.get(y, MARKUP_LATER) for y in years])
+    eur_usd = fx.latest()
+
+    tonnes     = df["avg_tonnes"].to_numpy(float)
+    bm         = df["benchmark"].to_numpy(float)
+    sector_idx = df["sector_idx"].to_numpy(int)
+    n_s, n_y, n_b = len(sectors), len(years), len(_EDGES) + 1
+
+    counts = np.zeros(n_s * n_y * n_b, dtype=np.int64)
+    total  = np.zeros((n_y, n_s))
+    offset = (np.arange(n_y)[:, None] * n_s + np.arange(n_s)[None, :]) * n_b   # (Y, S)
+
+    rng  = np.random.default_rng(seed)
+    done = 0
+    while done < draws:
+        n   = min(chunk, draws - done)
+        exp = _chunk(rng, n, tonnes, bm, sector_idx, n_s, factor, markup, eur_usd)
+        total += exp.sum(axis=0)
+        bins   = np.searchsorted(_EDGES, exp, side="right")               # 0 = below $1
+        counts += np.bincount((bins + offset).ravel(), minlength=counts.size)
+        done  += n
+
+    counts = counts.reshape(n_y, n_s, n_b)
+    mids   = np.concatenate(([0.0], np.sqrt(_EDGES[:-1] * _EDGES[1:]), [_EDGES[-1]]))
+    cum    = np.cumsum(counts, axis=2)
+
+    out: dict = {s: {} for s in sectors}
+    for yi, year in enumerate(years):
+        for si, sector in enumerate(sectors):
+            idx  = np.searchsorted(cum[yi, si], np.array(PERCENTILES) / 100 * draws)
+            band = {f"p{p}": round(float(mids[i])) for p, i in zip(PERCENTILES, idx)}
+            band["mean"] = round(total[yi, si] / draws)
+            out[sector][str(year)] = band
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--draws", type=int, default=1_000_000)
+    ap.add_argument("--chunk", type=int, default=4096, help="draws evaluated per batch")
+    ap.add_argument("--seed",  type=int, default=2026)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    bands = simulate(args.draws, args.chunk, args.seed)
+    print(f"Simulated {args.draws:,} draws in {time.perf_counter() - t0:.1f} s")
+
+    for sector, by_year in bands.items():
+        b = by_year.get("2030", {})
+        if b:
+            print(f"  {sector:<7} 2030  p5 ${b['p5']/1e6:,.1f}M  p50 ${b['p50']/1e6:,.1f}M  p95 ${b['p95']/1e6:,.1f}M")
+
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+    with OUT.open("w") as fh:
+        json.dump(bands, fh, separators=(",", ":"))
+    print(f"Wrote {OUT}")
+
+
+if __name__ == "__main__":
+    main()
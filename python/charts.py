@@ -0,0 +1,227 @@
+"""
+Chart datasets (Datawrapper CSVs) for every year × sector, in one batched pass.
+
+Each entry of CHARTS declares one chart: the trade_cube slice it reads
+(reporter, flows, value measure) and the row layout Datawrapper expects.
+export() loads the partner cube once and runs one query per chart that keeps
+period, sector, flow and partner — every year × sector of that chart in a
+single aggregation — then splits the result and writes
+
+  data/charts/<chart>/<year>/<sector>.csv
+
+A chart with a `path` writes one stacked file instead (period and sector
+columns first) — the processed CSVs the dashboard already links to.  A chart
+with `sectors` relabels the cube's sector keys to published ones before
+splitting; sectors mapped to the same key are summed and unmapped ones are
+left out.
+
+A file is rewritten only when its bytes change, so a monthly run touches just
+the charts whose numbers moved, and files for a year × sector that is no
+longer in the data are removed.  Adding a chart is one more CHARTS entry.
+
+Layouts:
+  map       ISO3, NAME, VALUE (USD million) — Datawrapper choropleth
+  top       partnerDesc, value_usd, year_sector_total, share — top-k partners
+  partners  flow, partnerDesc, trade_value_usd, quantity_mt — full partner table
+  top_legacy  partnerDesc, export_value_usd, year_sector_total, share — the
+            columns and unrounded values of the original hand-made top-3 CSV
+
+EU charts use value_usd (fx.py; the flat fallback rate when the ECB table is
+missing, with a warning).
+
+Usage:
+  python python/charts.py                       # all charts
+  python python/charts.py --only us_exports_map
+
+Output: data/charts/<chart>/<year>/<sector>.csv
+        data/processed/us_exports_hard_to_abate_top3_partners.csv
+          US exports top 3 in the legacy layout and sector keys
+          (aluminum, cement, iron_steel = HS 72 + 73), from the UN Comtrade
+          rows (reporter "COMTRADE", comtrade.py) the file was first made from
+"""
+
+from __future__ import annotations
+
+import argparse, time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+import partners
+import trade_cube
+
+ROOT   = Path(__file__).resolve().parents[1]
+OUTDIR = ROOT / "data" / "charts"
+
+
+@dataclass(frozen=True)
+class Chart:
+    name:     str
+    reporter: str                 # trade_cube reporter: "US" | "EU"
+    flows:    tuple[str, ...]
+    layout:   str                 # key of LAYOUTS
+    measure:  str = "value"       # USD measure of the cube: "value" (US) / "value_usd" (EU)
+    top:      int = 0             # "top" layout: partners kept
+    sectors:  tuple[tuple[str, str], ...] = ()   # (cube sector, published sector); others dropped
+    path:     str = ""            # one stacked file under ROOT instead of <year>/<sector>.csv
+
+
+# published sector keys of the legacy top-3 file
+LEGACY_SECTORS = (
+    ("aluminum_76",   "aluminum"),
+    ("cement_2523",   "cement"),
+    ("iron_steel_72", "iron_steel"),
+    ("iron_steel_73", "iron_steel"),
+)
+
+CHARTS: list[Chart] = [
+    Chart("us_exports_map",    "US", ("Export",),          "map"),
+    Chart("us_imports_map",    "US", ("Import",),          "map"),
+    Chart("eu_imports_map",    "EU", ("Import",),          "map",      measure="value_usd"),
+    Chart("us_exports_top3",   "US", ("Export",),          "top",      top=3),
+    Chart("eu_imports_top3",   "EU", ("Import",),          "top",      measure="value_usd", top=3),
+    Chart("eu_trade_partners", "EU", ("Export", "Import"), "partners", measure="value_usd"),
+    Chart("us_exports_top3_legacy", "COMTRADE", ("Export",), "top_legacy", top=3, sectors=LEGACY_SECTORS,
+          path="data/processed/us_exports_hard_to_abate_top3_partners.csv"),
+]
+
+
+# ---------------------------------------------------------------------------
+# Layouts: one period × sector slice (flow, partner, value, quantity_t) → rows
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _iso3() -> pd.Series:
+    dim = partners.table()
+    dim = dim[~dim["aggregate"] & (dim["iso3"] != "")]
+    return dim.drop_duplicates("name").set_index("name")["iso3"]
+
+
+def _map(df: pd.DataFrame, chart: Chart) -> pd.DataFrame:
+    g = df.groupby("partner")["value"].sum()
+    g = g[g.index.isin(_iso3().index)]
+    return (pd.DataFrame({"ISO3": g.index.map(_iso3()), "NAME": g.index, "VALUE": (g / 1e6).round(1)})
+              .sort_values("ISO3"))
+
+
+def _top(df: pd.DataFrame, chart: Chart) -> pd.DataFrame:
+    g = df.groupby("partner")["value"].sum()
+    top = g.sort_values(ascending=False, kind="stable").head(chart.top)
+    total = g.sum()
+    return pd.DataFrame({"partnerDesc": top.index, "value_usd": top.round().astype("int64").to_numpy(),
+                         "year_sector_total": round(total), "share": (top / total).round(4).to_numpy()})
+
+
+def _top_legacy(df: pd.DataFrame, chart: Chart) -> pd.DataFrame:
+    # unrounded, as in the original file
+    g = df.groupby("partner")["value"].sum()
+    top = g.sort_values(ascending=False, kind="stable").head(chart.top)
+    total = g.sum()
+    return pd.DataFrame({"partnerDesc": top.index, "export_value_usd": top.to_numpy(),
+                         "year_sector_total": total, "share": (top / total).to_numpy()})
+
+
+def _partners(df: pd.DataFrame, chart: Chart) -> pd.DataFrame:
+    return (pd.DataFrame({"flow": df["flow"], "partnerDesc": df["partner"],
+                          "trade_value_usd": df["value"].round(), "quantity_mt": df["quantity_t"].round(1)})
+              .sort_values(["flow", "partnerDesc"]))
+
+
+LAYOUTS: dict[str, Callable[[pd.DataFrame, Chart], pd.DataFrame]] = {
+    "map":      _map,
+    "top":      _top,
+    "partners": _partners,
+    "top_legacy": _top_legacy,
+}
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+def frame(cube: trade_cube.Cube, chart: Chart) -> pd.DataFrame:
+    """The chart's slice for all years × sectors: period, sector, flow, partner, value, quantity_t."""
+    by  = ("period", "sector", "flow", "partner")
+    sel = {"reporter": chart.reporter, "flow": list(chart.flows)}
+    df  = pd.concat({"value":      cube.query(chart.measure, by, **sel),
+                     "quantity_t": cube.query("quantity_t", by, **sel)}, axis=1).reset_index()
+    if chart.sectors:
+        df["sector"] = df["sector"].map(dict(chart.sectors))
+        df = df.dropna(subset=["sector"]).groupby(list(by), as_index=False)[["value", "quantity_t"]].sum()
+    return df
+
+
+def _write(path: Path, body: bytes) -> bool:
+    if path.exists() and path.read_bytes() == body:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+    return True
+
+
+def export(charts: list[Chart] = CHARTS, cube: trade_cube.Cube | None = None,
+           outdir: Path | None = None) -> dict[str, tuple[int, int, int]]:
+    """Write every chart × year × sector file; returns {chart: (written, unchanged, removed)}."""
+    cube   = cube or trade_cube.load()
+    outdir = outdir or OUTDIR
+    stats: dict[str, tuple[int, int, int]] = {}
+    for chart in charts:
+        layout = LAYOUTS[chart.layout]
+        if chart.path:
+            stats[chart.name] = _export_file(chart, cube)
+            continue
+        root   = outdir / chart.name
+        keep: set[Path] = set()
+        written = 0
+        for (period, sector), df in frame(cube, chart).groupby(["period", "sector"]):
+            path = root / str(period) / f"{sector}.csv"
+            keep.add(path)
+            written += _write(path, layout(df, chart).to_csv(index=False).encode())
+        stale = [p for p in root.glob("*/*.csv") if p not in keep]
+        for p in stale:
+            p.unlink()
+            if not any(p.parent.iterdir()):
+                p.parent.rmdir()
+        stats[chart.name] = (written, len(keep) - written, len(stale))
+        print(f"  {chart.name:<22} {len(keep):4d} files: {written} written, "
+              f"{len(keep) - written} unchanged, {len(stale)} removed")
+    return stats
+
+
+def _export_file(chart: Chart, cube: trade_cube.Cube) -> tuple[int, int, int]:
+    """One stacked file for every year × sector of a chart with a `path`."""
+    layout = LAYOUTS[chart.layout]
+    out = pd.concat([layout(df, chart).assign(period=period, sector=sector)
+                     for (period, sector), df in frame(cube, chart).groupby(["period", "sector"])],
+                    ignore_index=True)
+    out = out[["period", "sector"] + [c for c in out.columns if c not in ("period", "sector")]]
+    path = ROOT / chart.path
+    written = _write(path, out.to_csv(index=False).encode())
+    print(f"  {chart.name:<22} {path.relative_to(ROOT)}: {'written' if written else 'unchanged'}")
+    return written, 1 - written, 0
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--only", nargs="*", metavar="CHART", help="export only these charts")
+    args = ap.parse_args()
+
+    charts = [c for c in CHARTS if not args.only or c.name in args.only]
+    if args.only and len(charts) < len(args.only):
+        ap.error(f"unknown chart(s); known: {', '.join(c.name for c in CHARTS)}")
+
+    t0 = time.perf_counter()
+    stats = export(charts)
+    print(f"Charts: {sum(w for w, _, _ in stats.values())} files written to {OUTDIR} "
+          f"in {time.perf_counter() - t0:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
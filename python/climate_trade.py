@@ -0,0 +1,128 @@
+"""
+climate-trade — one entry point for every pipeline stage.
+
+  climate-trade <command> [args…]        (or: python python/climate_trade.py …)
+
+Each command names a module and is imported only when run, so `status`,
+`plan` and `--help` start without loading pandas, NumPy or credentials.
+Arguments after the command are passed through to that stage's own parser.
+
+update.sh runs the stages in order through this entry point.
+"""
+
+from __future__ import annotations
+
+import importlib, json, sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# command → (module, help); every module exposes main()
+COMMANDS: dict[str, tuple[str, str]] = {
+    "codes":       ("sectors",                  "compile reference/cbam_scope.csv → docs/data/cbam_codes.json"),
+    "concordance": ("concordance",              "HS/CN concordance rows and codes that may need one"),
+    "fx":          ("fx",                       "refresh ECB EUR/USD monthly rates"),
+    "fetch-eu":    ("fetch_eu_trade_raw",       "annual EU partner trade from Comext (--monthly: all partners)"),
+    "comext-bulk": ("comext_bulk",              "Comext bulk archives → EU partner data, monthly partitions"),
+    "process-eu":  ("build_eu_trade_processed", "EU partner data in USD / tonnes"),
+    "fetch-us":    ("fetch_us_trade_raw",       "annual US partner trade from Census"),
+    "emissions":   ("emissions",                "embedded tCO2e by partner × sector × year"),
+    "rankings":    ("rankings",                 "top-k partners by value and tonnage"),
+    "charts":      ("charts",                   "Datawrapper chart datasets for every year × sector"),
+    "build":       ("build_data",               "docs/data/trade_data.json"),
+    "quality":     ("quality",                  "data-quality checks on trade_data.json"),
+    "prerender":   ("prerender",                "static first paint of docs/index.html from trade_data.json"),
+    "mirror":      ("mirror_trade",             "Census vs Comext mirror gaps"),
+    "exposure":    ("cbam_exposure",            "Monte Carlo CBAM exposure bands"),
+    "comtrade":    ("comtrade",                 "UN Comtrade v1 CSV → partner rows"),
+    "vintages":    ("vintages",                 "record / list / diff published vintages"),
+    "partitions":  ("partitions",               "list period-partitioned datasets"),
+    "perf":        ("perf_gate",                "timing / memory regression gate on fixtures"),
+    "check":       ("releases",                 "probe Census / Comext for a new month (--run: update if so)"),
+}
+
+PLAN_MODULES = ("fetch_us_trade_raw", "fetch_eu_trade_raw", "build_data")
+
+
+# ---------------------------------------------------------------------------
+# Built-in commands (standard library only)
+# ---------------------------------------------------------------------------
+
+def _age(path: Path) -> str:
+    if not path.exists():
+        return "missing"
+    days = (datetime.now() - datetime.fromtimestamp(path.stat().st_mtime)).days
+    return f"{days} d old"
+
+
+def status() -> None:
+    """Latest published periods and freshness of the main artifacts."""
+    trade = ROOT / "docs" / "data" / "trade_data.json"
+    if trade.exists():
+        data = json.loads(trade.read_text())
+        me = max((p for s in data["RAW"].values() for p in s.get("me", {})), default="—")
+        eu = max((p for sectors in data["RAWEU"].values() for s in sectors.values() for p in s), default="—")
+        print(f"trade_data.json   {_age(trade):<10} Census monthly through {me}, Comext through {eu} "
+              f"({', '.join(data['RAWEU'])})")
+    else:
+        print("trade_data.json   missing")
+
+    for label, rel in (("US partner CSV", "data/raw/us_trade_hard_to_abate_partner_raw.csv"),
+                       ("EU partner CSV", "data/raw/eu_trade_hard_to_abate_partner_raw.csv"),
+                       ("CBAM exposure",  "docs/data/cbam_exposure.json")):
+        print(f"{label:<17} {_age(ROOT / rel)}")
+
+    fx_csv = ROOT / "reference" / "fx_eur_usd_monthly.csv"
+    print(f"FX table          {fx_csv.open().readline()[2:].strip() if fx_csv.exists() else 'missing'}")
+
+    runs = sorted((ROOT / "data" / "vintages" / "runs").glob("*.json"))
+    print(f"vintages          {len(runs)} runs, latest {runs[-1].stem if runs else '—'}")
+
+    metrics = ROOT / "data" / "run_metrics.csv"
+    n = sum(1 for _ in metrics.open()) - 1 if metrics.exists() else 0
+    print(f"request metrics   {n} logged")
+
+
+def plan() -> None:
+    """--plan for all three fetch scripts."""
+    import fetch_plan
+    for name in PLAN_MODULES:
+        fetch_plan.report(name, importlib.import_module(name).plan())
+        print()
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def _usage() -> str:
+    lines = ["usage: climate-trade <command> [args…]", "", "commands:"]
+    lines += [f"  {'status':<12} latest periods and file freshness",
+              f"  {'plan':<12} dry-run request plan for fetch-us, fetch-eu and build"]
+    lines += [f"  {cmd:<12} {help_}" for cmd, (_, help_) in COMMANDS.items()]
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(_usage())
+        return
+
+    cmd, rest = argv[0], argv[1:]
+    if cmd == "status":
+        status()
+    elif cmd == "plan":
+        plan()
+    elif cmd in COMMANDS:
+        module = COMMANDS[cmd][0]
+        sys.argv = [f"climate-trade {cmd}", *rest]
+        importlib.import_module(module).main()
+    else:
+        print(f"unknown command {cmd!r}\n\n{_usage()}")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
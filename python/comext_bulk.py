@@ -0,0 +1,367 @@
+"""
+Comext bulk-file ingestion — alternative to the per-batch SDMX API calls.
+
+Eurostat publishes the complete Comext dataset as one file per month
+(full_v2_YYYYMM.7z, annual totals as full_v2_YYYY52.7z): every EU member
+state reporter × partner × CN8 product × flow × statistical procedure.
+This module streams locally downloaded archives in one sequential pass and
+keeps only the CBAM CN codes, replacing both API rounds:
+
+  fetch_eu_trade_raw.py          annual EU27 partner rows (sectors × flows × batches)
+  build_data.py (Comext part)    monthly EU27 imports per partner (RAWEU)
+
+Each archive is read in row chunks with the seven columns used, at fixed
+dtypes.  CN8 codes are matched against a prefix index compiled once from
+sectors.CN_CODES (the regulation lists codes at 4, 6 or 8 digits), per
+distinct code rather than per row.  Rows are summed over the EU27 reporters
+and statistical procedures, keeping extra-EU partners only, which is what the
+API's EU27_2020 declarant returns.  Memory is bounded by the chunk size plus
+one month of aggregated rows.
+
+.zip, .gz and plain .dat/.csv files are read with the standard library; .7z
+archives are streamed through the 7z command (p7zip) if it is installed.
+Both bulk layouts are accepted (v2: REPORTER, VALUE_EUR, QUANTITY_KG; v1:
+DECLARANT_ISO, PARTNER_ISO, VALUE_IN_EUROS, QUANTITY_IN_KG).
+
+Output: data/partitions/eu_partner/<flow>/YYYYMM.csv.gz   (every partner, every month)
+          Columns: sector, partner_id, value_eur, quantity_kg
+        data/raw/eu_trade_hard_to_abate_partner_raw.csv  (years covered by the archives
+          are replaced; same schema as fetch_eu_trade_raw.py)
+
+build_data.py --comext-bulk takes RAWEU from the eu_partner partitions
+instead of calling the Comext API.
+
+Usage:
+  python python/comext_bulk.py ~/Downloads/comext/full_v2_2024*.7z
+  python python/comext_bulk.py --check      # offline: fixture archives, bulk vs API path
+"""
+
+from __future__ import annotations
+
+import argparse, gzip, io, shutil, subprocess, sys, tempfile, time, zipfile
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+import concordance
+import partitions
+import partners
+import units
+from fetch_eu_trade_raw import OUT_CSV, FLOW_CODES, MONTHLY_DATASET as DATASET, aggregate, clean_df, write_month
+from sectors import CN_CODES, COMEXT_GROUPS, SCOPE
+
+ROOT    = Path(__file__).resolve().parents[1]
+
+# canonical column → bulk header names, in order of preference
+FIELDS: dict[str, tuple[str, ...]] = {
+    "reporter": ("REPORTER", "DECLARANT_ISO"),
+    "partner":  ("PARTNER_ISO", "PARTNER"),
+    "product":  ("PRODUCT_NC",),
+    "flow":     ("FLOW",),
+    "period":   ("PERIOD",),
+    "value":    ("VALUE_EUR", "VALUE_IN_EUROS"),
+    "kg":       ("QUANTITY_KG", "QUANTITY_IN_KG"),
+}
+DTYPES: dict[str, str] = {
+    "reporter": "category", "partner": "category", "product": "category",
+    "flow": "int8", "period": "category", "value": "float64", "kg": "float64",
+}
+FLOW_NAMES = {int(code): name for name, code in FLOW_CODES.items()}
+KEYS       = ["period", "flow", "sector", "partner_id"]
+CHUNK_ROWS = 500_000
+
+
+# ---------------------------------------------------------------------------
+# CN prefix index
+# ---------------------------------------------------------------------------
+
+PREFIX_INDEX: dict[str, str] = {code: v["sector"] for code, v in SCOPE["cn"].items()}
+_LENGTHS = sorted({len(c) for c in PREFIX_INDEX}, reverse=True)
+
+
+@lru_cache(maxsize=None)
+def sector_of(cn8: str) -> Optional[str]:
+    """CN_CODES sector of a CN8 code (longest listed prefix), or None outside CBAM."""
+    for n in _LENGTHS:
+        sector = PREFIX_INDEX.get(cn8[:n])
+        if sector:
+            return sector
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def _open(path: Path) -> Iterator[io.TextIOBase]:
+    """Text stream of the single data file inside an archive."""
+    if path.suffix == ".7z":
+        exe = shutil.which("7z") or shutil.which("7za") or shutil.which("7zz")
+        if exe is None:
+            raise RuntimeError(f"{path.name}: streaming .7z needs the 7z command (p7zip); "
+                               "install it or extract the .dat file first")
+        proc = subprocess.Popen([exe, "x", "-so", str(path)], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL)
+        try:
+            yield io.TextIOWrapper(proc.stdout, encoding="utf-8", errors="replace")
+        finally:
+            proc.stdout.close()
+            proc.wait()
+    elif path.suffix == ".zip":
+        with zipfile.ZipFile(path) as zf:
+            member = next(m for m in zf.namelist() if not m.endswith("/"))
+            with zf.open(member) as fh:
+                yield io.TextIOWrapper(fh, encoding="utf-8", errors="replace")
+    elif path.suffix == ".gz":
+        with gzip.open(path, "rt", encoding="utf-8", errors="replace") as fh:
+            yield fh
+    else:
+        with path.open(encoding="utf-8", errors="replace") as fh:
+            yield fh
+
+
+def read(path: Path, chunksize: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield column-pruned, typed chunks of one bulk file, with canonical column names."""
+    with _open(path) as fh:
+        header = fh.readline().rstrip("\r\n")
+        sep    = max((",", ";", "\t", "|"), key=header.count)
+        cols   = header.split(sep)
+        names: dict[str, str] = {}
+        for field, options in FIELDS.items():
+            src = next((c for c in options if c in cols), None)
+            if src is None:
+                raise ValueError(f"{path.name}: no {' / '.join(options)} column in header")
+            names[src] = field
+        reader = pd.read_csv(fh, sep=sep, header=None, names=cols, usecols=list(names),
+                             dtype={src: DTYPES[f] for src, f in names.items()}, chunksize=chunksize)
+        for chunk in reader:
+            yield chunk.rename(columns=names)
+
+
+# ---------------------------------------------------------------------------
+# Processing
+# ---------------------------------------------------------------------------
+
+def process(df: pd.DataFrame) -> pd.DataFrame:
+    """One typed chunk → EU27 extra-EU rows summed per period × flow × sector × partner."""
+    df = df[df["reporter"].isin(partners.eu27_comext_codes()) & df["flow"].isin(list(FLOW_NAMES))]
+    df = concordance.remap(df, "product", "period", "cn", ("value", "kg"))
+    sector = df["product"].astype(str).map(sector_of)
+    df, sector = df[sector.notna()], sector[sector.notna()]
+
+    pid = partners.comext_ids(df["partner"])
+    dim = partners.table()
+    out = pd.DataFrame({
+        "period":      df["period"].astype(str),
+        "flow":        df["flow"].map(FLOW_NAMES),
+        "sector":      sector,
+        "partner_id":  pid,
+        "value_eur":   units.whole(df["value"]),
+        "quantity_kg": units.whole(df["kg"]),
+    })[~pid.map(dim["aggregate"] | dim["eu27"]).astype(bool)]
+    return out.groupby(KEYS, as_index=False).sum()
+
+
+def _sum(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    if not frames:
+        return pd.DataFrame(columns=KEYS + ["value_eur", "quantity_kg"])
+    return pd.concat(frames, ignore_index=True).groupby(KEYS, as_index=False).sum()
+
+
+def ingest(paths: list[Path], on_month: Callable[[str, pd.DataFrame], None],
+           chunksize: int = CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Stream every archive once.  Monthly periods are handed to on_month as they
+    complete; returns annual rows for the years that are complete (all twelve
+    months, or a YYYY52 annual file, which takes precedence).
+    """
+    months: dict[str, list[pd.DataFrame]] = {}
+    annual: dict[str, pd.DataFrame] = {}
+
+    for path in sorted(paths):
+        t0 = time.perf_counter()
+        print(f"  {path.name} … ", end="", flush=True)
+        n, parts = 0, []
+        for chunk in read(path, chunksize):
+            n += len(chunk)
+            parts.append(process(chunk))
+        agg = _sum(parts)
+        for period, rows in agg.groupby("period"):
+            if period.endswith("52"):
+                annual[period[:4]] = rows.assign(period=period[:4])
+            else:
+                on_month(period, rows)
+                months.setdefault(period[:4], []).append(rows.assign(period=period[:4]))
+        print(f"{n:,} rows → {len(agg):,} CBAM partner rows ({time.perf_counter() - t0:.1f} s)")
+
+    for year, frames in months.items():
+        if year not in annual and len(frames) == 12:
+            annual[year] = _sum(frames)
+    return _sum(list(annual.values()))
+
+
+def partner_rows(annual: pd.DataFrame) -> pd.DataFrame:
+    """Annual bulk rows in the layout of fetch_eu_trade_raw.py's output."""
+    out = pd.DataFrame({
+        "period":         annual["period"].astype(int),
+        "flow":           annual["flow"],
+        "sector":         annual["sector"],
+        "partner_id":     annual["partner_id"].astype("int16"),
+        "partnerDesc":    partners.attribute(annual["partner_id"], "name"),
+        "primaryValue":   annual["value_eur"].astype(float),
+        "quantity_100kg": annual["quantity_kg"] / 100,
+    })
+    order = {s: i for i, s in enumerate(CN_CODES)}
+    return (out.assign(_s=out["sector"].map(order))
+               .sort_values(["_s", "flow", "period", "partner_id"]).drop(columns="_s")
+               .reset_index(drop=True))
+
+
+def raweu(partner_codes: list[str] = ("US",), since: str = "202201") -> dict[str, dict[str, dict[str, list]]]:
+    """RAWEU ({partner: {sector: {YYYYMM: [eur, tonnes]}}}, EU27 imports) from the partitions."""
+    df = partitions.read(DATASET, "Import", only=[p for p in partitions.periods(DATASET, "Import") if p >= since])
+    if df.empty:
+        return {}
+    group = {s: key for key, members in COMEXT_GROUPS.items() for s in members}
+    code  = {partners.comext_id(c): c for c in partner_codes}
+    df = df[df["partner_id"].isin(list(code))]
+    g  = (df.assign(partner=df["partner_id"].map(code), key=df["sector"].map(group))
+            .groupby(["partner", "key", "period"])[["value_eur", "quantity_kg"]].sum())
+    out: dict[str, dict[str, dict[str, list]]] = {}
+    for (partner, key, period), (eur, kg) in g.iterrows():
+        out.setdefault(partner, {}).setdefault(key, {})[str(period)] = [int(eur), units.tonnes(int(kg))]
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Offline check: fixture archives through both paths
+# ---------------------------------------------------------------------------
+
+V2_HEADER = ["REPORTER", "PARTNER", "TRADE_TYPE", "PRODUCT_NC", "FLOW", "STAT_PROCEDURE",
+             "SUPPL_UNIT", "PERIOD", "VALUE_EUR", "VALUE_NAC", "QUANTITY_KG", "QUANTITY_SUPPL_UNIT"]
+
+
+def fixture(outdir: Path, year: int = 2024, rows: int = 4000, seed: int = 2026) -> pd.DataFrame:
+    """Write twelve small full_v2_YYYYMM.zip archives; returns all their rows."""
+    rng  = np.random.default_rng(seed)
+    cn8  = [c.ljust(8, "0") if len(c) < 8 else c for c in PREFIX_INDEX] + ["72085120", "31021019"]
+    cn8 += ["84713000", "27090090", "39011010", "87032319"]          # outside CBAM
+    reporters = ["DE", "FR", "IT", "NL", "EL", "PL", "XI"]            # XI: not an EU27 reporter
+    partner_codes = ["US", "CN", "TR", "IN", "UA", "GB", "DE", "FR"]  # DE/FR: intra-EU
+    frames = []
+    for month in range(1, 13):
+        n  = rows
+        df = pd.DataFrame({
+            "REPORTER":       rng.choice(reporters, n),
+            "PARTNER":        rng.choice(partner_codes, n),
+            "TRADE_TYPE":     "E",
+            "PRODUCT_NC":     rng.choice(cn8, n),
+            "FLOW":           rng.choice([1, 2], n),
+            "STAT_PROCEDURE": rng.choice([1, 2, 3], n),
+            "SUPPL_UNIT":     "NAR",
+            "PERIOD":         f"{year}{month:02d}",
+            "VALUE_EUR":      rng.lognormal(10, 2, n).round().astype(int),
+            "VALUE_NAC":      0,
+            "QUANTITY_KG":    rng.lognormal(8, 2, n).round().astype(int),
+            "QUANTITY_SUPPL_UNIT": 0,
+        })[V2_HEADER]
+        name = f"full_v2_{year}{month:02d}"
+        with zipfile.ZipFile(outdir / f"{name}.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(f"{name}.dat", df.to_csv(index=False))
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _sdmx(rows: pd.DataFrame, codes: list[str], flow_code: str) -> pd.DataFrame:
+    """What the API returns for a batch: EU27 declarant, annual, at regulation code level."""
+    rows = rows[rows["REPORTER"].isin(partners.eu27_comext_codes()) & (rows["FLOW"] == int(flow_code))]
+    code = pd.Series(pd.NA, index=rows.index, dtype="object")
+    for c in codes:
+        code = code.mask(rows["PRODUCT_NC"].str.startswith(c), c)
+    rows = rows.assign(PRODUCT=code, TIME_PERIOD=rows["PERIOD"].str[:4]).dropna(subset=["PRODUCT"])
+    g = rows.groupby(["PARTNER", "PRODUCT", "TIME_PERIOD"], as_index=False)[["VALUE_EUR", "QUANTITY_KG"]].sum()
+    return pd.concat([
+        g.assign(INDICATORS="VALUE_IN_EUROS", OBS_VALUE=g["VALUE_EUR"]),
+        g.assign(INDICATORS="QUANTITY_IN_100KG", OBS_VALUE=g["QUANTITY_KG"] / 100),
+    ])[["PARTNER", "PRODUCT", "TIME_PERIOD", "INDICATORS", "OBS_VALUE"]]
+
+
+def check() -> bool:
+    """Run fixture archives through the bulk path and the API path; True if they agree."""
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = fixture(Path(tmp))
+        months: dict[str, pd.DataFrame] = {}
+        annual = partner_rows(ingest(sorted(Path(tmp).glob("*.zip")),
+                                     lambda p, df: months.__setitem__(p, df), chunksize=5000))
+
+    api = aggregate([clean_df(_sdmx(rows, codes, flow_code), flow_name, sector)
+                     for sector, codes in CN_CODES.items() for flow_name, flow_code in FLOW_CODES.items()])
+    key = ["period", "flow", "sector", "partner_id"]
+    both = annual.merge(api, on=key, how="outer", suffixes=("_bulk", "_api"), indicator=True)
+    ok_rows  = (both["_merge"] == "both").all()
+    ok_value = (both["primaryValue_bulk"] == both["primaryValue_api"]).all()
+    ok_qty   = (both["quantity_100kg_bulk"] == both["quantity_100kg_api"]).all()
+
+    us = rows[(rows["PARTNER"] == "US") & (rows["FLOW"] == 1)
+              & rows["REPORTER"].isin(partners.eu27_comext_codes())]
+    us = us[us["PRODUCT_NC"].map(sector_of).notna()]
+    monthly_total = sum(df.loc[(df["flow"] == "Import") & (df["partner_id"] == partners.comext_id("US")),
+                               "value_eur"].sum() for df in months.values())
+    ok_month = len(months) == 12 and monthly_total == us["VALUE_EUR"].sum()
+
+    print(f"  annual partner rows: {len(annual):,} bulk vs {len(api):,} API — "
+          f"keys {'match' if ok_rows else 'DIFFER'}, values {'match' if ok_value else 'DIFFER'}, "
+          f"quantities {'match' if ok_qty else 'DIFFER'}")
+    print(f"  monthly: {len(months)} periods, US imports {'match' if ok_month else 'DIFFER'}")
+    return bool(ok_rows and ok_value and ok_qty and ok_month)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Ingest Comext bulk archives (CBAM CN codes only).")
+    ap.add_argument("paths", nargs="*", type=Path, help="archives, or directories containing them")
+    ap.add_argument("--check", action="store_true", help="offline self-check on fixture archives")
+    ap.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows per chunk")
+    args = ap.parse_args()
+
+    if args.check:
+        sys.exit(0 if check() else 1)
+
+    files = sorted(f for p in args.paths
+                   for f in ([p] if p.is_file() else p.glob("full*")) if f.is_file())
+    if not files:
+        ap.error("no bulk archives given")
+
+    written = 0
+    def on_month(period: str, rows: pd.DataFrame) -> None:
+        nonlocal written
+        for flow in FLOW_NAMES.values():
+            written += write_month(flow, period, rows[rows["flow"] == flow])
+
+    print(f"Comext bulk: {len(files)} files")
+    annual = ingest(files, on_month, args.chunk)
+    print(f"  partitions: {written} written/changed in {partitions.STORE / DATASET}")
+
+    if annual.empty:
+        print("No complete years in the archives — annual CSV left unchanged.")
+        return
+    out = partner_rows(annual)
+    years = set(out["period"])
+    if OUT_CSV.exists():
+        old = pd.read_csv(OUT_CSV)
+        out = pd.concat([old[~old["period"].isin(years)], out], ignore_index=True)
+    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+    out.to_csv(OUT_CSV, index=False)
+    print(f"Saved: {OUT_CSV}  ({len(out):,} rows; replaced years {', '.join(map(str, sorted(years)))})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+UN Comtrade v1 source adapter.
+
+Reads a Comtrade "final data" CSV (48 columns, typeCode … sector) keeping only
+the columns the pipeline uses, with fixed dtypes, resolves partnerISO to
+partner_id through partners.py and hands the rows to the same aggregation
+step as the Census data (fetch_us_trade_raw.aggregate_partners), so the
+output has the layout of us_trade_hard_to_abate_partner_raw.csv.
+
+Large multi-year / multi-reporter dumps are read in row chunks; each chunk is
+aggregated on its own and the partial sums are added up at the end, so memory
+is bounded by the chunk size plus the (small) aggregated result.
+
+Comtrade rows are at HS chapter/heading level (72, 73, 76, 2523), so the
+sectors cover whole chapters rather than the CBAM HS6 list used for Census.
+Quantity is netWgt in kg, falling back to qty where the unit is kg.
+
+Input:  data/raw/us_exports_hard_to_abate_comtrade_v1_raw.csv
+Output: data/processed/us_trade_comtrade_partner.csv
+        Columns: period, flow, sector, partner_id, partnerDesc, primaryValue, quantity_kg
+"""
+
+from __future__ import annotations
+
+import argparse, time
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+import partners
+from fetch_us_trade_raw import PARTNER_KEYS, aggregate_partners
+
+ROOT    = Path(__file__).resolve().parents[1]
+RAW_CSV = ROOT / "data" / "raw" / "us_exports_hard_to_abate_comtrade_v1_raw.csv"
+OUT     = ROOT / "data" / "processed" / "us_trade_comtrade_partner.csv"
+
+# The only columns read from the 48 in the file
+DTYPES: dict[str, str] = {
+    "period":       "int16",
+    "reporterISO":  "category",
+    "flowDesc":     "category",
+    "partnerISO":   "category",
+    "cmdCode":      "category",
+    "qtyUnitAbbr":  "category",
+    "qty":          "float64",
+    "netWgt":       "float64",
+    "primaryValue": "float64",
+}
+
+# Comtrade commodity code → Census sector key
+CMD_SECTOR: dict[str, str] = {
+    "72":   "iron_steel_72",
+    "73":   "iron_steel_73",
+    "76":   "aluminum_76",
+    "2523": "cement_2523",
+    "2804": "hydrogen_2804",
+    "31":   "fertilizers",
+}
+
+CHUNK_ROWS = 200_000
+
+
+def read(path: Path = RAW_CSV, chunksize: int | None = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield column-pruned, typed frames (one if chunksize is None)."""
+    reader = pd.read_csv(path, usecols=list(DTYPES), dtype=DTYPES, chunksize=chunksize)
+    yield from ([reader] if chunksize is None else reader)
+
+
+def process(df: pd.DataFrame, reporter: str = "USA") -> pd.DataFrame:
+    """One typed Comtrade frame → partner-level rows for one reporter."""
+    df = df[df["reporterISO"] == reporter]
+    kg = df["netWgt"].fillna(0)
+    kg = kg.mask((kg == 0) & (df["qtyUnitAbbr"] == "kg"), df["qty"]).fillna(0)
+
+    return aggregate_partners(pd.DataFrame({
+        "period":       df["period"],
+        "flow":         df["flowDesc"].astype(str),
+        "sector":       df["cmdCode"].astype(str).map(CMD_SECTOR),
+        "partner_id":   partners.comtrade_ids(df["partnerISO"]),
+        "primaryValue": df["primaryValue"],
+        "quantity_kg":  kg,
+    }))
+
+
+def load(path: Path = RAW_CSV, reporter: str = "USA", chunksize: int | None = CHUNK_ROWS) -> pd.DataFrame:
+    parts = [process(chunk, reporter) for chunk in read(path, chunksize)]
+    out = pd.concat(parts, ignore_index=True)
+    return out.groupby(PARTNER_KEYS, as_index=False).sum().sort_values(PARTNER_KEYS, ignore_index=True)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("path", nargs="?", type=Path, default=RAW_CSV)
+    ap.add_argument("--reporter", default="USA", help="Comtrade reporterISO to keep")
+    ap.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows read per chunk")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    out = load(args.path, args.reporter, args.chunk)
+    print(f"Comtrade {args.path.name}: {len(out):,} partner rows in {time.perf_counter() - t0:.2f} s")
+
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+    out.to_csv(OUT, index=False)
+    print(f"Saved: {OUT}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+HS / CN nomenclature concordance onto the reference scope of sectors.py.
+
+The CBAM scope (reference/cbam_scope.csv) is written in the nomenclature of
+EU IR 2025/2620.  Series reach back to 2019, across the HS2017 → HS2022
+revision and the yearly CN updates, so a code that was split, merged or
+renumbered would otherwise drop out of (or leak into) older years.
+
+reference/hs_concordance.csv lists those codes, one row per source code ×
+validity window × reference code:
+
+  level       hs6 (Census) or cn (Comext, code at any digit level)
+  code        code as reported in first_year … last_year
+  ref_code    code in the reference nomenclature it is counted as
+  weight      share of value and quantity moved to ref_code (splits: < 1)
+
+Codes without a row map to themselves.  A row whose ref_code is its own code
+(weight 1) records a series gap that was checked and is not a code change —
+thin trade — so the report below stops listing it; remap() ignores it.
+remap() applies the table to a frame
+in one merge (no per-row logic) before classification, in
+fetch_us_trade_raw.process / process_eu, fetch_eu_trade_raw.clean_df,
+build_data's Comext aggregation and comext_bulk.process; source_codes() adds
+the predecessors of the reference codes to the Comext request lists, so
+backfills of old years ask for the codes those years were reported under.
+
+Usage:
+  python python/concordance.py      # rows per level, and in-scope codes whose
+                                    # series start or stop inside the raw data
+                                    # span without a concordance row
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import units
+from sectors import HEADING_TO_SECTOR
+
+ROOT            = Path(__file__).resolve().parents[1]
+CONCORDANCE_CSV = ROOT / "reference" / "hs_concordance.csv"
+EU27_CSV        = ROOT / "data" / "raw" / "us_eu27_trade_raw.csv"
+COMEXT_CN_CSV   = ROOT / "data" / "raw" / "comext_us_cbam_trade_by_year.csv"
+
+LEVELS = ("hs6", "cn")
+
+
+@lru_cache(maxsize=None)
+def _rows(level: str) -> pd.DataFrame:
+    if level not in LEVELS:
+        raise ValueError(f"level must be one of {LEVELS}, not {level!r}")
+    df = pd.read_csv(CONCORDANCE_CSV, dtype={"code": str, "ref_code": str}, comment="#")
+    return df[df["level"] == level]
+
+
+@lru_cache(maxsize=None)
+def table(level: str) -> pd.DataFrame:
+    """Mapping rows of one level (code, first_year, last_year, ref_code, weight)."""
+    df = _rows(level)
+    df = df[df["code"] != df["ref_code"]]
+    return pd.DataFrame({
+        "_code":  df["code"],
+        "_first": df["first_year"].astype(int),
+        "_last":  df["last_year"].astype(int),
+        "_ref":   df["ref_code"],
+        "_w":     df["weight"].astype(float),
+    }).reset_index(drop=True)
+
+
+def reviewed(level: str) -> set[str]:
+    """Codes checked and kept as they are (rows mapping a code to itself)."""
+    df = _rows(level)
+    return set(df.loc[df["code"] == df["ref_code"], "code"])
+
+
+def remap(df: pd.DataFrame, code_col: str, year, level: str,
+          value_cols: tuple[str, ...] = ()) -> pd.DataFrame:
+    """
+    Codes in df[code_col] → reference codes for the year of each row.
+
+    year is a column name (int years, or periods starting with YYYY) or one
+    year for the whole frame.  A split code yields one row per reference code
+    with value_cols scaled by its weight.  Integer columns stay int64: each
+    piece is rounded and the rounding remainder goes to the largest share, so
+    the pieces add up to round(value × total weight) — for a full split, the
+    source value exactly.  Frames without any listed code are returned
+    unchanged (same object), which is the common case.
+    """
+    conc = table(level)
+    if conc.empty or not df[code_col].isin(conc["_code"]).any():
+        return df
+
+    years = (pd.to_numeric(df[year].astype(str).str[:4], errors="coerce") if isinstance(year, str)
+             else pd.Series(int(year), index=df.index))
+    m = (df.assign(_row=np.arange(len(df)), _year=years.to_numpy())
+           .merge(conc, left_on=code_col, right_on="_code", how="left"))
+    hit  = m["_ref"].notna() & m["_year"].between(m["_first"], m["_last"])
+    keep = hit | (~hit.groupby(m["_row"]).transform("any") & ~m["_row"].duplicated())
+    m, hit = m[keep], hit[keep]
+
+    m[code_col] = m["_ref"].where(hit, m[code_col])
+    w   = m["_w"].where(hit, 1.0)
+    row = m["_row"]
+    largest = m.index.isin(w.groupby(row).idxmax())      # one piece per source row
+    for c in value_cols:
+        if not pd.api.types.is_integer_dtype(df[c]):
+            m[c] = m[c] * w
+            continue
+        pieces = units.whole(m[c] * w)
+        target = units.whole(m[c] * w.groupby(row).transform("sum"))
+        m[c]   = pieces + (target - pieces.groupby(row).transform("sum")).where(largest, 0)
+    return m[list(df.columns)].reset_index(drop=True)
+
+
+def classify_hs6(df: pd.DataFrame, code_col: str, year,
+                 value_cols: tuple[str, ...] = ()) -> pd.DataFrame:
+    """remap() HS6 codes, then keep CBAM rows with their sector (exact HS6, then HS4 prefix)."""
+    df = remap(df, code_col, year, "hs6", value_cols)
+    codes  = df[code_col].astype(str)
+    sector = codes.map(HEADING_TO_SECTOR).fillna(codes.str[:4].map(HEADING_TO_SECTOR))
+    return df[sector.notna()].assign(sector=sector[sector.notna()])
+
+
+def source_codes(ref_codes: list[str], level: str) -> list[str]:
+    """ref_codes plus every code that maps onto one of them, in request order."""
+    conc  = table(level)
+    extra = conc.loc[conc["_ref"].isin(ref_codes), "_code"]
+    return list(dict.fromkeys([*ref_codes, *extra]))
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def candidates(df: pd.DataFrame, code_col: str, level: str) -> pd.DataFrame:
+    """Codes whose years do not cover the frame's span and have no concordance row."""
+    span  = df["year"].min(), df["year"].max()
+    years = df.groupby(code_col)["year"].agg(["min", "max", "nunique"])
+    odd   = years[(years["min"] > span[0]) | (years["max"] < span[1])]
+    return odd[~odd.index.isin(table(level)["_code"]) & ~odd.index.isin(reviewed(level))]
+
+
+def main() -> None:
+    for level in LEVELS:
+        print(f"{level}: {len(table(level))} concordance rows, {len(reviewed(level))} reviewed codes")
+
+    if EU27_CSV.exists():
+        df = pd.read_csv(EU27_CSV, dtype={"hs6": str}).rename(columns={"period": "year"})
+        odd = candidates(df[df["primaryValue"] > 0], "hs6", "hs6")
+        print(f"\nCensus HS6 ({EU27_CSV.name}, {df['year'].min()}–{df['year'].max()}): "
+              f"{len(odd)} codes start or stop inside the span")
+        for code, r in odd.iterrows():
+            print(f"  {code}  {r['min']}–{r['max']}  ({r['nunique']} years)")
+
+    if COMEXT_CN_CSV.exists():
+        wide = pd.read_csv(COMEXT_CN_CSV, dtype={"cn_code": str})
+        cols = [c for c in wide.columns if c.startswith("tonnes_")]
+        df = (wide.melt(id_vars="cn_code", value_vars=cols, var_name="year", value_name="t")
+                  .assign(year=lambda d: d["year"].str[7:].astype(int)))
+        odd = candidates(df[df["t"] > 0], "cn_code", "cn")
+        print(f"\nComext CN ({COMEXT_CN_CSV.name}, {df['year'].min()}–{df['year'].max()}): "
+              f"{len(odd)} codes start or stop inside the span")
+        for code, r in odd.iterrows():
+            print(f"  {code}  {r['min']}–{r['max']}  ({r['nunique']} years)")
+
+    print("\nA gap can be thin trade rather than a code change — check the "
+          "HS / CN correlation tables before adding a row.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Runtime configuration, resolved on first use.
+
+Nothing here runs at import: the project .env is read and CENSUS_API_KEY is
+validated only when a Census request actually needs the key, so every module
+can be imported (for tests, benchmarks, --plan, status) without credentials.
+"""
+
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@lru_cache(maxsize=None)
+def _env() -> None:
+    from dotenv import load_dotenv
+    load_dotenv(ROOT / ".env")
+
+
+def census_key() -> str:
+    """CENSUS_API_KEY from the environment or .env; raises if unset."""
+    _env()
+    key = os.getenv("CENSUS_API_KEY", "")
+    if not key:
+        raise RuntimeError("CENSUS_API_KEY not found — add it to the project .env file")
+    return key
@@ -0,0 +1,139 @@
+"""
+Estimate embedded emissions (tCO2e) by reporter × partner × sector × year × flow.
+
+Joins the tonnage in the two partner-level CSVs to the EU ETS product
+benchmarks in reference/cbamBenchmarks.js:
+
+  data/raw/us_trade_hard_to_abate_partner_raw.csv   quantity_kg     (Census)
+  data/raw/eu_trade_hard_to_abate_partner_raw.csv   quantity_100kg  (Comext)
+
+The partner CSVs are aggregated to sector level, so the benchmark index is
+built once at CN/HS-code level (every code in the CBAM scope → its benchmark)
+and collapsed to one intensity per sector, weighted by the CN-level tonnage
+of EU imports from the US in data/raw/comext_us_cbam_trade_by_year.csv.
+Both CSVs are then stacked, converted to tonnes with a per-source unit factor
+and multiplied by the sector intensity in one vectorized pass.
+
+Benchmarks are best-practice intensities, so the result is a lower bound on
+actual embedded emissions.
+
+Output: data/processed/embedded_emissions.csv
+        Columns: reporter, period, flow, sector, partner_id, partnerDesc, quantity_t,
+                 intensity_tco2e_t, embedded_tco2e
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from sectors import BENCHMARK, CN_CODES
+
+ROOT       = Path(__file__).resolve().parents[1]
+US_CSV     = ROOT / "data" / "raw" / "us_trade_hard_to_abate_partner_raw.csv"
+EU_CSV     = ROOT / "data" / "raw" / "eu_trade_hard_to_abate_partner_raw.csv"
+WEIGHT_CSV = ROOT / "data" / "raw" / "comext_us_cbam_trade_by_year.csv"
+OUT        = ROOT / "data" / "processed" / "embedded_emissions.csv"
+
+# source file → (reporter, quantity column, factor to tonnes)
+SOURCES: dict[str, tuple[Path, str, float]] = {
+    "US": (US_CSV, "quantity_kg",    1 / 1000),
+    "EU": (EU_CSV, "quantity_100kg", 1 / 10),
+}
+
+
+# ---------------------------------------------------------------------------
+# Benchmark index
+# ---------------------------------------------------------------------------
+
+def code_index() -> pd.DataFrame:
+    """One row per CBAM code: sector, code, benchmark, tonnage weight."""
+    rows = [(sector, code, BENCHMARK[code])
+            for sector, codes in CN_CODES.items() for code in codes]
+    idx = pd.DataFrame(rows, columns=["sector", "code", "benchmark"])
+
+    if WEIGHT_CSV.exists():
+        w = pd.read_csv(WEIGHT_CSV, dtype={"cn_code": str}, usecols=["cn_code", "avg_tonnes"])
+        idx = idx.merge(w.rename(columns={"cn_code": "code", "avg_tonnes": "weight"}),
+                        on="code", how="left")
+    else:
+        idx["weight"] = 0.0
+    idx["weight"] = idx["weight"].fillna(0.0)
+    return idx.dropna(subset=["benchmark"])
+
+
+def sector_intensity() -> pd.Series:
+    """Tonnage-weighted benchmark per sector (simple mean where no weights)."""
+    idx = code_index()
+    g   = idx.assign(wb=idx["benchmark"] * idx["weight"]).groupby("sector")
+    weighted = g["wb"].sum() / g["weight"].sum()
+    return weighted.where(g["weight"].sum() > 0, g["benchmark"].mean()).rename("intensity_tco2e_t")
+
+
+# ---------------------------------------------------------------------------
+# Pipeline stage
+# ---------------------------------------------------------------------------
+
+def estimate(intensity: pd.Series | None = None) -> pd.DataFrame:
+    if intensity is None:
+        intensity = sector_intensity()
+
+    frames: list[pd.DataFrame] = []
+    for reporter, (path, qty_col, factor) in SOURCES.items():
+        if not path.exists():
+            print(f"  WARNING: {path} not found — skipping {reporter}")
+            continue
+        df = pd.read_csv(path, usecols=["period", "flow", "sector", "partner_id", "partnerDesc", qty_col])
+        df = df.rename(columns={qty_col: "quantity"})
+        df["reporter"] = reporter
+        df["factor"]   = factor
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+    df["quantity_t"]        = pd.to_numeric(df["quantity"], errors="coerce").fillna(0) * df["factor"]
+    df["intensity_tco2e_t"] = df["sector"].map(intensity)
+    df["embedded_tco2e"]    = df["quantity_t"] * df["intensity_tco2e_t"]
+
+    out = (
+        df[df["intensity_tco2e_t"].notna()]
+          .groupby(["reporter", "period", "flow", "sector", "partner_id", "partnerDesc"], as_index=False)
+          .agg(quantity_t=("quantity_t", "sum"),
+               intensity_tco2e_t=("intensity_tco2e_t", "first"),
+               embedded_tco2e=("embedded_tco2e", "sum"))
+    )
+    out["quantity_t"]        = out["quantity_t"].round(1)
+    out["intensity_tco2e_t"] = out["intensity_tco2e_t"].round(4)
+    out["embedded_tco2e"]    = out["embedded_tco2e"].round(1)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    t0 = time.perf_counter()
+    intensity = sector_intensity()
+    out = estimate(intensity)
+    elapsed = time.perf_counter() - t0
+
+    if out.empty:
+        print("No partner CSVs found — run the fetch scripts first.")
+        return
+
+    print("Sector intensities (tCO2e/t):")
+    for sector, v in intensity.items():
+        print(f"  {sector:<15} {v:.3f}")
+
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+    out.to_csv(OUT, index=False)
+    print(f"\nSaved: {OUT}  ({len(out):,} rows, {elapsed*1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
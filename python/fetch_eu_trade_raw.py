@@ -6,26 +6,60 @@ URL path: /A.{DECLARANT}..{PRODUCT}.{FLOW}./
   Empty PARTNER slot = all extra-EU partners.
   Empty INDICATORS slot = all indicators (filtered to VALUE_IN_EUROS below).
 
-CN codes sourced from EU Implementing Regulation 2025/2620 Annex I
-(reference/cbamBenchmarks.js). Codes are queried at their regulation
+CN codes (sectors.CN_CODES) sourced from EU Implementing Regulation 2025/2620
+Annex I (reference/cbamBenchmarks.js). Codes are queried at their regulation
 digit level; the API aggregates all CN8 sub-codes automatically.
 
 Output: data/raw/eu_trade_hard_to_abate_partner_raw.csv
-        Columns: period, flow, sector, partnerDesc, primaryValue (EUR)
+        Columns: period, flow, sector, partner_id, partnerDesc, primaryValue (EUR),
+                 quantity_100kg
         Schema-compatible with build_eu_trade_processed.py.
+
+--plan lists the sector × flow × batch requests without sending them (fetch_plan.py).
+
+Annual data is stored one partition per year × flow (partitions.py) and the
+raw CSV is assembled from the partitions for START_YEAR–END_YEAR.  A default
+run requests one window from the first year without a partition (at most the
+last REFETCH_YEARS years, which Comext revises) through END_YEAR.
+--backfill 2002 [--to 2018] requests one year at a time instead, so memory
+holds a single year's responses however long the range; years before
+START_YEAR stay in the partitions and out of the CSV.  A window is written
+only when every batch came back.
+  data/partitions/eu_partner_annual/<flow>/<YYYY>.csv.gz
+
+Monthly (--monthly [--since YYYYMM]): EU27 imports from every extra-EU partner
+per month × CBAM sector, for tracking the US share of EU CBAM imports.  The
+response volume is ~12× the annual pull, so requests go one calendar year at a
+time and each year's months are written as partitions before the next year is
+requested (memory: one response plus one year of aggregated rows).  Runs are
+incremental: they start at the last stored month, which is fetched again to
+pick up Comext revisions, unless --since is given (e.g. to refetch further
+back).  A year is written only when every batch came back: if a request
+fails, that year and the ones after it are left for the next run, which
+resumes from the last complete month.
+  data/partitions/eu_partner/Import/YYYYMM.csv.gz   (same layout as comext_bulk.py)
+  data/processed/eu_import_us_share.csv             (US share per month × sector)
 """
 
 from __future__ import annotations
 
-import time
+import argparse, time
+from datetime import date, timedelta
 import requests
 import pandas as pd
 from io import StringIO
 from pathlib import Path
 
+import concordance
+import fetch_plan
+import partitions
+import partners
+import units
+from sectors import CN_CODES as SECTORS
+
 ROOT   = Path(__file__).resolve().parents[1]
 OUTDIR = ROOT / "data" / "raw"
-OUTDIR.mkdir(parents=True, exist_ok=True)
+OUT_CSV = OUTDIR / "eu_trade_hard_to_abate_partner_raw.csv"
 
 BASE_URL   = "https://ec.europa.eu/eurostat/api/comext/dissemination/sdmx/2.1/data/DS-045409"
 DECLARANT  = "EU27_2020"
@@ -33,70 +67,12 @@ START_YEAR = "2019"
 END_YEAR   = "2025"
 BATCH_SIZE = 10   # max CN codes per API call (mirrors reference/process_trade_data.py)
 
-# ---------------------------------------------------------------------------
-# CN codes per sector — from EU IR 2025/2620 Annex I (cbamBenchmarks.js)
-# ---------------------------------------------------------------------------
-SECTORS: dict[str, list[str]] = {
-    "iron_steel_72": [
-        # HS 26 precursor included under CBAM iron & steel
-        "26011200",
-        # HS 72 — primary iron & steel products
-        "7201", "720211", "720241", "72026000",
-        "7203",
-        "7205", "72061000",
-        "7208", "7209", "7210", "72111300", "7212", "7213", "72142000",
-        "7215", "7216",
-        "721710", "721720",
-        "72181000", "72191100", "72193100",
-        "7221", "722300",
-        "722410", "72251100", "722530", "722550",
-    ],
-    "iron_steel_73": [
-        # HS 73 — articles of iron & steel (incl. cast iron HS 7303)
-        "730300",
-        "7301", "7302",
-        "730419", "730439",
-        "7305", "73061900", "73063080",
-        "73072100", "73079100",
-        "7308", "7309", "7310", "731100",
-        "731815", "731816", "73182200", "73182300",
-        "73269098",
-    ],
-    "aluminum_76": [
-        "7601", "7603",
-        "76041010", "76041090", "76042100", "76042910", "76042990",
-        "7605", "7606", "7607", "7608",
-        "76090000", "76101000", "76110000",
-        "7612", "76130000", "7614",
-        "76161000", "76169100", "76169910", "76169990",
-    ],
-    "cement_2523": [
-        # HS 25 — clinker, cement, and kaolinic clay precursor (HS 2507)
-        "25070080",
-        "25231000", "25232100", "25232900", "25233000", "25239000",
-    ],
-    "hydrogen_2804": [
-        # HS 2804 10 — hydrogen (pure)
-        "28041000",
-    ],
-    "fertilizers": [
-        # HS 28 — precursor acids and ammonia
-        "28080000",                   # Nitric acid
-        "28141000", "28142000",       # Ammonia (anhydrous, aqueous)
-        "28342100",                   # Potassium nitrate
-        # HS 31 — nitrogenous fertilizers (3102) and NPK/NP/NK (3105)
-        "31021012", "31021015", "31021019", "31021090",  # Urea
-        "31022100", "31022900",       # Ammonium sulphate / double salts
-        "31023010", "31023090",       # Ammonium nitrate
-        "31024010", "31024090",       # AN + CaCO₃
-        "31025000", "31026000",       # Sodium nitrate, Ca nitrate/AN mix
-        "31028000", "31029000",       # UAN solution, other N fertilizers
-        "31051000", "31052010", "31052090",  # NPK
-        "31053000", "31054000",       # DAP, MAP
-        "31055100", "31055900",       # NP nitrates, NP other
-        "31059020", "31059080",       # NK >10%N, NK ≤10%N
-    ],
-}
+REFETCH_YEARS = 2   # latest years a default annual run fetches again
+
+ANNUAL_DATASET  = "eu_partner_annual"
+MONTHLY_DATASET = "eu_partner"     # partitions.py dataset, shared with comext_bulk.py
+MONTHLY_FROM    = "202201"
+US_SHARE_CSV    = ROOT / "data" / "processed" / "eu_import_us_share.csv"
 
 FLOW_CODES: dict[str, str] = {
     "Export": "2",
@@ -104,105 +80,38 @@ FLOW_CODES: dict[str, str] = {
 }
 
 # ---------------------------------------------------------------------------
-# Eurostat ISO-2 partner codes → display names (aligned with app.js PARTNER_COLORS)
+# API helpers
 # ---------------------------------------------------------------------------
-PARTNER_NAMES: dict[str, str] = {
-    "CN": "China",
-    "RU": "Russian Federation",
-    "TR": "Türkiye",
-    "IN": "India",
-    "GB": "United Kingdom",
-    "KR": "Rep. of Korea",
-    "UA": "Ukraine",
-    "VN": "Viet Nam",
-    "JP": "Japan",
-    "ID": "Indonesia",
-    "EG": "Egypt",
-    "AE": "United Arab Emirates",
-    "US": "USA",
-    "CH": "Switzerland",
-    "NO": "Norway",
-    "CA": "Canada",
-    "MX": "Mexico",
-    "BR": "Brazil",
-    "MY": "Malaysia",
-    "TW": "Taiwan",
-    "SA": "Saudi Arabia",
-    "ZA": "South Africa",
-    "AU": "Australia",
-    "IR": "Iran",
-    "PK": "Pakistan",
-    "TH": "Thailand",
-    "PH": "Philippines",
-    "BD": "Bangladesh",
-    "MA": "Morocco",
-    "DZ": "Algeria",
-    "NG": "Nigeria",
-    "AR": "Argentina",
-    "MK": "North Macedonia",
-    "RS": "Serbia",
-    "XS": "Serbia",          # Eurostat legacy code for Serbia
-    "BA": "Bosnia and Herzegovina",
-    "AL": "Albania",
-    "ME": "Montenegro",
-    "MD": "Moldova",
-    "GE": "Georgia",
-    "AM": "Armenia",
-    "AZ": "Azerbaijan",
-    "KZ": "Kazakhstan",
-    "UZ": "Uzbekistan",
-    "BY": "Belarus",
-    "LY": "Libya",
-    "TN": "Tunisia",
-    "IL": "Israel",
-    "SG": "Singapore",
-    "IS": "Iceland",
-    "QA": "Qatar",
-    "MZ": "Mozambique",
-    "BH": "Bahrain",
-    "CL": "Chile",
-    "CO": "Colombia",
-    "VE": "Venezuela",
-    "EG": "Egypt",
-    "KW": "Kuwait",
-    "OM": "Oman",
-    "QP": "Palestine",       # Eurostat code for Palestinian Territory
-    "QM": "Montenegro",      # Eurostat legacy code
-    "XK": "Kosovo",
-}
 
-# Partner codes to drop: EU-level aggregates + all EU-27 member states.
-# CBAM covers extra-EU trade only; intra-EU is not relevant.
-# Eurostat uses "EL" for Greece (not "GR").
-AGGREGATE_CODES: set[str] = {
-    "EU27_2020", "EU28", "EU27", "EU25", "EU15",
-    "INT_EU27_2020", "EXT_EU27_2020",
-    "WORLD", "WRL", "TOTAL", "EEA", "EFTA", "INTRA_EU", "EXTRA_EU",
-    # EU-27 member states (Eurostat uses "EL" for Greece, but "GR" appears in some data vintages)
-    "AT", "BE", "BG", "CY", "CZ", "DE", "DK", "EE", "EL", "GR", "ES",
-    "FI", "FR", "HR", "HU", "IE", "IT", "LT", "LU", "LV", "MT",
-    "NL", "PL", "PT", "RO", "SE", "SI", "SK",
-}
+def _batches(cn_codes: list[str]) -> list[list[str]]:
+    # reference codes plus the codes older years were reported under (concordance.py)
+    cn_codes = concordance.source_codes(cn_codes, "cn")
+    return [cn_codes[i : i + BATCH_SIZE] for i in range(0, len(cn_codes), BATCH_SIZE)]
 
 
-# ---------------------------------------------------------------------------
-# API helpers
-# ---------------------------------------------------------------------------
+def fetch_batch(cn_codes: list[str], flow_code: str, freq: str = "A",
+                start: str = START_YEAR, end: str = END_YEAR) -> pd.DataFrame:
+    """Fetch a batch of CN codes (joined with +) for all partners, annual (A) or monthly (M).
 
-def fetch_batch(cn_codes: list[str], flow_code: str) -> pd.DataFrame:
-    """Fetch a batch of CN codes (joined with +) for all partners and all years."""
+    Returns an empty frame when Comext has no data for the batch (HTTP 400/404)
+    and None when the request failed (network, rate limit or HTTP error after
+    the retries).
+    """
     codes_str = "+".join(cn_codes)
-    url = f"{BASE_URL}/A.{DECLARANT}..{codes_str}.{flow_code}./"
+    url = f"{BASE_URL}/{freq}.{DECLARANT}..{codes_str}.{flow_code}./"
     params = {
         "format":      "SDMX-CSV",
-        "startPeriod": START_YEAR,
-        "endPeriod":   END_YEAR,
+        "startPeriod": start,
+        "endPeriod":   end,
         "lang":        "EN",
     }
 
     for attempt in range(5):
         try:
-            resp = requests.get(url, params=params, timeout=120)
+            with fetch_plan.timed("comext", "annual" if freq == "A" else "monthly",
+                                  f"{flow_code}:{codes_str}") as t:
+                resp = requests.get(url, params=params, timeout=120)
+                t.nbytes = len(resp.content) if resp.ok else 0
         except requests.RequestException as exc:
             print(f"\n    Network error (attempt {attempt + 1}): {exc}")
             time.sleep(2 ** attempt)
@@ -221,13 +130,17 @@ def fetch_batch(cn_codes: list[str], flow_code: str) -> pd.DataFrame:
             return pd.DataFrame()
 
         print(f"\n    HTTP {resp.status_code}: {resp.text[:120]}")
-        return pd.DataFrame()
+        return None
+
+    return None
 
-    return pd.DataFrame()
 
+def clean_df(df: pd.DataFrame, flow_name: str, sector_name: str,
+             monthly: bool = False) -> pd.DataFrame | None:
+    """Normalise columns, extract EUR value and 100kg quantity, map partner codes → names.
 
-def clean_df(df: pd.DataFrame, flow_name: str, sector_name: str) -> pd.DataFrame | None:
-    """Normalise columns, extract EUR value and 100kg quantity, map partner codes → names."""
+    period is the year (Int64), or the month as "YYYYMM" with monthly=True.
+    """
     df.columns = [c.lower() for c in df.columns]
 
     missing = [c for c in ("partner", "time_period", "obs_value") if c not in df.columns]
@@ -236,16 +149,26 @@ def clean_df(df: pd.DataFrame, flow_name: str, sector_name: str) -> pd.DataFrame
         return None
 
     df = df[df["partner"].notna()].copy()
-    df = df[~df["partner"].astype(str).isin(AGGREGATE_CODES)].copy()
 
-    df["partnerDesc"] = df["partner"].astype(str).map(PARTNER_NAMES).fillna(df["partner"].astype(str))
-    df["period"]      = pd.to_numeric(df["time_period"].astype(str).str[:4], errors="coerce").astype("Int64")
+    # Resolve partner codes once per distinct code.  Drop aggregates and the
+    # EU-27 member states: CBAM covers extra-EU trade only.
+    df["partner_id"]  = partners.comext_ids(df["partner"])
+    dim = partners.table()
+    df = df[~df["partner_id"].map(dim["aggregate"] | dim["eu27"])].copy()
+
+    df["partnerDesc"] = partners.attribute(df["partner_id"], "name")
+    df["period"]      = (df["time_period"].astype(str).str.replace("-", "", regex=False) if monthly else
+                         pd.to_numeric(df["time_period"].astype(str).str[:4], errors="coerce").astype("Int64"))
     df["obs_value"]   = pd.to_numeric(df["obs_value"], errors="coerce")
     df["flow"]        = flow_name
     df["sector"]      = sector_name
 
+    # Predecessor CN codes → reference codes (splits scale obs_value by weight)
+    if "product" in df.columns:
+        df = concordance.remap(df, "product", "period", "cn", ("obs_value",))
+
     if "indicators" not in df.columns:
-        result = df[["period", "flow", "sector", "partnerDesc", "obs_value"]].rename(
+        result = df[["period", "flow", "sector", "partner_id", "partnerDesc", "obs_value"]].rename(
             columns={"obs_value": "primaryValue"}
         ).copy()
         result["quantity_100kg"] = pd.NA
@@ -253,9 +176,9 @@ def clean_df(df: pd.DataFrame, flow_name: str, sector_name: str) -> pd.DataFrame
 
     # Use product code as join key so value/quantity merge is 1-to-1 per CN code
     product_col = next((c for c in df.columns if c == "product"), None)
-    key = ["period", "partnerDesc", "flow", "sector"]
+    key = ["period", "partner_id", "partnerDesc", "flow", "sector"]
     if product_col:
-        key = ["period", "partnerDesc", product_col, "flow", "sector"]
+        key = ["period", "partner_id", "partnerDesc", product_col, "flow", "sector"]
 
     val_df = df[df["indicators"].str.upper() == "VALUE_IN_EUROS"].copy()
     qty_df = df[df["indicators"].str.upper() == "QUANTITY_IN_100KG"].copy()
@@ -264,34 +187,67 @@ def clean_df(df: pd.DataFrame, flow_name: str, sector_name: str) -> pd.DataFrame
     qty_frame = qty_df[key + ["obs_value"]].rename(columns={"obs_value": "quantity_100kg"})
 
     result = val_frame.merge(qty_frame, on=key, how="left")
-    return result[["period", "flow", "sector", "partnerDesc", "primaryValue", "quantity_100kg"]]
+    return result[["period", "flow", "sector", "partner_id", "partnerDesc", "primaryValue", "quantity_100kg"]]
+
+
+def aggregate(sector_frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Sum the cleaned CN-code rows of all batches to one row per partner × year."""
+    combined = pd.concat(sector_frames, ignore_index=True)
+    # quantities add up as int64 kg (units.py), so the total matches the bulk
+    # path (comext_bulk.py) exactly instead of up to float noise in the 100 kg sums
+    combined["quantity_kg"] = units.kg(combined["quantity_100kg"])
+    out = (
+        combined.groupby(["period", "flow", "sector", "partner_id", "partnerDesc"], as_index=False)
+                .agg(primaryValue=("primaryValue", "sum"),
+                     quantity_kg=("quantity_kg", "sum"))
+    )
+    out["quantity_100kg"] = out.pop("quantity_kg") / 100
+    return out
 
 
 # ---------------------------------------------------------------------------
-# Main
+# Annual, all partners → partitions → raw CSV
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def annual_windows(backfill: int | None = None, to: int | None = None) -> list[tuple[str, str]]:
+    """(startPeriod, endPeriod) windows: one per year for a backfill, else the
+    first year without a partition (or the refetched years) through END_YEAR."""
+    last = to or int(END_YEAR)
+    if backfill:
+        return [(str(y), str(y)) for y in range(backfill, last + 1)]
+    have = {(p, f) for f in FLOW_CODES for p in partitions.periods(ANNUAL_DATASET, f)}
+    missing = [y for y in range(int(START_YEAR), last + 1)
+               if any((str(y), f) not in have for f in FLOW_CODES)]
+    first = min(missing + [last - REFETCH_YEARS + 1])
+    return [(str(first), str(last))]
+
+
+def fetch_annual(lo: str, hi: str) -> int:
+    """Fetch every sector × flow for years lo–hi into annual partitions; returns
+    the partitions written, or -1 when a batch failed (nothing is written)."""
     frames: list[pd.DataFrame] = []
+    failed = 0
 
     for sector_name, cn_codes in SECTORS.items():
-        batches = [cn_codes[i : i + BATCH_SIZE] for i in range(0, len(cn_codes), BATCH_SIZE)]
+        batches = _batches(cn_codes)
 
         for flow_name, flow_code in FLOW_CODES.items():
-            print(f"\n{sector_name}  {flow_name}  ({len(cn_codes)} codes, {len(batches)} batches)")
+            print(f"\n{sector_name}  {flow_name}  {lo}–{hi}  ({len(cn_codes)} codes, {len(batches)} batches)")
             sector_frames: list[pd.DataFrame] = []
 
             for b_idx, batch in enumerate(batches):
                 print(f"  batch {b_idx + 1}/{len(batches)}: {'+'.join(batch)[:60]} … ", end="", flush=True)
-                df_raw = fetch_batch(batch, flow_code)
+                df_raw = fetch_batch(batch, flow_code, start=lo, end=hi)
 
-                if df_raw.empty:
-                    print("(no data)")
+                if df_raw is None or df_raw.empty:
+                    print("(failed)" if df_raw is None else "(no data)")
+                    failed += df_raw is None
                     continue
 
                 print(f"{len(df_raw):,} rows", end=" → ", flush=True)
                 df = clean_df(df_raw, flow_name, sector_name)
                 if df is None:
+                    failed += 1
                     continue
 
                 sector_frames.append(df)
@@ -299,28 +255,210 @@ def main() -> None:
                 time.sleep(0.5)
 
             if sector_frames:
-                # Aggregate all batches: sum CN-code rows for same partner × year
-                combined = pd.concat(sector_frames, ignore_index=True)
-                agg = (
-                    combined.groupby(["period", "flow", "sector", "partnerDesc"], as_index=False)
-                            .agg(primaryValue=("primaryValue", "sum"),
-                                 quantity_100kg=("quantity_100kg", "sum"))
-                )
+                agg = aggregate(sector_frames)
                 frames.append(agg)
                 print(f"  → {len(agg):,} aggregated rows")
 
+    # A year missing a sector must not be stored: a later run would take the
+    # partition as complete and never fetch the hole again
+    if failed:
+        print(f"\n{failed} batch(es) failed — {lo}–{hi} not written")
+        return -1
     if not frames:
-        print("\nNo data fetched — check network or API.")
+        return 0
+    out = pd.concat(frames, ignore_index=True).dropna(subset=["period", "partnerDesc", "primaryValue"])
+    return sum(partitions.write(ANNUAL_DATASET, flow_name, str(period), rows.drop(columns=["period", "flow"]))
+               for (period, flow_name), rows in out.groupby(["period", "flow"]))
+
+
+def assemble(first: str = START_YEAR, last: str = END_YEAR) -> None:
+    """Write OUT_CSV for first–last from the annual partitions."""
+    years  = [str(y) for y in range(int(first), int(last) + 1)]
+    frames = []
+    for flow_name in FLOW_CODES:
+        df = partitions.read(ANNUAL_DATASET, flow_name, only=years, dtype={"sector": str})
+        if not df.empty:
+            frames.append(df.assign(flow=flow_name))
+    if not frames:
+        print(f"\nNo {ANNUAL_DATASET} partitions for {first}–{last} — check network or API.")
         return
 
     out = pd.concat(frames, ignore_index=True)
-    out = out.dropna(subset=["period", "partnerDesc", "primaryValue"])
+    out["period"] = out["period"].astype(int)
+    out = out[["period", "flow", "sector", "partner_id", "partnerDesc", "primaryValue", "quantity_100kg"]]
 
-    out_path = OUTDIR / "eu_trade_hard_to_abate_partner_raw.csv"
-    out.to_csv(out_path, index=False)
-    print(f"\nSaved: {out_path}  ({len(out):,} rows)")
+    OUTDIR.mkdir(parents=True, exist_ok=True)
+    out.to_csv(OUT_CSV, index=False)
+    print(f"\nSaved: {OUT_CSV}  ({len(out):,} rows)")
     print("Note: 'primaryValue' is in EUR (Eurostat COMEXT DS-045409).")
 
 
+# ---------------------------------------------------------------------------
+# Monthly, all partners → partitions
+# ---------------------------------------------------------------------------
+
+def write_month(flow_name: str, period: str, rows: pd.DataFrame) -> bool:
+    """One month of sector × partner rows (int EUR value_eur, int quantity_kg) as a partition."""
+    return partitions.write(MONTHLY_DATASET, flow_name, period, pd.DataFrame({
+        "sector":      rows["sector"],
+        "partner_id":  rows["partner_id"],
+        "value_eur":   rows["value_eur"].astype("int64"),
+        "quantity_kg": rows["quantity_kg"].astype("int64"),
+    }))
+
+
+def monthly_start(since: str | None = None) -> str:
+    """First month to fetch: --since, else the last partition (refetched for revisions)."""
+    if since:
+        return since
+    have = partitions.periods(MONTHLY_DATASET, "Import")
+    return have[-1] if have else MONTHLY_FROM
+
+
+def _monthly_windows(start: str) -> list[tuple[str, str]]:
+    """(startPeriod, endPeriod) per calendar year from start through the current month."""
+    today = date.today()
+    return [(f"{y}-{start[4:] if y == int(start[:4]) else '01'}", f"{y}-12")
+            for y in range(int(start[:4]), today.year + 1)]
+
+
+def fetch_monthly(since: str | None = None) -> list[str]:
+    """Stream monthly EU27 imports (all partners × CBAM sectors) into partitions; returns months written."""
+    start = monthly_start(since)
+    if start > date.today().strftime("%Y%m"):
+        print(f"Nothing to fetch: {start} is after the current month.")
+        return []
+
+    written: list[str] = []
+    for lo, hi in _monthly_windows(start):
+        print(f"\n{lo} … {hi}")
+        parts: list[pd.DataFrame] = []
+        failed = 0
+        for sector_name, cn_codes in SECTORS.items():
+            for batch in _batches(cn_codes):
+                print(f"  {sector_name} {'+'.join(batch)[:50]} … ", end="", flush=True)
+                raw = fetch_batch(batch, FLOW_CODES["Import"], "M", lo, hi)
+                if raw is None:
+                    print("(failed)")
+                    failed += 1
+                    continue
+                df = None if raw.empty else clean_df(raw, "Import", sector_name, monthly=True)
+                if df is None:
+                    failed += not raw.empty          # malformed response
+                    print("(no data)" if raw.empty else "(unreadable)")
+                    continue
+                if df.empty:
+                    print("(no data)")
+                    continue
+                df = df.assign(value_eur=units.whole(df["primaryValue"]),
+                               quantity_kg=units.kg(df["quantity_100kg"]))
+                parts.append(df.groupby(["period", "sector", "partner_id"], as_index=False)
+                               [["value_eur", "quantity_kg"]].sum())
+                print(f"{len(raw):,} rows → {len(parts[-1]):,}")
+                time.sleep(0.5)
+
+        # A month missing a sector must not be stored: the next run resumes
+        # at the last partition and would never fill the hole
+        if failed:
+            print(f"  {failed} batch(es) failed — {lo[:4]} not written; "
+                  f"the next run resumes from {monthly_start()}")
+            break
+        if not parts:
+            continue
+        year = (pd.concat(parts, ignore_index=True)
+                  .groupby(["period", "sector", "partner_id"], as_index=False).sum())
+        for period, rows in year.groupby("period"):
+            write_month("Import", period, rows)
+            written.append(period)
+        print(f"  → {year['period'].nunique()} months, {len(year):,} sector × partner rows")
+    return written
+
+
+def us_share(since: str = MONTHLY_FROM) -> pd.DataFrame:
+    """US share of EU27 extra-EU imports per month × sector (value and quantity)."""
+    df = partitions.read(MONTHLY_DATASET, "Import",
+                         only=[p for p in partitions.periods(MONTHLY_DATASET, "Import") if p >= since])
+    if df.empty:
+        return pd.DataFrame(columns=["period", "sector", "us_share_value", "us_share_quantity"])
+    keys  = ["period", "sector"]
+    total = df.groupby(keys)[["value_eur", "quantity_kg"]].sum()
+    us    = (df[df["partner_id"] == partners.comext_id("US")]
+               .groupby(keys)[["value_eur", "quantity_kg"]].sum()
+               .reindex(total.index, fill_value=0))
+    share = (us / total.where(total > 0)).round(4)
+    return share.set_axis(["us_share_value", "us_share_quantity"], axis=1).reset_index()
+
+
+def main_monthly(since: str | None) -> None:
+    months = fetch_monthly(since)
+    print(f"\nPartitions: {len(months)} months written to {partitions.STORE / MONTHLY_DATASET / 'Import'}")
+    share = us_share()
+    if share.empty:
+        return
+    US_SHARE_CSV.parent.mkdir(parents=True, exist_ok=True)
+    share.to_csv(US_SHARE_CSV, index=False)
+    last = share[share["period"] == share["period"].max()]
+    print(f"Saved: {US_SHARE_CSV}\nUS share of EU27 imports, {last['period'].iloc[0]}:")
+    for r in last.itertuples():
+        print(f"  {r.sector:<15} value {r.us_share_value:6.1%}   quantity {r.us_share_quantity:6.1%}")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def plan(monthly: bool = False) -> list[fetch_plan.Request]:
+    if monthly:
+        # the windows fetch_monthly would request; one is "cached" when every
+        # month of it Comext can already have is in the partitions
+        start = monthly_start()
+        have  = set(partitions.periods(MONTHLY_DATASET, "Import"))
+        last  = (date.today().replace(day=1) - timedelta(days=1)).strftime("%Y%m")
+        def cached(lo: str) -> bool:
+            months = [f"{lo[:4]}{m:02d}" for m in range(int(lo[5:]), 13)]
+            return all(m in have for m in months if m <= last)
+        return [
+            fetch_plan.Request("comext", "monthly", f"{lo[:4]} {sector_name} Import {b + 1}/{len(batches)}",
+                               cached=cached(lo), sleep=0.5)
+            for lo, _ in (_monthly_windows(start) if start <= date.today().strftime("%Y%m") else [])
+            for sector_name, cn_codes in SECTORS.items()
+            for batches in [_batches(cn_codes)]
+            for b in range(len(batches))
+        ]
+    # the default window always includes the refetched years, so nothing is cached
+    return [
+        fetch_plan.Request("comext", "annual", f"{lo}–{hi} {sector_name} {flow_name} {b + 1}/{len(batches)}",
+                           cached=False, sleep=0.5)
+        for lo, hi in annual_windows()
+        for sector_name, cn_codes in SECTORS.items()
+        for batches in [_batches(cn_codes)]
+        for flow_name in FLOW_CODES
+        for b in range(len(batches))
+    ]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Fetch EU27 partner trade in CBAM goods from Comext.")
+    ap.add_argument("--plan", action="store_true", help="list the requests without sending them")
+    ap.add_argument("--monthly", action="store_true", help="monthly imports, all partners → partitions")
+    ap.add_argument("--since", metavar="YYYYMM", help="with --monthly: refetch from this month")
+    ap.add_argument("--backfill", type=int, metavar="YEAR", help="annual partitions from YEAR, one year per request")
+    ap.add_argument("--to", type=int, help="last backfill year (default END_YEAR)")
+    args = ap.parse_args()
+
+    if args.plan:
+        fetch_plan.report("fetch_eu_trade_raw", plan(monthly=args.monthly))
+        return
+    if args.monthly:
+        main_monthly(args.since)
+        return
+
+    written = 0
+    for lo, hi in annual_windows(args.backfill, args.to):
+        written += max(fetch_annual(lo, hi), 0)
+    print(f"\n{written} partitions written/changed in {partitions.STORE / ANNUAL_DATASET}")
+    assemble()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,148 @@
+"""
+Request metrics and dry-run plans for the three fetch scripts.
+
+Every HTTP call made by fetch_us_trade_raw.py, fetch_eu_trade_raw.py and
+build_data.py is logged to data/run_metrics.csv (one row per request:
+source, kind, key, bytes, seconds).  With --plan, a script lists the
+requests a refresh would issue instead of sending them:
+
+  python python/fetch_us_trade_raw.py --plan
+  python python/fetch_eu_trade_raw.py --plan
+  python python/build_data.py --plan
+
+Each planned request is marked "fetch" when its period is new, "cached" when
+its period is already in the script's existing output (the request is still
+sent, to pick up revisions) or "skip" when it is not sent at all because the
+period is read back from data/partitions.  Payload size and duration are the
+median of the logged history for that source × kind; kinds without history
+fall back to DEFAULTS, and kinds without a default to DEFAULT_ANY.  Fixed
+sleeps between calls are added on top, and requests of a kind the script
+sends `workers` at a time count for 1/workers of their duration.  Skipped
+requests are left out of the totals.
+
+Output: data/run_metrics.csv   (appended by every real run)
+"""
+
+from __future__ import annotations
+
+import csv, threading, time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+ROOT    = Path(__file__).resolve().parents[1]
+METRICS = ROOT / "data" / "run_metrics.csv"
+
+_LOCK  = threading.Lock()    # requests may run on a thread pool
+FIELDS = ["run_at", "source", "kind", "key", "bytes", "seconds"]
+
+# Fallback (bytes, seconds) per request kind before any history exists
+DEFAULTS: dict[tuple[str, str], tuple[float, float]] = {
+    ("census", "annual_hs6"): (45e6, 40.0),
+    ("census", "ytd_hs6"):    (45e6, 40.0),
+    ("comext", "annual"):     (1.5e6, 4.0),
+    ("comext", "monthly"):    (0.2e6, 2.0),
+}
+DEFAULT_ANY: tuple[float, float] = (1e6, 5.0)
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+def log(source: str, kind: str, key: str, nbytes: int, seconds: float) -> None:
+    """Append one request to the metrics file."""
+    with _LOCK:
+        new = not METRICS.exists()
+        METRICS.parent.mkdir(parents=True, exist_ok=True)
+        with METRICS.open("a", newline="") as fh:
+            w = csv.writer(fh)
+            if new:
+                w.writerow(FIELDS)
+            w.writerow([datetime.now().isoformat(timespec="seconds"), source, kind, key,
+                        nbytes, round(seconds, 2)])
+
+
+class timed:
+    """Context manager: `with timed("census", "ytd_hs6", "202405") as t: r = get(...); t.nbytes = len(r.content)`."""
+
+    def __init__(self, source: str, kind: str, key: str):
+        self.source, self.kind, self.key = source, kind, key
+        self.nbytes = 0
+
+    def __enter__(self) -> "timed":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *_) -> None:
+        if exc_type is None and self.nbytes:
+            log(self.source, self.kind, self.key, self.nbytes, time.perf_counter() - self.t0)
+
+
+def _history() -> dict[tuple[str, str], tuple[float, float, int]]:
+    if not METRICS.exists():
+        return {}
+    df = pd.read_csv(METRICS)
+    g  = df.groupby(["source", "kind"])
+    med = g[["bytes", "seconds"]].median()
+    n   = g.size()
+    return {k: (row["bytes"], row["seconds"], int(n[k])) for k, row in med.iterrows()}
+
+
+# ---------------------------------------------------------------------------
+# Plans
+# ---------------------------------------------------------------------------
+
+def _default(source: str, kind: str) -> tuple[float, float, int]:
+    return DEFAULTS.get((source, kind), DEFAULT_ANY) + (0,)
+
+
+@dataclass
+class Request:
+    source: str           # "census" | "comext"
+    kind:   str           # metrics bucket, e.g. "annual_hs6"
+    key:    str           # human label: "2024 Export", "steel batch 2/5", "202405"
+    cached: bool          # period already present in the script's output (still sent)
+    sleep:  float = 0.0   # fixed pause the script takes after the call
+    workers: int  = 1     # requests of this kind the script has in flight at once
+    skip:   bool  = False # not sent: the period is read back from data/partitions
+
+
+def report(title: str, plan: list[Request]) -> tuple[float, float]:
+    """Print the plan; returns the estimated (bytes, seconds) of the requests sent."""
+    hist = _history()
+    sent = [r for r in plan if not r.skip]
+    rows = []
+    for r in sent:
+        b, s, n = hist.get((r.source, r.kind), _default(r.source, r.kind))
+        rows.append((r, b, s, n))
+
+    skipped = len(plan) - len(sent)
+    print(f"{title}: {len(sent)} requests "
+          f"({sum(r.cached for r in sent)} cached, {sum(not r.cached for r in sent)} to fetch)"
+          + (f", {skipped} skipped (stored in data/partitions, read back instead of sent)" if skipped else "")
+          + "\n")
+    est = {id(r): (b, s) for r, b, s, _ in rows}
+    for r in plan:
+        if r.skip:
+            print(f"  {'skip':<6}  {r.source:<6} {r.key:<28} read from data/partitions")
+            continue
+        b, s = est[id(r)]
+        print(f"  {'cached' if r.cached else 'fetch ':<6}  {r.source:<6} {r.key:<28} "
+              f"~{b / 1e6:6.1f} MB  ~{s + r.sleep:5.1f} s")
+
+    print()
+    for (source, kind) in sorted({(r.source, r.kind) for r in sent}):
+        b, s, n = hist.get((source, kind), _default(source, kind))
+        basis = f"median of {n} logged" if n else "default, no history"
+        workers = max(r.workers for r in sent if (r.source, r.kind) == (source, kind))
+        par = f", {workers} in parallel" if workers > 1 else ""
+        print(f"  {source}/{kind}: ~{b / 1e6:.1f} MB, ~{s:.1f} s per request ({basis}{par})")
+
+    total_b = sum(b for _, b, _, _ in rows)
+    total_s = sum((s + r.sleep) / r.workers for r, _, s, _ in rows)
+    print(f"\n  Total: ~{total_b / 1e6:,.0f} MB, ~{total_s / 60:,.1f} min "
+          f"(excludes retries and rate-limit backoff)")
+    return total_b, total_s
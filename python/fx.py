@@ -0,0 +1,150 @@
+"""
+Monthly EUR→USD reference rates for every EUR series in the pipeline.
+
+Source: ECB Data Portal, series EXR.M.USD.EUR.SP00.A (monthly average of the
+daily euro reference rate, USD per EUR).
+API:    https://data-api.ecb.europa.eu/service/data/EXR/M.USD.EUR.SP00.A
+
+The table is persisted in reference/fx_eur_usd_monthly.csv, which update.sh
+writes (step 1) and commits with the outputs, so every output can be
+reproduced with the exact rates it was built with.  The first line records
+the table version (fetch date + content hash); running this script refreshes
+the file and bumps the version only if a rate changed, and keeps the existing
+file when the ECB cannot be reached.
+
+Until the table has been fetched once (a fresh checkout), every rate falls
+back to the flat FALLBACK_USD_PER_EUR the pipeline used before this table,
+with a warning, and version() says so — stages keep running, and their
+outputs record which rates they were built with.
+
+Conversion is a single map of period → rate over a whole column: YYYYMM
+periods use the monthly rate, YYYY periods the mean of that year's months.
+Months newer than the table (the ECB publishes a few days after month end)
+take the latest available rate.
+"""
+
+from __future__ import annotations
+
+import hashlib, time
+from datetime import date
+from functools import lru_cache
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+import requests
+
+ROOT   = Path(__file__).resolve().parents[1]
+FX_CSV = ROOT / "reference" / "fx_eur_usd_monthly.csv"
+
+ECB_URL    = "https://data-api.ecb.europa.eu/service/data/EXR/M.USD.EUR.SP00.A"
+START_YEAR = 2019
+
+FALLBACK_USD_PER_EUR = 1.08      # flat rate used before the ECB table existed
+
+
+# ---------------------------------------------------------------------------
+# Persisted table
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _load() -> tuple[str, pd.Series]:
+    if not FX_CSV.exists():
+        print(f"  fx: {FX_CSV.name} not found — using the flat fallback "
+              f"{FALLBACK_USD_PER_EUR} USD/EUR (run python/fx.py to fetch the ECB rates)")
+        return (f"fallback={FALLBACK_USD_PER_EUR} (no {FX_CSV.name})",
+                pd.Series(dtype=float, index=pd.Index([], dtype=str, name="period"), name="usd_per_eur"))
+    with FX_CSV.open() as fh:
+        header = fh.readline().lstrip("#").strip()
+    df = pd.read_csv(FX_CSV, comment="#", dtype={"period": str})
+    return header, df.set_index("period")["usd_per_eur"].sort_index()
+
+
+def version() -> str:
+    """Version line of the loaded table, e.g. 'version=2026-10-19-1a2b3c4d source=ECB …'."""
+    return _load()[0]
+
+
+def is_fallback() -> bool:
+    """True when no ECB table is on disk and the flat fallback rate is in use."""
+    return _load()[1].empty
+
+
+def monthly() -> pd.Series:
+    """USD per EUR indexed by YYYYMM (empty under the fallback)."""
+    return _load()[1]
+
+
+@lru_cache(maxsize=None)
+def _lookup() -> pd.Series:
+    m = monthly()
+    annual = m.groupby(m.index.str[:4]).mean()
+    return pd.concat([m, annual])
+
+
+def latest() -> float:
+    """Most recent monthly rate."""
+    return FALLBACK_USD_PER_EUR if is_fallback() else float(monthly().iloc[-1])
+
+
+def rates_for(periods: pd.Series) -> pd.Series:
+    """USD per EUR for each YYYYMM or YYYY period, aligned to `periods`."""
+    if is_fallback():
+        return pd.Series(FALLBACK_USD_PER_EUR, index=periods.index)
+    p = periods.astype(str).str.replace("-", "", regex=False)
+    r = p.map(_lookup())
+    newer = r.isna() & (p.str.ljust(6, "0") > monthly().index[-1])
+    return r.mask(newer, latest())
+
+
+def to_usd(df: pd.DataFrame, eur_cols: list[str], period_col: str = "period",
+           suffix: str = "_usd") -> pd.DataFrame:
+    """Add <col><suffix> for each EUR column, converted in one pass."""
+    rate = rates_for(df[period_col])
+    return df.assign(**{c + suffix: df[c] * rate for c in eur_cols})
+
+
+# ---------------------------------------------------------------------------
+# Refresh from the ECB
+# ---------------------------------------------------------------------------
+
+def fetch_ecb() -> pd.DataFrame:
+    params = {"format": "csvdata", "startPeriod": f"{START_YEAR}-01"}
+    for attempt in range(4):
+        try:
+            r = requests.get(ECB_URL, params=params, timeout=60)
+        except requests.RequestException as exc:
+            print(f"\n    network error (attempt {attempt+1}): {exc}")
+            time.sleep(2 ** attempt)
+            continue
+        if r.ok:
+            df = pd.read_csv(StringIO(r.text))
+            df["period"] = df["TIME_PERIOD"].astype(str).str.replace("-", "", regex=False)
+            return df[["period", "OBS_VALUE"]].rename(columns={"OBS_VALUE": "usd_per_eur"})
+        print(f"\n    HTTP {r.status_code}: {r.text[:120]}")
+        return pd.DataFrame()
+    return pd.DataFrame()
+
+
+def main() -> None:
+    print("Fetching ECB EUR/USD monthly rates … ", end="", flush=True)
+    df = fetch_ecb()
+    if df.empty:
+        print("no data — keeping existing table")
+        return
+    print(f"{len(df)} months ({df['period'].min()}–{df['period'].max()})")
+
+    body = df.sort_values("period").to_csv(index=False, float_format="%.6f")
+    digest = hashlib.sha256(body.encode()).hexdigest()[:8]
+
+    if FX_CSV.exists() and FX_CSV.read_text().split("\n", 1)[1] == body:
+        print(f"Unchanged: {FX_CSV}")
+        return
+
+    header = f"# version={date.today().isoformat()}-{digest} source=ECB EXR.M.USD.EUR.SP00.A\n"
+    FX_CSV.write_text(header + body)
+    print(f"Saved: {FX_CSV}  ({header.strip()[2:]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Mirror-trade reconciliation: US-reported exports to the EU vs EU-reported
+imports from the US, per CBAM sector and month.
+
+Both sides come from docs/data/trade_data.json as written by build_data.py:
+  RAW[k]["me"] / ["mew"]   Census, US exports to EU27 (USD FAS / tonnes), keyed by RAW_KEYS
+  RAWEU["US"][s][YYYYMM]  Comext, EU27 imports from US ([EUR CIF, tonnes]), keyed by COMEXT_SECTORS
+
+The two sides use different sector keys ("72"/"73" vs "steel") and code
+levels (Census HS6 vs Comext CN8), so a concordance is built once from
+COMEXT_SECTORS: every CN code → its HS6 (or HS4 heading) → the RAW key that
+build_data assigns to it.  The reconciliation itself is a single
+group-by/merge over the long-form series.
+
+EUR is converted with the monthly ECB rate from fx.py.
+gap_usd = EU imports (converted to USD) − US exports.  Expect a positive gap
+on average: CIF includes freight and insurance, FAS does not.
+
+Output: data/processed/mirror_trade_gaps.csv
+        data/processed/mirror_concordance.csv
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+import fx
+from build_data import OUT as TRADE_JSON
+from sectors import COMEXT_SECTORS, RAW_KEYS, hs6_to_key, is_cbam
+
+ROOT            = Path(__file__).resolve().parents[1]
+GAPS_CSV        = ROOT / "data" / "processed" / "mirror_trade_gaps.csv"
+CONCORDANCE_CSV = ROOT / "data" / "processed" / "mirror_concordance.csv"
+
+# ---------------------------------------------------------------------------
+# Concordance
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def concordance() -> pd.DataFrame:
+    """One row per Comext CN code: cn_code, hs_code, raw_key, comext_sector, scope.
+
+    scope:
+      "exact"    — CN code at HS4/HS6 level; both sides cover the same goods
+      "partial"  — CN8 sub-code; the Census HS6 also includes sibling CN8s
+      "eu_only"  — HS6 not in the Census CBAM filter / RAW keys
+    """
+    rows = []
+    for sector, codes in COMEXT_SECTORS.items():
+        for cn in codes:
+            hs  = cn[:6]
+            key = hs6_to_key(hs) if is_cbam(hs.ljust(6, "0")) else None
+            if key is None:
+                scope = "eu_only"
+            elif len(cn) == 8 and not cn.endswith("00"):
+                scope = "partial"
+            else:
+                scope = "exact"
+            rows.append((cn, hs, key, sector, scope))
+    return pd.DataFrame(rows, columns=["cn_code", "hs_code", "raw_key", "comext_sector", "scope"])
+
+
+@lru_cache(maxsize=None)
+def key_map() -> dict[str, str]:
+    """RAW key → Comext sector, derived from the concordance."""
+    c = concordance().dropna(subset=["raw_key"])
+    mapping = dict(zip(c["raw_key"], c["comext_sector"]))
+    return {k: mapping[k] for k in RAW_KEYS if k in mapping}
+
+
+# ---------------------------------------------------------------------------
+# Reconciliation
+# ---------------------------------------------------------------------------
+
+def _long_raw(RAW: dict, field: str) -> pd.DataFrame:
+    rows = [(k, p, v) for k in RAW_KEYS for p, v in RAW.get(k, {}).get(field, {}).items()]
+    return pd.DataFrame(rows, columns=["raw_key", "period", field])
+
+
+def reconcile(RAW: dict, RAWEU: dict) -> pd.DataFrame:
+    """Monthly mirror gaps per Comext sector, for months present on both sides."""
+    us = _long_raw(RAW, "me").merge(_long_raw(RAW, "mew"), on=["raw_key", "period"], how="outer")
+    us["sector"] = us["raw_key"].map(key_map())
+    us = (
+        us.dropna(subset=["sector"])
+          .groupby(["sector", "period"], as_index=False)
+          .agg(us_exports_usd=("me", "sum"), us_exports_t=("mew", "sum"))
+    )
+
+    eu = pd.DataFrame(
+        [(s, p, v[0], v[1]) for s, series in RAWEU.items() for p, v in series.items()],
+        columns=["sector", "period", "eu_imports_eur", "eu_imports_t"],
+    )
+    eu["eu_imports_usd"] = eu["eu_imports_eur"] * fx.rates_for(eu["period"])
+
+    df = us.merge(eu, on=["sector", "period"], how="inner")
+    df["gap_usd"] = df["eu_imports_usd"] - df["us_exports_usd"]
+    df["gap_pct"] = (df["gap_usd"] / df["us_exports_usd"].where(df["us_exports_usd"] > 0) * 100)
+    df["gap_t"]   = df["eu_imports_t"] - df["us_exports_t"]
+
+    df = df.round({"eu_imports_usd": 0, "gap_usd": 0, "gap_pct": 1, "gap_t": 1, "us_exports_t": 1})
+    return df.sort_values(["sector", "period"]).reset_index(drop=True)[[
+        "sector", "period", "us_exports_usd", "eu_imports_eur", "eu_imports_usd",
+        "gap_usd", "gap_pct", "us_exports_t", "eu_imports_t", "gap_t",
+    ]]
+
+
+def load_gaps() -> pd.DataFrame:
+    """The written gap table indexed by (sector, period) for direct lookups."""
+    return pd.read_csv(GAPS_CSV, dtype={"period": str}).set_index(["sector", "period"])
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    if not TRADE_JSON.exists():
+        print(f"{TRADE_JSON} not found — run build_data.py first.")
+        return
+    data = json.loads(TRADE_JSON.read_text())
+
+    conc = concordance()
+    gaps = reconcile(data["RAW"], data["RAWEU"]["US"])
+
+    GAPS_CSV.parent.mkdir(parents=True, exist_ok=True)
+    conc.to_csv(CONCORDANCE_CSV, index=False)
+    gaps.to_csv(GAPS_CSV, index=False)
+
+    print(f"FX table: {fx.version()}")
+    print(f"Concordance: {len(conc)} CN codes → {conc['scope'].value_counts().to_dict()}")
+    print(f"Saved: {GAPS_CSV}  ({len(gaps):,} sector-months)")
+    summary = gaps.groupby("sector")["gap_pct"].median()
+    for sector, v in summary.items():
+        print(f"  {sector:<7} median gap {v:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
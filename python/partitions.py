@@ -0,0 +1,85 @@
+"""
+Period-partitioned storage for monthly and annual datasets.
+
+One compact file per dataset × flow × period (YYYYMM or YYYY):
+
+  data/partitions/<dataset>/<flow>/<period>.csv.gz
+
+Each partition is a gzip CSV with integer measures, written deterministically
+(mtime=0, sorted rows), so re-running a period that did not change leaves the
+file byte-identical and git sees no diff.  A run touches only the periods it
+fetched: per-run I/O stays constant as history grows, and readers load just
+the periods they ask for.
+
+Usage:
+  python python/partitions.py                     # list datasets and period ranges
+  python python/partitions.py us_partner Export   # list partitions of one series
+"""
+
+from __future__ import annotations
+
+import gzip, io, sys
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+ROOT  = Path(__file__).resolve().parents[1]
+STORE = ROOT / "data" / "partitions"
+
+
+def path(dataset: str, flow: str, period: str) -> Path:
+    return STORE / dataset / flow / f"{period}.csv.gz"
+
+
+def write(dataset: str, flow: str, period: str, df: pd.DataFrame) -> bool:
+    """Store one period; returns True if the partition was created or changed."""
+    body = df.sort_values(list(df.columns), ignore_index=True).to_csv(index=False).encode()
+    data = gzip.compress(body, mtime=0)
+    p = path(dataset, flow, period)
+    if p.exists() and p.read_bytes() == data:
+        return False
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_bytes(data)
+    return True
+
+
+def periods(dataset: str, flow: str) -> list[str]:
+    return sorted(f.name.split(".")[0] for f in (STORE / dataset / flow).glob("*.csv.gz"))
+
+
+def read(dataset: str, flow: str, only: Optional[Iterable[str]] = None,
+         dtype: Optional[dict] = None) -> pd.DataFrame:
+    """Concatenate the requested periods (default all) with a leading period column."""
+    want = periods(dataset, flow) if only is None else sorted(str(p) for p in only)
+    frames = []
+    for m in want:
+        p = path(dataset, flow, m)
+        if p.exists():
+            frames.append(pd.read_csv(io.BytesIO(gzip.decompress(p.read_bytes())), dtype=dtype)
+                            .assign(period=m))
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    return df[["period"] + [c for c in df.columns if c != "period"]]
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    if len(sys.argv) >= 3:
+        for m in periods(sys.argv[1], sys.argv[2]):
+            p = path(sys.argv[1], sys.argv[2], m)
+            print(f"{m}  {p.stat().st_size / 1024:6.1f} KB")
+        return
+    for ds in sorted(d for d in STORE.glob("*") if d.is_dir()):
+        for fl in sorted(d for d in ds.glob("*") if d.is_dir()):
+            ms = periods(ds.name, fl.name)
+            if ms:
+                print(f"{ds.name}/{fl.name}: {len(ms)} periods ({ms[0]}–{ms[-1]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Partner dimension shared by the Census and Comext stages.
+
+reference/partners.csv lists every trading partner once with a small integer
+partner_id, its ISO codes and display name, the names Census reports it
+under (CTY_NAME), the codes Comext reports it under (PARTNER), the codes UN
+Comtrade reports it under (partnerISO, plus W00/S19-style specials), and flags for
+geographic/economic aggregates and EU27 member states.
+
+Source names and codes are resolved to partner_id once per distinct value;
+stages then filter and join on the integer key.  A Comext (ISO2) or Comtrade
+(ISO3) code missing from its alias column resolves to the partner with that
+ISO code.  Anything else — a Census name or code the table has never seen —
+is classified once (aggregate marker rules below) and appended to the
+runtime overlay data/partners_added.csv (same columns) with the next free
+partner_id, so the id written to the raw CSVs and partitions is the same in
+every later run; update.sh commits the overlay with the data.  A fetch run
+never edits the reference table: to curate an added partner, move its row
+(same partner_id) into reference/partners.csv with its ISO codes and delete
+it from the overlay.  An id present in both files is an error.
+
+Census also reports groupings such as CACM (Central American Common Market)
+whose rows are exactly the sum of their member countries; they are listed
+with aggregate=1 and dropped like the continent and trade-bloc totals.
+"""
+
+from __future__ import annotations
+
+import csv, threading
+from pathlib import Path
+
+import pandas as pd
+
+ROOT         = Path(__file__).resolve().parents[1]
+PARTNERS_CSV = ROOT / "reference" / "partners.csv"
+ADDED_CSV    = ROOT / "data" / "partners_added.csv"     # partners registered by fetch runs
+
+FIELDS = ["partner_id", "iso2", "iso3", "name", "census_names", "comext_codes",
+          "comtrade_codes", "aggregate", "eu27"]
+
+# ---------------------------------------------------------------------------
+# Fallback aggregate detection for Census names not in partners.csv
+# ---------------------------------------------------------------------------
+AGGREGATE_MARKERS = {
+    "OECD", "APEC", "USMCA", "NAFTA", "NATO",
+    "EUROPEAN UNION", "G20", "G7", "OPEC", "ASEAN", "ADB",
+    "TOTAL", "WORLD", "REST OF WORLD",
+    "LATIN AMERICAN", "PACIFIC RIM", "EURO AREA",
+    "CAFTA", "LAFTA", "AND OCEANIA",
+}
+AGGREGATE_EXACT = {
+    "AFRICA", "NORTH AFRICA", "SUB-SAHARAN AFRICA",
+    "ASIA", "EAST ASIA", "SOUTH ASIA", "SOUTHEAST ASIA", "CENTRAL ASIA",
+    "EUROPE",
+    "AMERICAS", "NORTH AMERICA", "SOUTH AMERICA", "CENTRAL AMERICA",
+    "LATIN AMERICA", "LATIN AMERICA AND CARIBBEAN",
+    "CARIBBEAN", "OCEANIA", "PACIFIC",
+    "MIDDLE EAST", "NEAR EAST",
+}
+
+def _looks_aggregate(name: str) -> bool:
+    n = name.upper()
+    return n in AGGREGATE_EXACT or any(marker in n for marker in AGGREGATE_MARKERS)
+
+
+# ---------------------------------------------------------------------------
+# Dimension table
+# ---------------------------------------------------------------------------
+_rows:   dict[int, dict] = {}
+_census: dict[str, int]  = {}
+_comext: dict[str, int]  = {}
+_comtrade: dict[str, int] = {}
+_iso2:   dict[str, int]  = {}
+_iso3:   dict[str, int]  = {}
+
+# build_data walks exports and imports on two threads: loading the table and
+# resolving / registering an unlisted name must not interleave, or one name
+# could get two ids (or two names one id)
+_lock = threading.RLock()
+
+
+def _load() -> None:
+    with _lock:
+        if not _rows:
+            _read()
+
+
+def _read() -> None:
+    # keep_default_na=False: "NA" is Namibia, not a missing value
+    dim = pd.read_csv(PARTNERS_CSV, dtype=str, keep_default_na=False)
+    if ADDED_CSV.exists():
+        added = pd.read_csv(ADDED_CSV, dtype=str, keep_default_na=False)
+        both  = set(added["partner_id"]) & set(dim["partner_id"])
+        if both:
+            raise ValueError(f"partner_id {', '.join(sorted(both, key=int))} in both {PARTNERS_CSV.name} "
+                             f"and {ADDED_CSV.name}; delete the curated rows from {ADDED_CSV}")
+        dim = pd.concat([dim, added], ignore_index=True)
+    for rec in dim.to_dict("records"):
+        pid = int(rec["partner_id"])
+        _rows[pid] = {
+            "partner_id": pid,
+            "iso2":       rec["iso2"],
+            "iso3":       rec["iso3"],
+            "name":       rec["name"],
+            "aggregate":  rec["aggregate"] == "1",
+            "eu27":       rec["eu27"] == "1",
+        }
+        for n in filter(None, rec["census_names"].split("|")):
+            _census[n] = pid
+        for c in filter(None, rec["comext_codes"].split("|")):
+            _comext[c] = pid
+        for c in filter(None, rec["comtrade_codes"].split("|")):
+            _comtrade[c] = pid
+        if rec["iso2"]:
+            _iso2[rec["iso2"]] = pid
+        if rec["iso3"]:
+            _iso3[rec["iso3"]] = pid
+
+
+def _register(name: str, aggregate: bool, census: str = "", comext: str = "",
+              comtrade: str = "") -> int:
+    """Append an unlisted partner to the overlay under the next free id."""
+    pid = max(_rows) + 1
+    _rows[pid] = {"partner_id": pid, "iso2": "", "iso3": "", "name": name,
+                  "aggregate": aggregate, "eu27": False}
+    new = not ADDED_CSV.exists()
+    ADDED_CSV.parent.mkdir(parents=True, exist_ok=True)
+    with ADDED_CSV.open("a", newline="") as f:
+        w = csv.writer(f, lineterminator="\n")
+        if new:
+            w.writerow(FIELDS)
+        w.writerow([pid, "", "", name, census, comext, comtrade, int(aggregate), 0])
+    print(f"\n    partners: unlisted partner {name!r} registered as id {pid}"
+          f"{' (aggregate)' if aggregate else ''} in {ADDED_CSV}; "
+          f"move it to {PARTNERS_CSV.name} with its ISO codes")
+    return pid
+
+
+def census_id(name: str) -> int:
+    """partner_id for a Census CTY_NAME."""
+    _load()
+    key = (name or "").strip().upper()
+    with _lock:
+        if key not in _census:
+            _census[key] = _register(key.title(), _looks_aggregate(key), census=key)
+        return _census[key]
+
+
+def comext_id(code: str) -> int:
+    """partner_id for a Comext PARTNER code."""
+    _load()
+    key = (code or "").strip().upper()
+    with _lock:
+        if key not in _comext:
+            _comext[key] = _iso2[key] if key in _iso2 else _register(key, False, comext=key)
+        return _comext[key]
+
+
+def comtrade_id(code: str) -> int:
+    """partner_id for a UN Comtrade partnerISO code."""
+    _load()
+    key = (code or "").strip().upper()
+    with _lock:
+        if key not in _comtrade:
+            _comtrade[key] = _iso3[key] if key in _iso3 else _register(key, False, comtrade=key)
+        return _comtrade[key]
+
+
+def iso2_id(iso2: str) -> int:
+    """partner_id for an ISO2 code ("EU" for the European Union aggregate)."""
+    _load()
+    return _iso2[iso2]
+
+
+def _ids(values: pd.Series, resolve) -> pd.Series:
+    lut = {v: resolve(v) for v in pd.unique(values.astype(str))}
+    return values.astype(str).map(lut).astype("int16")
+
+
+def census_ids(names: pd.Series) -> pd.Series:
+    """Vectorized census_id: resolves each distinct name once."""
+    return _ids(names, census_id)
+
+
+def comext_ids(codes: pd.Series) -> pd.Series:
+    """Vectorized comext_id: resolves each distinct code once."""
+    return _ids(codes, comext_id)
+
+
+def comtrade_ids(codes: pd.Series) -> pd.Series:
+    """Vectorized comtrade_id: resolves each distinct code once."""
+    return _ids(codes, comtrade_id)
+
+
+def eu27_comext_codes() -> set[str]:
+    """Comext codes of the EU27 member states (reporters in the Comext bulk files)."""
+    _load()
+    return {c for c, pid in _comext.items() if _rows[pid]["eu27"]}
+
+
+def table() -> pd.DataFrame:
+    """The dimension as a frame indexed by partner_id."""
+    _load()
+    return pd.DataFrame(_rows.values()).set_index("partner_id")
+
+
+def attribute(ids: pd.Series, column: str) -> pd.Series:
+    """Look up one dimension column (name, iso2, iso3, aggregate, eu27) for a partner_id series."""
+    return ids.map(table()[column])
+
+
+def name(pid: int) -> str:
+    _load()
+    return _rows[pid]["name"]
+
+
+def is_aggregate(pid: int) -> bool:
+    _load()
+    return _rows[pid]["aggregate"]
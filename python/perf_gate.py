@@ -0,0 +1,349 @@
+"""
+Performance regression gate for the pipeline hot paths.
+
+Times and measures peak memory of
+
+  fetch_us_trade_raw.process / process_eu    one Census HS6 year × flow response
+  fetch_eu_trade_raw.clean_df / aggregate    Comext SDMX-CSV batches for one sector
+  comext_bulk.ingest                         twelve fixture bulk archives, one pass
+  build_data.load_annual_from_csv            the US→EU27 HS6 CSV
+  quality.check                              data-quality gate over RAW / RAWEU
+  build_data.build                           full build, every HTTP call served from fixtures;
+                                             repeats read settled years back from the
+                                             partitions, as a routine run does
+
+on deterministic synthetic fixtures (fixed seed, realistic codes and partner
+names, Census responses at FIXTURE_ROWS rows), and compares against the
+committed baselines in reference/perf_baselines.json.
+
+Each case runs --repeat times; the gate uses the median and the median
+absolute deviation (MAD).  Wall-clock seconds depend on the machine, so every
+case is timed relative to a fixed calibration workload (calibrate(): pandas
+groupby, NumPy sort, a dict-building Python loop — the mix the hot paths are
+made of) run in the same process right before it; baselines store that
+ratio, and a checkout is compared on its own machine's speed.  A case
+regresses when its ratio exceeds the baseline ratio by more than
+max(TIME_TOL × baseline, 3 × baseline MAD), or its tracemalloc peak exceeds
+the baseline by more than MEM_TOL.  Seconds are shown for reference only.
+Nothing touches the network or the real outputs: build() writes into a temp
+dir.
+
+A change that speeds up or slows down a hot path re-records the baselines
+(--update) in the same commit.
+
+Usage:
+  python python/perf_gate.py              # compare; exit 1 on regression
+  python python/perf_gate.py --update     # re-record baselines
+"""
+
+from __future__ import annotations
+
+import argparse, io, json, statistics, sys, tempfile, time, tracemalloc
+from contextlib import redirect_stdout
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+ROOT      = Path(__file__).resolve().parents[1]
+BASELINES = ROOT / "reference" / "perf_baselines.json"
+
+SEED         = 2026
+FIXTURE_ROWS = 60_000     # Census HS6 rows per response (real responses: ~380k)
+BUILD_ROWS   = 6_000      # per response inside build(), which makes ~75 calls
+TIME_TOL     = 0.25
+MEM_TOL      = 0.20
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def _hs6_pool(rng: np.random.Generator) -> np.ndarray:
+    from sectors import SECTOR_HEADINGS
+    codes = [c if len(c) == 6 else c + s for cs in SECTOR_HEADINGS.values() for c in cs
+             for s in (("10", "90") if len(c) == 4 else ("",))]
+    other = [f"{rng.integers(100000, 999999)}" for _ in range(len(codes) * 4)]
+    return np.array(codes + other)
+
+
+def _census_names() -> np.ndarray:
+    dim = pd.read_csv(ROOT / "reference" / "partners.csv", dtype=str, keep_default_na=False)
+    return np.array([n for ns in dim["census_names"] for n in ns.split("|") if n])
+
+
+def census_response(flow: str, rows: int, seed: int = SEED, month: int = 12) -> list[list[str]]:
+    """A Census HS6 response as the API returns it: header row + string rows.
+
+    Values are year-to-date: the same rows scaled by month/12, so consecutive
+    months diff to positive point-in-time values as in real responses.
+    """
+    rng   = np.random.default_rng(seed)
+    cmd   = "E_COMMODITY" if flow == "Export" else "I_COMMODITY"
+    val   = "ALL_VAL_YR" if flow == "Export" else "GEN_VAL_YR"
+    hs6   = rng.choice(_hs6_pool(rng), rows)
+    names = rng.choice(_census_names(), rows)
+    ytd   = month / 12
+    value = (rng.lognormal(12, 2, rows) * ytd).round().astype(int)
+    air   = (rng.lognormal(6, 2, rows) * ytd).round().astype(int)
+    ves   = (rng.lognormal(9, 2, rows) * ytd).round().astype(int)
+    body  = np.column_stack([hs6, rng.integers(1000, 9999, rows).astype(str), names,
+                             value.astype(str), air.astype(str), ves.astype(str)])
+    return [[cmd, "CTY_CODE", "CTY_NAME", val, "AIR_WGT_YR", "VES_WGT_YR"]] + body.tolist()
+
+
+def census_frame(flow: str, rows: int = FIXTURE_ROWS) -> pd.DataFrame:
+    data = census_response(flow, rows)
+    return pd.DataFrame(data[1:], columns=data[0])
+
+
+def comext_frame(codes: list[str], monthly: bool = False, seed: int = SEED,
+                 partner_codes: list[str] | None = None) -> pd.DataFrame:
+    """A Comext SDMX-CSV response for one batch of CN codes (all partners, or those given)."""
+    rng  = np.random.default_rng(seed)
+    dim  = pd.read_csv(ROOT / "reference" / "partners.csv", dtype=str, keep_default_na=False)
+    prts = [c.split("|")[0] for c in dim["comext_codes"] if c]
+    periods = ([f"{y}-{m:02d}" for y in range(2022, 2026) for m in range(1, 13)] if monthly
+               else [str(y) for y in range(2019, 2026)])
+    if partner_codes:
+        prts = partner_codes
+    idx = pd.MultiIndex.from_product([prts, codes, periods, ["VALUE_IN_EUROS", "QUANTITY_IN_100KG"]],
+                                     names=["PARTNER", "PRODUCT", "TIME_PERIOD", "INDICATORS"])
+    df = idx.to_frame(index=False)
+    df["OBS_VALUE"] = rng.lognormal(10, 2, len(df)).round(2)
+    return df
+
+
+def eu27_csv(path: Path, rows: int = 4000, seed: int = SEED) -> None:
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        "period":       rng.integers(2019, 2026, rows),
+        "flow":         rng.choice(["Export", "Import"], rows),
+        "sector":       "aluminum_76",
+        "hs6":          rng.choice(_hs6_pool(rng)[:150], rows),
+        "primaryValue": rng.lognormal(12, 2, rows).round(),
+        "quantity_kg":  rng.lognormal(9, 2, rows).round(),
+    }).to_csv(path, index=False)
+
+
+def trade_payload(seed: int = SEED) -> tuple[dict, dict]:
+    """RAW / RAWEU shaped like trade_data.json (2019– annual, 2022– monthly)."""
+    from sectors import COMEXT_SECTORS, RAW_KEYS
+    rng    = np.random.default_rng(seed)
+    years  = [str(y) for y in range(2019, 2026)]
+    months = [f"{y}{m:02d}" for y in range(2022, 2026) for m in range(1, 13)]
+    series = lambda ps, mu: dict(zip(ps, rng.lognormal(mu, 0.4, len(ps)).round().tolist()))
+    RAW = {k: {"ae": series(years, 20), "awx": series(years, 22), "awm": series(years, 22),
+               "aew": series(years, 15), "me": series(months, 18), "mw": series(months, 19),
+               "mew": series(months, 9)} for k in RAW_KEYS}
+    RAWEU = {"US": {s: {p: [v, round(v / 900, 1)] for p, v in series(months, 17).items()}
+                    for s in COMEXT_SECTORS}}
+    return RAW, RAWEU
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+class _Response:
+    def __init__(self, payload: str):
+        self.ok, self.status_code, self.text = True, 200, payload
+        self.content = payload.encode()
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class _FixedDate(date):
+    """build() loops months up to today; pin it so the workload does not grow."""
+    @classmethod
+    def today(cls):
+        return cls(2026, 6, 15)
+
+
+class _Requests:
+    """Stands in for the requests module inside build_data: serves fixtures."""
+    RequestException = Exception
+
+    def __init__(self):
+        self.census = {(f, m): json.dumps(census_response(f, BUILD_ROWS, month=m))
+                       for f in ("Export", "Import") for m in range(1, 13)}
+
+    def get(self, url, params=None, timeout=None):
+        if "census.gov" in url:
+            flow = "Export" if "exports" in url else "Import"
+            return _Response(self.census[flow, int((params or {}).get("MONTH", 12))])
+        slots = url.rstrip("/").split(".")
+        codes, prts = slots[-3].split("+"), slots[-4].split("+")
+        return _Response(comext_frame(codes, monthly=True, partner_codes=prts).to_csv(index=False))
+
+
+def _build_case(tmp: Path) -> Callable[[], None]:
+    import build_data, config, fetch_plan, partitions, prerender, quality, vintages
+    config.census_key = lambda: "fixture"
+    build_data.requests = _Requests()
+    build_data.time.sleep = lambda s: None
+    build_data.date, build_data.CURRENT_YEAR = _FixedDate, 2026
+    build_data.EU27_CSV = tmp / "eu27.csv"
+    build_data.OUT = tmp / "trade_data.json"
+    fetch_plan.METRICS = tmp / "run_metrics.csv"
+    partitions.STORE = tmp / "partitions"
+    vintages.OBJECTS, vintages.RUNS = tmp / "v" / "objects", tmp / "v" / "runs"
+    quality.REPORT = tmp / "quality_report.csv"
+    prerender.INDEX_HTML = tmp / "index.html"
+    prerender.INDEX_HTML.write_bytes((ROOT / "docs" / "index.html").read_bytes())
+
+    def run() -> None:
+        build_data.OUT.unlink(missing_ok=True)
+        build_data.build()
+    return run
+
+
+def cases(tmp: Path) -> dict[str, tuple[Callable[[], object], Callable[[], None]]]:
+    """name → (setup returning fresh args, function of those args)."""
+    import build_data, comext_bulk, fetch_eu_trade_raw as eu, fetch_us_trade_raw as us, quality
+    from sectors import CN_CODES
+
+    export = census_frame("Export")
+    steel  = [comext_frame(CN_CODES["iron_steel_72"][i:i + 10], seed=SEED + i)
+              for i in range(0, len(CN_CODES["iron_steel_72"]), 10)]
+    cleaned = [eu.clean_df(f.copy(), "Import", "iron_steel_72") for f in steel]
+    RAW, RAWEU = trade_payload()
+    (tmp / "bulk").mkdir()
+    comext_bulk.fixture(tmp / "bulk", rows=20_000)
+    bulk = sorted((tmp / "bulk").glob("*.zip"))
+    eu27_csv(tmp / "eu27.csv")
+    build_data.EU27_CSV = tmp / "eu27.csv"
+    run_build = _build_case(tmp)
+
+    return {
+        "process":              (lambda: export.copy(), lambda df: us.process(df, "Export", 2024)),
+        "process_eu":           (lambda: export.copy(), lambda df: us.process_eu(df, "Export", 2024)),
+        "clean_df":             (lambda: [f.copy() for f in steel],
+                                 lambda fs: [eu.clean_df(f, "Import", "iron_steel_72") for f in fs]),
+        "comext_aggregate":     (lambda: cleaned, eu.aggregate),
+        "comext_bulk":          (lambda: None, lambda _: comext_bulk.ingest(bulk, lambda p, df: None)),
+        "load_annual_from_csv": (lambda: None, lambda _: build_data.load_annual_from_csv()),
+        "quality":              (lambda: None, lambda _: quality.check(RAW, RAWEU)),
+        "build":                (lambda: None, lambda _: run_build()),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _calibration_data() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(SEED)
+    return rng.integers(0, 5_000, 200_000).astype(str).astype(object), rng.random(200_000)
+
+
+def _calibration_workload() -> None:
+    keys, vals = _calibration_data()
+    pd.Series(vals).groupby(keys).sum()
+    np.sort(vals)
+    acc: dict[str, float] = {}
+    for k, v in zip(keys, vals):
+        acc[k] = acc.get(k, 0.0) + v
+
+
+def calibrate(repeat: int = 7) -> float:
+    """Median seconds of the calibration workload on this machine, right now."""
+    _calibration_data()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        _calibration_workload()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def measure(setup, fn, repeat: int) -> dict:
+    times = []
+    with redirect_stdout(io.StringIO()):      # stages print progress
+        calib = calibrate()
+        for _ in range(repeat):
+            args = setup()
+            t0 = time.perf_counter()
+            fn(args)
+            times.append(time.perf_counter() - t0)
+
+        args = setup()
+        tracemalloc.start()
+        fn(args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    med = statistics.median(times)
+    return {"ratio":    round(med / calib, 4),
+            "mad":      round(statistics.median(abs(t - med) for t in times) / calib, 4),
+            "median_s": round(med, 5),
+            "peak_mb":  round(peak / 2**20, 2)}
+
+
+def compare(current: dict, baseline: dict) -> list[tuple]:
+    rows = []
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if not base or "ratio" not in base:
+            rows.append((name, None, cur, "new"))
+            continue
+        slack = max(TIME_TOL * base["ratio"], 3 * base["mad"])
+        slow  = cur["ratio"]   > base["ratio"] + slack
+        fat   = cur["peak_mb"] > base["peak_mb"] * (1 + MEM_TOL)
+        rows.append((name, base, cur, "SLOWER" if slow else "MEMORY" if fat else "ok"))
+    return rows
+
+
+def report(rows: list[tuple]) -> None:
+    print(f"\n  {'case':<22} {'baseline':>9} {'current':>9} {'Δ':>6}  {'(seconds)':>9}"
+          f"   {'peak MB':>15}  status        (time in calibration units)")
+    for name, base, cur, status in rows:
+        if base is None:
+            print(f"  {name:<22} {'—':>9} {cur['ratio']:>9.2f} {'':>6}  {cur['median_s']:>8.3f}s"
+                  f"   {cur['peak_mb']:>15.1f}  {status}")
+            continue
+        dt = (cur["ratio"] / base["ratio"] - 1) * 100 if base["ratio"] else 0.0
+        print(f"  {name:<22} {base['ratio']:>9.2f} {cur['ratio']:>9.2f} {dt:>+5.0f}%  {cur['median_s']:>8.3f}s"
+              f"   {base['peak_mb']:>6.1f} → {cur['peak_mb']:>6.1f}  {status}")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--update", action="store_true", help="write current results as the new baselines")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--only", nargs="*", help="run only these cases")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        current = {}
+        for name, (setup, fn) in cases(Path(tmp)).items():
+            if args.only and name not in args.only:
+                continue
+            print(f"  {name} … ", end="", flush=True)
+            repeat = max(3, args.repeat // 2) if name == "build" else args.repeat
+            current[name] = measure(setup, fn, repeat)
+            print(f"{current[name]['median_s'] * 1e3:.1f} ms ({current[name]['ratio']:.2f} × calibration)")
+
+    baseline = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    rows = compare(current, baseline)
+    report(rows)
+
+    if args.update:
+        BASELINES.write_text(json.dumps({**baseline, **current}, indent=1, sort_keys=True) + "\n")
+        print(f"\nSaved baselines: {BASELINES}")
+        return
+    if any(status in ("SLOWER", "MEMORY") for *_, status in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
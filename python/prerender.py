@@ -0,0 +1,255 @@
+"""
+Static first paint for docs/index.html, rendered at build time.
+
+The dashboard draws everything client-side once trade_data.json has arrived.
+This module renders what is visible before that — the header badges, the
+KPI cards of the default tab (CBAM scope, value view) and both sets of sector
+cards with SVG sparklines — and writes it into index.html between
+<!--pre:NAME--> … <!--/pre:NAME--> markers.  The page is readable without
+JS or network; init() then replaces each block with the live render
+(hydration), so the snapshot only has to look the same, not behave the same.
+
+The card definitions (names, HS labels, which sectors use US data) are read
+from the SECTORS / EU_SECTORS literals in index.html, and RAW keys per card
+from docs/data/cbam_codes.json, so there is no second copy to keep in sync.
+Numbers are formatted like the page's fmt / fmtEur / fmtT / chip helpers.
+
+build_data.py calls embed() after writing trade_data.json.  Run standalone
+to re-render from the published file:
+
+  python python/prerender.py
+
+Output: docs/index.html (marker blocks only; rewritten only when changed)
+"""
+
+from __future__ import annotations
+
+import html, json, math, re
+from pathlib import Path
+
+from sectors import SCOPE
+
+ROOT       = Path(__file__).resolve().parents[1]
+INDEX_HTML = ROOT / "docs" / "index.html"
+TRADE_JSON = ROOT / "docs" / "data" / "trade_data.json"
+
+# comparison years, as hard-coded in index.html
+YEAR, PREV = 2026, 2025
+HIST_YEARS = (2022, 2023, 2024, 2025)
+
+MN = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+_ARRAY_RE = r"const {name} = \[(.*?)\n\]"
+_ENTRY_RE = re.compile(r"\{([^}]*)\}")
+_FIELD_RE = re.compile(r"(\w+):\s*(?:'([^']*)'|(true|false))")
+_BLOCK_RE = r"(<!--pre:{name}-->)(.*?)(<!--/pre:{name}-->)"
+
+
+# ---------------------------------------------------------------------------
+# Card definitions (from index.html)
+# ---------------------------------------------------------------------------
+
+def _literals(name: str, text: str) -> list[dict]:
+    match = re.search(_ARRAY_RE.format(name=name), text, re.DOTALL)
+    if match is None:
+        raise ValueError(f"{name} not found in {INDEX_HTML}")
+    return [{k: (s if b == "" else b == "true") for k, s, b in _FIELD_RE.findall(entry)}
+            for entry in _ENTRY_RE.findall(match.group(1))]
+
+
+# ---------------------------------------------------------------------------
+# Formatting — same output as the page's JS helpers
+# ---------------------------------------------------------------------------
+
+def _round(v: float) -> int:          # Math.round
+    return math.floor(v + 0.5)
+
+
+def fmt(v: float, cur: str = "$") -> str:
+    if v >= 1e9: return f"{cur}{v / 1e9:.2f}B"
+    if v >= 1e6: return f"{cur}{v / 1e6:.1f}M"
+    if v >= 1e3: return f"{cur}{v / 1e3:.0f}K"
+    return f"{cur}{_round(v)}"
+
+
+def fmt_eur(v: float) -> str:
+    return fmt(v, "€")
+
+
+def fmt_t(v: float) -> str:
+    return f"{v / 1e6:.2f}M t" if v >= 1e6 else f"{_round(v):,} t"
+
+
+def pct(now: float, then: float) -> float | None:
+    return (now / then - 1) * 100 if then else None
+
+
+def chip(p: float | None) -> str:
+    if p is None:
+        return ""
+    return f'<span class="chip {"up" if p >= 0 else "down"}">{"+" if p >= 0 else ""}{p:.1f}%</span>'
+
+
+# ---------------------------------------------------------------------------
+# Series helpers
+# ---------------------------------------------------------------------------
+
+def _series(RAW: dict, codes: list[str], key: str) -> dict[str, float]:
+    out: dict[str, float] = {}
+    for c in codes:
+        for p, v in RAW[c].get(key, {}).items():
+            out[p] = out.get(p, 0) + v
+    return out
+
+
+def _ytd(d: dict, year: int, lm: int, idx: int | None = None) -> float:
+    t = 0.0
+    for m in range(1, lm + 1):
+        v = d.get(f"{year}{m:02d}")
+        if v is not None:
+            t += v if idx is None else v[idx]
+    return t
+
+
+def _last_month(d: dict) -> int:
+    return max((int(p[4:]) for p in d if p.startswith(str(YEAR))), default=0)
+
+
+def spark(d: dict[str, float], h: int = 56) -> str:
+    """Sparkline as inline SVG: the page's Chart.js line, without the smoothing."""
+    vals = [d[k] for k in sorted(d)]
+    if len(vals) < 2:
+        return ""
+    lo, hi = min(vals), max(vals)
+    span = (hi - lo) or 1.0
+    pts = " ".join(f"{i / (len(vals) - 1) * 100:.1f},{h - 2 - (v - lo) / span * (h - 4):.1f}"
+                   for i, v in enumerate(vals))
+    return (f'<svg viewBox="0 0 100 {h}" preserveAspectRatio="none" aria-hidden="true">'
+            f'<path class="a" d="M0,{h} L{pts} L100,{h} Z"/><path class="l" d="M{pts}"/></svg>')
+
+
+# ---------------------------------------------------------------------------
+# Blocks
+# ---------------------------------------------------------------------------
+
+def render(data: dict, text: str) -> dict[str, str] | None:
+    """HTML per marker block, or None if there is no YEAR data to show yet."""
+    RAW, RAWEU = data["RAW"], data["RAWEU"]["US"]
+    sectors    = [{**s, "codes": SCOPE["cards"][s["id"]]} for s in _literals("SECTORS", text)]
+    eu_sectors = _literals("EU_SECTORS", text)
+
+    last_m  = _last_month(RAW["72"]["mw"])
+    wlast_m = _last_month(RAW["72"]["mew"])
+    eu_last = _last_month(RAWEU["steel"])
+    if not (last_m and wlast_m and eu_last):
+        return None
+
+    esc = lambda s: html.escape(s, quote=False)
+    q   = f"Jan–{MN[eu_last - 1]}"
+
+    # KPIs: CBAM scope tab, value view (kpiCbam)
+    eu_secs = [s for s in eu_sectors if not s.get("usData")]
+    ytd_eu  = lambda s, y, idx: _ytd(RAWEU[s["id"]], y, eu_last, idx)
+    v26 = sum(ytd_eu(s, YEAR, 0) for s in eu_secs)
+    v25 = sum(ytd_eu(s, PREV, 0) for s in eu_secs)
+    avg = sum(ytd_eu(s, y, 0) for y in HIST_YEARS for s in eu_secs) / len(HIST_YEARS)
+    worst = min(((s, p) for s in eu_secs
+                 if (p := pct(ytd_eu(s, YEAR, 0), ytd_eu(s, PREV, 0))) is not None),
+                key=lambda sp: sp[1], default=None)
+    kpis = f"""
+    <div class="kpi"><div class="label">EU imports of CBAM goods from the US · {q} {YEAR}</div>
+      <div class="value">{fmt_eur(v26)}</div>
+      <div class="delta">{chip(pct(v26, v25))} vs {fmt_eur(v25)} in {q} {PREV}</div></div>
+    <div class="kpi"><div class="label">{HIST_YEARS[0]}–{HIST_YEARS[-1]} average, same months (value)</div>
+      <div class="value">{fmt_eur(avg)}</div>
+      <div class="delta">{chip(pct(v26, avg))} {q} {YEAR} vs this average</div></div>"""
+    if worst:
+        kpis += f"""
+    <div class="kpi"><div class="label">Largest year-over-year decline (value)</div>
+      <div class="value">{esc(worst[0]["name"])}</div>
+      <div class="delta">{chip(worst[1])} {q} {YEAR} vs {PREV}</div></div>"""
+
+    # sector cards, CBAM scope tab (renderEuCards, value view)
+    cards_eu = []
+    for s in eu_sectors:
+        if s.get("usData"):
+            us = next(x for x in sectors if x["id"] == s["id"])
+            d  = _series(RAW, us["codes"], "me")
+            y26, y25 = _ytd(d, YEAR, last_m), _ytd(d, PREV, last_m)
+            row  = (f'<div class="val">{fmt(y26)} <small>US exports to EU, Jan–{MN[last_m - 1]} \'{YEAR % 100}</small></div>\n'
+                    f'          <div>{chip(pct(y26, y25))}<div class="vs">vs Jan–{MN[last_m - 1]} {PREV}</div></div>')
+            foot = '<span>US Census Bureau, USD · Comext series unreliable at this scale</span>'
+        else:
+            d  = {p: v[0] for p, v in RAWEU[s["id"]].items()}
+            v26, v25 = ytd_eu(s, YEAR, 0), ytd_eu(s, PREV, 0)
+            t26, t25 = ytd_eu(s, YEAR, 1), ytd_eu(s, PREV, 1)
+            row  = (f'<div class="val">{fmt_eur(v26)} <small>EU imports from US, {q} \'{YEAR % 100}</small></div>\n'
+                    f'          <div>{chip(pct(v26, v25))}<div class="vs">vs {q} {PREV}</div></div>')
+            foot = (f'<span>Quantity: {fmt_t(t26)} {chip(pct(t26, t25))}</span>'
+                    f'<span class="vs" style="margin-top:0">quantity vs {q} {PREV}</span>')
+        cards_eu.append(f"""
+      <div class="card"><div class="top"><h3>{esc(s["name"])}</h3><span class="hs">{esc(s["cn"])}</span></div>
+        <div class="row">
+          {row}
+        </div>
+        <div class="spark">{spark(d)}</div>
+        <div class="foot">{foot}</div></div>""")
+
+    # sector cards, US data tab (renderUsCards, value view; hidden at first paint)
+    cards_us = []
+    for s in sectors:
+        me, mw = _series(RAW, s["codes"], "me"), _series(RAW, s["codes"], "mw")
+        y26, y25 = _ytd(me, YEAR, last_m), _ytd(me, PREV, last_m)
+        w26 = _ytd(mw, YEAR, last_m)
+        share = y26 / w26 * 100 if w26 else 0
+        cards_us.append(f"""
+      <div class="card"><div class="top"><h3>{esc(s["name"])}</h3><span class="hs">{esc(s["hs"])}</span></div>
+        <div class="row">
+          <div class="val">{fmt(y26)} <small>to EU, Jan–{MN[last_m - 1]} '{YEAR % 100}</small></div>
+          <div>{chip(pct(y26, y25))}<div class="vs">vs Jan–{MN[last_m - 1]} {PREV}</div></div>
+        </div>
+        <div class="spark">{spark(me)}</div>
+        <div class="foot"><span>EU = {share:.1f}% of world exports</span></div></div>""")
+
+    return {
+        "badgeEU": f"Eurostat Comext · through {MN[eu_last - 1]} {YEAR}",
+        "badgeDX": f"UN Comtrade · US domestic exports through {MN[last_m - 1]} {YEAR}",
+        "badgeUS": f"US Census Bureau · weights and imports through {MN[wlast_m - 1]} {YEAR}",
+        "kpis":    kpis + "\n  ",
+        "cardsEu": "".join(cards_eu) + "\n    ",
+        "cards":   "".join(cards_us) + "\n    ",
+    }
+
+
+def embed(data: dict, path: Path | None = None) -> bool:
+    """Write the rendered blocks into index.html; True if the file changed."""
+    path = path or INDEX_HTML
+    text = path.read_text(encoding="utf-8")
+    blocks = render(data, text)
+    if blocks is None:
+        print(f"  prerender: no {YEAR} months yet — {path.name} left as is")
+        return False
+    new = text
+    for name, body in blocks.items():
+        new, n = re.subn(_BLOCK_RE.format(name=name), lambda m: m.group(1) + body + m.group(3),
+                         new, flags=re.DOTALL)
+        if n != 1:
+            raise ValueError(f"marker <!--pre:{name}--> not found exactly once in {path}")
+    if new == text:
+        return False
+    path.write_text(new, encoding="utf-8")
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    data = json.loads(TRADE_JSON.read_text())
+    changed = embed(data)
+    print(f"{'Updated' if changed else 'Unchanged'}: {INDEX_HTML}")
+
+
+if __name__ == "__main__":
+    main()
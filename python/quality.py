@@ -0,0 +1,173 @@
+"""
+Data-quality gate for RAW / RAWEU before trade_data.json is published.
+
+All series are flattened into one long frame (source, sector, field, period,
+value) and every check is a vectorized groupby over it, so the gate costs a
+few milliseconds per build.
+
+  missing_period   a month absent from every sector of a monthly field while
+                   later months exist (a failed fetch)                  → error
+  eu_row_missing   Census response had partner rows but no "EUROPEAN UNION"
+                   aggregate for the month (reported by build())        → error
+  non_finite       NaN / inf / negative value in a published series     → error
+  negative_diff    YTD(m) < YTD(m−1): a revision build() had to drop    → warning
+  gap              a single series skips a month others have (thin flows) → warning
+  mom_outlier      month more than MOM_FACTOR× off the series median    → warning
+  unit_value       USD/t or EUR/t more than UV_FACTOR× off the median   → warning
+  annual_mismatch  sum of monthly me ≠ annual ae (CSV) by > ANNUAL_TOL  → warning
+
+build() aborts before writing when any error is found (override with
+--allow-errors); warnings are printed.  Run standalone to check the file
+that is currently published:
+
+  python python/quality.py
+
+Output: data/processed/quality_report.csv (all findings of the last check)
+"""
+
+from __future__ import annotations
+
+import json, sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT       = Path(__file__).resolve().parents[1]
+TRADE_JSON = ROOT / "docs" / "data" / "trade_data.json"
+REPORT     = ROOT / "data" / "processed" / "quality_report.csv"
+
+MONTHLY_FIELDS = ("me", "mew", "mw", "mi", "miw", "mwm")
+MOM_FACTOR     = 10.0
+UV_FACTOR      = 5.0
+ANNUAL_TOL     = 0.15
+
+COLUMNS = ["severity", "check", "source", "sector", "field", "period", "detail"]
+
+
+def _long(RAW: dict, RAWEU: dict) -> pd.DataFrame:
+    rows = [("census", k, f, p, v) for k, fields in RAW.items()
+            for f, series in fields.items() for p, v in series.items()]
+    rows += [("comext" if partner == "US" else f"comext.{partner}", s, f, p, v[i])
+             for partner, sectors in RAWEU.items() for s, series in sectors.items()
+             for p, v in series.items() for i, f in ((0, "m"), (1, "mt"))]
+    df = pd.DataFrame(rows, columns=["source", "sector", "field", "period", "value"])
+    df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    return df
+
+
+def _finding(df: pd.DataFrame, severity: str, check: str, detail) -> pd.DataFrame:
+    out = df[["source", "sector", "field", "period"]].copy()
+    out.insert(0, "check", check)
+    out.insert(0, "severity", severity)
+    out["detail"] = detail
+    return out
+
+
+def check(RAW: dict, RAWEU: dict, notes: dict | None = None) -> pd.DataFrame:
+    """All findings as a frame (COLUMNS); notes are build()'s per-run observations."""
+    notes = notes or {}
+    df  = _long(RAW, RAWEU)
+    out = []
+
+    # ---- hard errors --------------------------------------------------------
+    bad = df[~np.isfinite(df["value"]) | (df["value"] < 0)]
+    out.append(_finding(bad, "error", "non_finite", bad["value"].astype(str)))
+
+    monthly = df[(df["period"].str.len() == 6)
+                 & (df["field"].isin(MONTHLY_FIELDS + ("m", "mt")))].copy()
+    monthly["ym"] = pd.PeriodIndex(monthly["period"].str[:4] + "-" + monthly["period"].str[4:], freq="M")
+
+    span = monthly.groupby(["source", "field"])["ym"].agg(["min", "max"])
+    have = monthly.groupby(["source", "field"])["ym"].unique()
+    for (source, field), (lo, hi) in span.iterrows():
+        missing = pd.period_range(lo, hi, freq="M").difference(pd.PeriodIndex(have[(source, field)]))
+        for p in missing:
+            out.append(pd.DataFrame([["error", "missing_period", source, "*", field,
+                                      p.strftime("%Y%m"), "no sector has this month"]], columns=COLUMNS))
+
+    for field, label in notes.get("eu_row_missing", []):
+        out.append(pd.DataFrame([["error", "eu_row_missing", "census", "*", field, label,
+                                  "no EUROPEAN UNION row in the YTD response"]], columns=COLUMNS))
+
+    # ---- warnings -----------------------------------------------------------
+    for key, field, label, diff in notes.get("negative_diffs", []):
+        out.append(pd.DataFrame([["warning", "negative_diff", "census", key, field, label,
+                                  f"{diff:,.0f}"]], columns=COLUMNS))
+
+    # per-series gaps inside the field's overall span
+    g = monthly.groupby(["source", "sector", "field"])["ym"]
+    n_series = g.size()
+    expect = monthly.groupby(["source", "field"])["ym"].nunique()
+    short = n_series[n_series < expect.reindex(n_series.index.droplevel("sector")).to_numpy()]
+    for (source, sector, field), n in short.items():
+        got  = set(have[(source, field)]) - set(g.get_group((source, sector, field)))
+        out.append(pd.DataFrame([["warning", "gap", source, sector, field,
+                                  min(got).strftime("%Y%m"), f"{len(got)} months absent"]], columns=COLUMNS))
+
+    # month-over-median outliers (log scale, per series)
+    pos = monthly[monthly["value"] > 0].copy()
+    pos["log"] = np.log(pos["value"])
+    pos["dev"] = pos["log"] - pos.groupby(["source", "sector", "field"])["log"].transform("median")
+    mom = pos[pos["dev"].abs() > np.log(MOM_FACTOR)]
+    out.append(_finding(mom, "warning", "mom_outlier", (np.exp(mom["dev"])).map("{:.1f}× median".format)))
+
+    # unit values: value / tonnes per month
+    wide = monthly.pivot_table(index=["source", "sector", "period"], columns="field", values="value")
+    uv = pd.concat([
+        (wide["me"] / wide["mew"]).rename("uv").to_frame().assign(field="me/mew") if {"me", "mew"} <= set(wide) else None,
+        (wide["mi"] / wide["miw"]).rename("uv").to_frame().assign(field="mi/miw") if {"mi", "miw"} <= set(wide) else None,
+        (wide["m"] / wide["mt"]).rename("uv").to_frame().assign(field="m/mt") if {"m", "mt"} <= set(wide) else None,
+    ]).replace([np.inf, -np.inf], np.nan).dropna().reset_index()
+    uv = uv[uv["uv"] > 0]
+    uv["dev"] = np.log(uv["uv"]) - np.log(uv["uv"]).groupby([uv["source"], uv["sector"], uv["field"]]).transform("median")
+    odd = uv[uv["dev"].abs() > np.log(UV_FACTOR)]
+    out.append(_finding(odd, "warning", "unit_value",
+                        [f"{u:,.0f}/t ({np.exp(d):.1f}× median)" for u, d in zip(odd["uv"], odd["dev"])]))
+
+    # monthly me summed over complete years vs annual ae from the CSV
+    me = monthly[(monthly["source"] == "census") & (monthly["field"] == "me")]
+    full = me.groupby([me["sector"], me["period"].str[:4]])["value"].agg(["sum", "size"])
+    full = full[full["size"] == 12]["sum"]
+    ae = df[(df["field"] == "ae")].set_index(["sector", "period"])["value"]
+    both = pd.concat([full.rename("monthly"), ae.rename("annual")], axis=1, join="inner")
+    both = both[both["annual"] > 0]
+    rel = both["monthly"] / both["annual"] - 1
+    off = rel[rel.abs() > ANNUAL_TOL]
+    for (sector, year), r in off.items():
+        out.append(pd.DataFrame([["warning", "annual_mismatch", "census", sector, "me", year,
+                                  f"monthly sum {r:+.0%} vs ae"]], columns=COLUMNS))
+
+    found = [f for f in out if len(f)]
+    return (pd.concat(found, ignore_index=True) if found else pd.DataFrame(columns=COLUMNS))[COLUMNS]
+
+
+def summarize(findings: pd.DataFrame, limit: int = 12) -> int:
+    """Print findings grouped by check; returns the number of errors."""
+    n_err = int((findings["severity"] == "error").sum())
+    counts = findings.groupby(["severity", "check"]).size()
+    print(f"  quality: {n_err} errors, {len(findings) - n_err} warnings")
+    for (sev, chk), n in counts.items():
+        print(f"    {sev:<7} {chk:<16} {n}")
+    for row in findings[findings["severity"] == "error"].head(limit).itertuples():
+        print(f"    ! {row.check} {row.source}/{row.sector}/{row.field} {row.period}: {row.detail}")
+    return n_err
+
+
+def write_report(findings: pd.DataFrame) -> None:
+    REPORT.parent.mkdir(parents=True, exist_ok=True)
+    findings.to_csv(REPORT, index=False)
+
+
+def main() -> None:
+    data = json.loads(TRADE_JSON.read_text())
+    findings = check(data["RAW"], data["RAWEU"])
+    n_err = summarize(findings)
+    write_report(findings)
+    print(f"Saved: {REPORT}")
+    if n_err:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
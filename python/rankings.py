@@ -0,0 +1,146 @@
+"""
+Top-k trading partners by value and by tonnage for every sector × flow × year.
+
+Streams the partner-level data (US and EU, same layout as emissions.SOURCES)
+in row chunks and keeps one bounded min-heap of size k per
+(reporter, period, flow, sector, measure) group plus a running total, so
+memory is O(groups × k) however many rows or partition files are read.
+
+Each input row is already one partner's total for its group, so a row can be
+offered to the heap as soon as it is read.  Ties are broken on partner_id.
+
+Rows are read from the annual partitions the fetch scripts write
+(data/partitions/{us,eu}_partner_annual/<flow>/<YYYY>.csv.gz), one year at a
+time, so backfilled years are ranked too; the raw CSV fills only the
+year × flow pairs with no partition.
+
+Values are in the reporter's currency (USD for US, EUR for EU); shares are
+within that reporter, so no FX conversion is needed to rank.
+
+Usage:
+  python python/rankings.py          # k = 3
+  python python/rankings.py --k 10
+
+Output: data/processed/partner_rankings.csv
+          Columns: reporter, period, flow, sector, measure, rank, partner_id,
+                   partnerDesc, value, group_total, share
+
+The legacy US top-3 CSV is a chart dataset (charts.py, us_exports_top3_legacy)
+built from the UN Comtrade rows it was first made from, not from these
+Census rows; ranking those rows gives the same figures (tests/test_rankings.py).
+"""
+
+from __future__ import annotations
+
+import argparse, heapq, time
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+
+import partitions
+from emissions import SOURCES
+
+ROOT = Path(__file__).resolve().parents[1]
+OUT  = ROOT / "data" / "processed" / "partner_rankings.csv"
+
+CHUNK_ROWS = 50_000
+KEYS       = ("period", "flow", "sector")
+
+PARTITIONS = {"US": "us_partner_annual", "EU": "eu_partner_annual"}   # reporter → annual dataset
+
+
+# ---------------------------------------------------------------------------
+# Streaming top-k
+# ---------------------------------------------------------------------------
+
+class TopK:
+    """Running top-k per group: one size-k min-heap + total per group key."""
+
+    def __init__(self, k: int):
+        self.k      = k
+        self.heaps: dict[tuple, list] = {}
+        self.totals: dict[tuple, float] = {}
+
+    def push(self, key: tuple, value: float, partner_id: int, name: str) -> None:
+        if value != value:            # NaN
+            return
+        self.totals[key] = self.totals.get(key, 0.0) + value
+        heap = self.heaps.setdefault(key, [])
+        item = (value, -partner_id, name)
+        if len(heap) < self.k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def rows(self) -> Iterable[tuple]:
+        for key in sorted(self.heaps):
+            total = self.totals[key]
+            for rank, (value, neg_id, name) in enumerate(sorted(self.heaps[key], reverse=True), 1):
+                yield key + (rank, -neg_id, name, value, total, value / total if total else None)
+
+
+def _chunks(reporter: str, paths: Path | Iterable[Path], cols: list[str]) -> Iterable[pd.DataFrame]:
+    """Row chunks for one reporter: its annual partitions, then CSV rows for the rest."""
+    done: set[tuple[int, str]] = set()
+    dataset = PARTITIONS.get(reporter)
+    if dataset:
+        for flow in ("Export", "Import"):
+            for period in partitions.periods(dataset, flow):
+                df = partitions.read(dataset, flow, only=[period]).assign(flow=flow)
+                df["period"] = df["period"].astype(int)
+                done.add((int(period), flow))
+                yield df[cols]
+
+    paths = [paths] if isinstance(paths, Path) else sorted(paths)
+    for path in paths:
+        if not path.exists():
+            if not done:
+                print(f"  WARNING: {path} not found — skipping {reporter}")
+            continue
+        for chunk in pd.read_csv(path, usecols=cols, chunksize=CHUNK_ROWS):
+            if done:
+                chunk = chunk[[(p, f) not in done for p, f in zip(chunk["period"], chunk["flow"])]]
+            yield chunk
+
+
+def rank(k: int = 3, sources: dict = SOURCES) -> pd.DataFrame:
+    top = TopK(k)
+    for reporter, (paths, qty_col, factor) in sources.items():
+        cols = list(KEYS) + ["partner_id", "partnerDesc", "primaryValue", qty_col]
+        for chunk in _chunks(reporter, paths, cols):
+            tonnes = (chunk[qty_col] * factor).round(3)
+            for row, t in zip(chunk.itertuples(index=False), tonnes):
+                group = (reporter, row.period, row.flow, row.sector)
+                top.push(group + ("value",),      float(row.primaryValue), row.partner_id, row.partnerDesc)
+                top.push(group + ("quantity_t",), float(t),                row.partner_id, row.partnerDesc)
+
+    return pd.DataFrame(
+        top.rows(),
+        columns=["reporter", "period", "flow", "sector", "measure", "rank",
+                 "partner_id", "partnerDesc", "value", "group_total", "share"],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--k", type=int, default=3, help="partners kept per group")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    df = rank(args.k)
+    print(f"Ranked top {args.k} partners for "
+          f"{df.groupby(['reporter', 'period', 'flow', 'sector', 'measure']).ngroups:,} groups "
+          f"in {time.perf_counter() - t0:.2f} s")
+
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(OUT, index=False)
+    print(f"Saved: {OUT}  ({len(df):,} rows)")
+
+
+if __name__ == "__main__":
+    main()
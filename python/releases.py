@@ -0,0 +1,215 @@
+"""
+Cheap release check: is there a Census / Comext month (or a revision) newer
+than what docs/data/trade_data.json holds?
+
+Each source is probed with the smallest query that answers the question,
+instead of the full pull update.sh makes:
+
+  census export / import   one HS2 chapter (72), all countries, year-to-date
+                           through a month — a few KB.  Asked for the month
+                           after the latest one published (new period?) and
+                           for the latest one itself (revised?).
+  comext                   one CN chapter (72) × partner (US) × EU27 value
+                           series from the latest published month on, sent
+                           with If-None-Match / If-Modified-Since from the
+                           last check, so an unchanged dataset costs a 304.
+
+A revision is a change in the probe response for the latest published month
+since the previous check (its hash is kept in data/release_check.json with
+the validators); the first check of a month only records it, and a
+revision is reported by the one check that sees it.  Only the probed chapter
+is compared, so revisions elsewhere surface with the next period.  A probe that
+fails for any reason (network, HTTP error, no CENSUS_API_KEY) is reported as
+"probe failed" and never triggers a refresh.
+
+Usage:
+  python python/releases.py            # report; exit 10 if a refresh is due
+  python python/releases.py --run      # run ./update.sh when a refresh is due
+
+Exit status: 0 up to date, 10 (EXIT_DUE) refresh due, anything else a crash
+(with --run: update.sh's own status).
+
+Output: data/release_check.json  (probe hashes / validators per source)
+"""
+
+from __future__ import annotations
+
+import argparse, hashlib, json, subprocess, sys
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+import config
+
+ROOT       = Path(__file__).resolve().parents[1]
+TRADE_JSON = ROOT / "docs" / "data" / "trade_data.json"
+STATE      = ROOT / "data" / "release_check.json"
+UPDATE_SH  = ROOT / "update.sh"
+
+# same endpoints as build_data.py
+CENSUS_URLS = {
+    "export": ("https://api.census.gov/data/timeseries/intltrade/exports/hs", "E_COMMODITY", "ALL_VAL_YR", "me"),
+    "import": ("https://api.census.gov/data/timeseries/intltrade/imports/hs", "I_COMMODITY", "GEN_VAL_YR", "mi"),
+}
+COMEXT_BASE = "https://ec.europa.eu/eurostat/api/comext/dissemination/sdmx/2.1/data/DS-045409"
+
+PROBE_CHAPTER = "72"
+PROBE_PARTNER = "US"
+TIMEOUT       = 60
+
+EXIT_DUE = 10        # distinct from 1, which is what an uncaught error exits with
+
+
+def _next(period: str) -> str:
+    y, m = int(period[:4]), int(period[4:])
+    return f"{y + m // 12}{m % 12 + 1:02d}"
+
+
+def _hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+def published() -> dict[str, str | None]:
+    """Latest YYYYMM per source in trade_data.json (None if absent)."""
+    if not TRADE_JSON.exists():
+        return {"census:export": None, "census:import": None, "comext": None}
+    data  = json.loads(TRADE_JSON.read_text())
+    raw   = data.get("RAW", {})
+    raweu = data.get("RAWEU", {})
+    raweu = raweu.get(PROBE_PARTNER, raweu)          # older files: {sector: …}
+    latest = lambda periods: max(periods, default=None)
+    return {
+        **{f"census:{flow}": latest(p for s in raw.values() for p in s.get(field, {}))
+           for flow, (*_, field) in CENSUS_URLS.items()},
+        "comext": latest(p for s in raweu.values() for p in s),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Probes
+# ---------------------------------------------------------------------------
+
+def _census(flow: str, period: str) -> bytes | None:
+    """Body of the probe for one month; b"" if the month is not released, None on error."""
+    url, cmd, val, _ = CENSUS_URLS[flow]
+    r = requests.get(url, params={
+        "get":      f"CTY_CODE,CTY_NAME,{val}",
+        "YEAR":     period[:4],
+        "MONTH":    period[4:],
+        "COMM_LVL": "HS2",
+        cmd:        PROBE_CHAPTER,
+        "key":      config.census_key(),
+    }, timeout=TIMEOUT)
+    if r.status_code == 204 or (r.ok and not r.content.strip()):
+        return b""
+    if not r.ok:
+        print(f"    HTTP {r.status_code} ({flow} {period}): {r.text[:80]}")
+        return None
+    # order-independent: rows sorted before hashing
+    rows = r.json()
+    return json.dumps([rows[0]] + sorted(rows[1:])).encode()
+
+
+def check_census(flow: str, have: str | None, state: dict) -> str | None:
+    """'new period …' / 'revised …' / None (up to date); updates state."""
+    if have is None:
+        return "no Census months published yet"
+    nxt = _next(have)
+    body = _census(flow, nxt)
+    if body:
+        return f"new period {nxt}"
+    cur = _census(flow, have)
+    if body is None or cur is None:
+        state["error"] = True
+        return None
+    h, prev = _hash(cur), state.get("hash") if state.get("period") == have else None
+    state.update(period=have, hash=h)
+    return f"revised {have}" if prev and prev != h else None
+
+
+def check_comext(have: str | None, state: dict) -> str | None:
+    if have is None:
+        return "no Comext months published yet"
+    url = f"{COMEXT_BASE}/M.EU27_2020.{PROBE_PARTNER}.{PROBE_CHAPTER}.1.VALUE_IN_EUROS/"
+    headers = {}
+    if state.get("period") == have:
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+    r = requests.get(url, params={"format": "SDMX-CSV", "startPeriod": f"{have[:4]}-{have[4:]}"},
+                     headers=headers, timeout=TIMEOUT)
+    if r.status_code == 304:
+        return None
+    if r.status_code == 404:                          # no observation from that month on
+        return None
+    if not r.ok:
+        print(f"    HTTP {r.status_code} (comext): {r.text[:80]}")
+        state["error"] = True
+        return None
+
+    # SDMX-CSV: TIME_PERIOD / OBS_VALUE columns; keep only those two, sorted
+    lines  = r.text.splitlines()
+    head   = [c.strip().upper() for c in lines[0].split(",")] if lines else []
+    if "TIME_PERIOD" not in head or "OBS_VALUE" not in head:
+        return None
+    t, v   = head.index("TIME_PERIOD"), head.index("OBS_VALUE")
+    obs    = sorted({(f[t].replace("-", ""), f[v]) for f in (l.split(",") for l in lines[1:]) if len(f) > max(t, v)})
+    newer  = [p for p, _ in obs if p > have]
+    h, prev = _hash(repr([o for o in obs if o[0] == have]).encode()), \
+              state.get("hash") if state.get("period") == have else None
+    state.update(period=have, hash=h)
+    for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+        state.pop(key, None)
+        if r.headers.get(header):
+            state[key] = r.headers[header]
+    if newer:
+        return f"new period {max(newer)}"
+    return f"revised {have}" if prev and prev != h else None
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def check() -> dict[str, str | None]:
+    """{source: finding or None}; probe state is saved to STATE."""
+    state = json.loads(STATE.read_text()) if STATE.exists() else {}
+    have  = published()
+    found: dict[str, str | None] = {}
+    for source in have:
+        s = {k: v for k, v in state.get(source, {}).items() if k != "error"}
+        try:
+            found[source] = (check_comext(have[source], s) if source == "comext"
+                             else check_census(source.split(":")[1], have[source], s))
+        except Exception as exc:          # any probe failure: report, never trigger
+            print(f"    probe error ({source}): {type(exc).__name__}: {exc}")
+            s["error"], found[source] = True, None
+        s["checked"] = datetime.now().isoformat(timespec="seconds")
+        state[source] = s
+        status = found[source] or ("probe failed" if s.get("error") else "up to date")
+        print(f"  {source:<14} published {have[source] or '—':<7} {status}")
+    STATE.parent.mkdir(parents=True, exist_ok=True)
+    STATE.write_text(json.dumps(state, indent=1, sort_keys=True) + "\n")
+    return found
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--run", action="store_true", help="run ./update.sh when a refresh is due")
+    args = ap.parse_args()
+
+    print(f"Release check against {TRADE_JSON.relative_to(ROOT)}")
+    due = [s for s, f in check().items() if f]
+    if not due:
+        print("Nothing new — no refresh needed.")
+        return
+    print(f"Refresh due ({', '.join(due)}).")
+    if args.run:
+        sys.exit(subprocess.run([str(UPDATE_SH)], cwd=ROOT).returncode)
+    sys.exit(EXIT_DUE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+CBAM product scope shared by every stage: CN codes, HS6 headings and the
+sector keys each output uses.
+
+The scope is defined once, in reference/cbam_scope.csv (one row per Annex I
+CN entry: sector, RAWEU group, RAW key, dashboard card).  `python
+python/sectors.py` compiles it into docs/data/cbam_codes.json — every lookup
+below, the benchmark per CN entry from cbamBenchmarks.js, and the card → RAW
+key map the dashboard reads — so neither Python nor JS rebuilds code sets.
+
+  CN_CODES         Comext CN codes per sector (EU IR 2025/2620 Annex I)
+  SECTOR_HEADINGS  the same scope as HS6 codes / HS4 prefixes for Census data
+  COMEXT_SECTORS   CN_CODES regrouped into the dashboard's RAWEU sectors
+  RAW_KEYS         dashboard RAW keys (HS chapter / heading), see hs6_to_key
+  BENCHMARK        CN entry → tCO2e/t benchmark
+
+Importing reads the compiled JSON only.  If it is missing or older than the
+CSV / cbamBenchmarks.js it is compiled in memory with a warning (never
+written at import).
+
+Usage:
+  python python/sectors.py            # compile docs/data/cbam_codes.json
+
+Output: docs/data/cbam_codes.json
+"""
+
+from __future__ import annotations
+
+import csv, hashlib, json, sys
+from pathlib import Path
+from typing import Optional
+
+ROOT          = Path(__file__).resolve().parents[1]
+SCOPE_CSV     = ROOT / "reference" / "cbam_scope.csv"
+BENCHMARKS_JS = ROOT / "reference" / "cbamBenchmarks.js"
+CODES_JSON    = ROOT / "docs" / "data" / "cbam_codes.json"
+
+
+# ---------------------------------------------------------------------------
+# Compile
+# ---------------------------------------------------------------------------
+
+def _source_hash() -> str:
+    h = hashlib.sha256()
+    for p in (SCOPE_CSV, BENCHMARKS_JS):
+        h.update(p.read_bytes())
+    return h.hexdigest()[:16]
+
+
+def _heading(cn: str) -> str:
+    # Census side: a 4-digit entry covers the whole heading (prefix match),
+    # anything longer is matched as its exact HS6 code.
+    return cn if len(cn) == 4 else cn[:6]
+
+
+def compile_scope() -> dict:
+    """Build the artifact from reference/cbam_scope.csv."""
+    from benchmarks import benchmark_for_code
+
+    with SCOPE_CSV.open(encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f, skipinitialspace=True))
+
+    sectors: dict[str, dict] = {}
+    raweu:   dict[str, list[str]] = {}
+    cards:   dict[str, list[str]] = {}
+    raw_key: dict[str, str] = {}
+    cn:      dict[str, dict] = {}
+    for r in rows:
+        code, sector, key = r["cn_code"], r["sector"], r["raw_key"]
+        s = sectors.setdefault(sector, {"raweu": r["raweu"], "cn": [], "headings": []})
+        s["cn"].append(code)
+        if _heading(code) not in s["headings"]:
+            s["headings"].append(_heading(code))
+        if sector not in raweu.setdefault(r["raweu"], []):
+            raweu[r["raweu"]].append(sector)
+        if key:
+            raw_key[_heading(code)] = key
+            if key not in cards.setdefault(r["card"], []):
+                cards[r["card"]].append(key)
+        cn[code] = {"sector": sector, "raweu": r["raweu"], "raw_key": key or None,
+                    "card": r["card"] or None, "benchmark": benchmark_for_code(code),
+                    "note": r["note"]}
+
+    return {
+        "source":   _source_hash(),
+        "sectors":  sectors,
+        "raweu":    raweu,
+        "raw_keys": list(dict.fromkeys(k for k in raw_key.values())),
+        "raw_key":  raw_key,
+        "cards":    cards,
+        "cn":       cn,
+    }
+
+
+def _load() -> dict:
+    if CODES_JSON.exists():
+        scope = json.loads(CODES_JSON.read_text(encoding="utf-8"))
+        if scope.get("source") == _source_hash():
+            return scope
+        print(f"  ⚠ {CODES_JSON.name} is stale — run: climate-trade codes", file=sys.stderr)
+    else:
+        print(f"  ⚠ {CODES_JSON.name} missing — run: climate-trade codes", file=sys.stderr)
+    return compile_scope()
+
+
+SCOPE = _load()
+
+
+# ---------------------------------------------------------------------------
+# Lookups
+# ---------------------------------------------------------------------------
+
+# sector → Comext CN codes (4, 6 or 8 digits, regulation level)
+CN_CODES: dict[str, list[str]] = {s: v["cn"] for s, v in SCOPE["sectors"].items()}
+
+# sector → Census headings.  6-digit codes: exact HS6 match (first 6 digits of
+# the CN-8 entry); 4-digit codes: prefix match — any HS6 under that heading.
+SECTOR_HEADINGS: dict[str, set[str]] = {s: set(v["headings"]) for s, v in SCOPE["sectors"].items()}
+
+HEADING_TO_SECTOR: dict[str, str] = {
+    code: sector for sector, codes in SECTOR_HEADINGS.items() for code in codes
+}
+HS6_EXACT:    set[str] = {c for c in HEADING_TO_SECTOR if len(c) == 6}
+HS4_PREFIXES: set[str] = {c for c in HEADING_TO_SECTOR if len(c) == 4}
+
+BENCHMARK: dict[str, Optional[float]] = {c: v["benchmark"] for c, v in SCOPE["cn"].items()}
+
+
+def is_cbam(hs6: str) -> bool:
+    return hs6 in HS6_EXACT or hs6[:4] in HS4_PREFIXES
+
+
+def sector_for(hs6: str) -> Optional[str]:
+    return HEADING_TO_SECTOR.get(hs6) or HEADING_TO_SECTOR.get(hs6[:4])
+
+
+# ---------------------------------------------------------------------------
+# Dashboard groupings (docs/data/trade_data.json)
+# ---------------------------------------------------------------------------
+
+# RAWEU sector → CN_CODES sectors it combines
+COMEXT_GROUPS: dict[str, list[str]] = SCOPE["raweu"]
+COMEXT_SECTORS: dict[str, list[str]] = {
+    key: [code for s in group for code in CN_CODES[s]] for key, group in COMEXT_GROUPS.items()
+}
+
+RAW_KEYS: list[str] = SCOPE["raw_keys"]
+_RAW_KEY: dict[str, str] = SCOPE["raw_key"]
+
+
+def hs6_to_key(hs6: str) -> Optional[str]:
+    """Dashboard RAW key of an in-scope HS4/HS6/CN8 code (see is_cbam); None otherwise."""
+    return _RAW_KEY.get(hs6[:6].ljust(6, "0")) or _RAW_KEY.get(hs6[:4])
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    scope = compile_scope()
+    CODES_JSON.parent.mkdir(parents=True, exist_ok=True)
+    CODES_JSON.write_text(json.dumps(scope, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+    print(f"  {len(scope['cn'])} CN entries, "
+          f"{sum(len(v['headings']) for v in scope['sectors'].values())} Census headings, "
+          f"{len(scope['raw_keys'])} RAW keys, "
+          f"{sum(v['benchmark'] is None for v in scope['cn'].values())} without benchmark")
+    print(f"Saved: {CODES_JSON}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+In-memory trade cube with an indexed query API.
+
+Loads the partner-level pipeline outputs once into dense NumPy arrays:
+
+  partner cube:  reporter × flow × sector × partner × period
+                   data/raw/us_trade_hard_to_abate_partner_raw.csv  (reporter "US", USD, kg)
+                   data/raw/eu_trade_hard_to_abate_partner_raw.csv  (reporter "EU", EUR, 100 kg)
+                   data/processed/us_trade_comtrade_partner.csv     (reporter "COMTRADE", USD, kg:
+                     US exports as reported to UN Comtrade, comtrade.py)
+  hs6 cube:      flow × hs6 × period   (US trade with the EU27 aggregate)
+                   data/raw/us_eu27_trade_raw.csv
+
+Every dimension label maps to an integer position through a dict, so a slice
+is a handful of dict lookups plus one NumPy fancy index.  Missing cells are
+NaN.  The partner axis is indexed by partner_id from partners.py, so US and
+EU rows for the same country land on the same position.
+
+Measures: "value" (reporter currency: USD for US, EUR for EU), "value_usd"
+(EU converted with fx.py) and "quantity_t".
+
+Example:
+    from trade_cube import load
+    cube = load()
+    cube.query(reporter="US", flow="Export", sector="aluminum_76",
+               partner="Türkiye", period=range(2019, 2025), by="period")
+    cube.query(reporter="EU", flow="Import", period=2024, by=("sector", "partner"))
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+import partners
+
+ROOT    = Path(__file__).resolve().parents[1]
+US_CSV  = ROOT / "data" / "raw" / "us_trade_hard_to_abate_partner_raw.csv"
+EU_CSV  = ROOT / "data" / "raw" / "eu_trade_hard_to_abate_partner_raw.csv"
+HS6_CSV = ROOT / "data" / "raw" / "us_eu27_trade_raw.csv"
+CT_CSV  = ROOT / "data" / "processed" / "us_trade_comtrade_partner.csv"
+
+DIMS     = ("reporter", "flow", "sector", "partner", "period")
+HS6_DIMS = ("flow", "hs6", "period")
+
+
+class Cube:
+    """Dense measure arrays over named, label-indexed dimensions."""
+
+    def __init__(self, dims: tuple[str, ...], labels: dict[str, list], measures: dict[str, np.ndarray]):
+        self.dims     = dims
+        self.labels   = labels
+        self.index    = {d: {lab: i for i, lab in enumerate(labels[d])} for d in dims}
+        self.measures = measures
+        self._memo: dict[tuple, object] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dims: tuple[str, ...], measures: list[str]) -> "Cube":
+        # rows sharing a key (concordance splits, merged partner aliases) add up
+        df = df.groupby(list(dims), sort=False)[measures].sum(min_count=1).reset_index()
+        labels = {d: sorted(df[d].unique().tolist()) for d in dims}
+        codes  = tuple(pd.Categorical(df[d], categories=labels[d]).codes for d in dims)
+        shape  = tuple(len(labels[d]) for d in dims)
+        arrays = {}
+        for m in measures:
+            a = np.full(shape, np.nan)
+            a[codes] = df[m].to_numpy(float)
+            arrays[m] = a
+        return cls(dims, labels, arrays)
+
+    # -- selection ----------------------------------------------------------
+
+    def _resolve(self, dim: str, sel) -> np.ndarray | slice:
+        if sel is None:
+            return slice(None)
+        if dim == "partner":
+            sel = _partner_ids(sel)
+        idx = self.index[dim]
+        keys = [sel] if isinstance(sel, (str, int, np.integer)) else list(sel)
+        return np.array([idx[k] for k in keys if k in idx], dtype=int)
+
+    def query(self, measure: str = "value", by: str | Iterable[str] = (), **sel):
+        """Slice on any dimensions and sum the rest away.
+
+        by:   dimensions to keep (str or tuple); the result is a Series indexed by
+              them.  With no `by`, returns the scalar total of the selection.
+        sel:  dimension=label, list/range of labels, or None for all.
+        Results are memoized per argument set.
+        """
+        by  = (by,) if isinstance(by, str) else tuple(by)
+        key = (measure, by) + tuple((d, _freeze(sel.get(d))) for d in self.dims)
+        if key not in self._memo:
+            self._memo[key] = self._query(measure, by, sel)
+        return self._memo[key]
+
+    def _query(self, measure: str, by: tuple[str, ...], sel: dict):
+        unknown = set(sel) - set(self.dims)
+        if unknown:
+            raise KeyError(f"unknown dimension(s) {sorted(unknown)}; cube has {self.dims}")
+
+        a = self.measures[measure]
+        pos: list[np.ndarray] = []
+        for axis, d in enumerate(self.dims):
+            r = self._resolve(d, sel.get(d))
+            p = np.arange(a.shape[axis]) if isinstance(r, slice) else r
+            a = np.take(a, p, axis=axis)
+            pos.append(p)
+
+        drop = tuple(i for i, d in enumerate(self.dims) if d not in by)
+        all_nan = np.isnan(a).all(axis=drop) if drop else np.isnan(a)
+        total   = np.nansum(a, axis=drop) if drop else a
+        total   = np.where(all_nan, np.nan, total)
+        if not by:
+            return float(total)
+
+        kept = [d for d in self.dims if d in by]
+        idx  = pd.MultiIndex.from_product(
+            [[self.labels[d][i] for i in pos[self.dims.index(d)]] for d in kept], names=kept
+        )
+        s = pd.Series(np.ravel(total), index=idx, name=measure).dropna()
+        if "partner" in kept:
+            names = partners.table()["name"]
+            s = s.rename(index=lambda p: names.get(p, p), level="partner") if len(kept) > 1 \
+                else s.rename(index=names)
+        return s.reorder_levels(list(by)) if len(by) > 1 else s
+
+
+def _freeze(sel):
+    if sel is None or isinstance(sel, (str, int, np.integer)):
+        return sel
+    return tuple(sel)
+
+
+def _partner_ids(sel):
+    """Accept partner_id, display name or ISO2 (single or iterable)."""
+    if isinstance(sel, (int, np.integer)):
+        return int(sel)
+    if isinstance(sel, str):
+        dim = partners.table()
+        for col in ("name", "iso2", "iso3"):
+            hit = dim.index[dim[col].str.casefold() == sel.casefold()]
+            if len(hit):
+                return int(hit[0])
+        raise KeyError(f"unknown partner {sel!r}")
+    return [_partner_ids(s) for s in sel]
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def _partner_frame() -> pd.DataFrame:
+    frames = []
+    for reporter, path, qty, factor in (("US",       US_CSV, "quantity_kg",    1 / 1000),
+                                        ("EU",       EU_CSV, "quantity_100kg", 1 / 10),
+                                        ("COMTRADE", CT_CSV, "quantity_kg",    1 / 1000)):
+        if not path.exists():
+            continue
+        df = pd.read_csv(path)
+        df = df.assign(reporter=reporter, partner=df["partner_id"],
+                       value=df["primaryValue"], quantity_t=df[qty] * factor)
+        frames.append(df[list(DIMS) + ["value", "quantity_t"]])
+    df = pd.concat(frames, ignore_index=True)
+
+    import fx
+    rate = fx.rates_for(df["period"]).where(df["reporter"] == "EU", 1.0)
+    df["value_usd"] = df["value"] * rate
+    return df
+
+
+@lru_cache(maxsize=None)
+def load() -> Cube:
+    """Partner cube, built once per process."""
+    df = _partner_frame()
+    measures = [m for m in ("value", "value_usd", "quantity_t") if m in df.columns]
+    return Cube.from_frame(df, DIMS, measures)
+
+
+@lru_cache(maxsize=None)
+def load_hs6() -> Cube:
+    """HS6 cube (US trade with the EU27), built once per process."""
+    df = pd.read_csv(HS6_CSV, dtype={"hs6": str})
+    df = df.assign(value=df["primaryValue"], quantity_t=df["quantity_kg"] / 1000)
+    return Cube.from_frame(df, HS6_DIMS, ["value", "quantity_t"])
+
+
+def query(measure: str = "value", by: str | Iterable[str] = (), **sel):
+    """Shortcut for load().query(...)."""
+    return load().query(measure, by, **sel)
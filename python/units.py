@@ -0,0 +1,60 @@
+"""
+Fixed-point measures for the aggregation path.
+
+Monetary values are int64 whole currency units (USD, EUR) and weights int64
+kilograms from the moment a response is parsed until trade_data.json or a
+partition is written, so every sum is exact and independent of the order
+rows arrive in (thread completion, chunk boundaries).  This module is the
+only place values are parsed, converted between units or rounded:
+
+  parse, whole, kg      on the way in   (API cell / frame column → int64)
+  tonnes                on the way out  (kg → t at 0.1 t, for serialization)
+
+Rounding is half-up on the absolute value, in integer arithmetic where the
+input is already integer.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def parse(v) -> int:
+    """One API cell (str / number / None) → int; 0 when missing or not a number."""
+    if v is None:
+        return 0
+    if isinstance(v, (int, np.integer)):
+        return int(v)
+    if isinstance(v, str):
+        try:
+            return int(v)                         # integer string (Census cells)
+        except ValueError:
+            pass
+    try:
+        f = float(v)
+    except (ValueError, TypeError):
+        return 0
+    return int(np.sign(f) * np.floor(abs(f) + 0.5)) if np.isfinite(f) else 0
+
+
+def whole(s: pd.Series, scale: int = 1) -> pd.Series:
+    """Numeric column (× scale) → int64, missing as 0."""
+    x = pd.to_numeric(s, errors="coerce")
+    if pd.api.types.is_integer_dtype(x):          # integer cells (Census): no float round trip
+        return x.fillna(0).astype("int64") * scale
+    x = x.fillna(0).to_numpy(float) * scale
+    return pd.Series(np.copysign(np.floor(np.abs(x) + 0.5), x).astype("int64"), index=s.index)
+
+
+def kg(quantity_100kg: pd.Series) -> pd.Series:
+    """Comext QUANTITY_IN_100KG → int64 kg."""
+    return whole(quantity_100kg, 100)
+
+
+def tonnes(kg):
+    """int kg (scalar or int64 Series) → tonnes rounded to 0.1 t; the single kg → t step."""
+    if isinstance(kg, pd.Series):
+        return np.sign(kg) * ((kg.abs() + 50) // 100) / 10
+    t = (abs(int(kg)) + 50) // 100 / 10
+    return -t if kg < 0 else t
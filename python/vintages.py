@@ -0,0 +1,152 @@
+"""
+Vintage store: a deduplicated snapshot of the published series on every run.
+
+Census and Eurostat revise past months, and build_data.build() overwrites
+RAW / RAWEU with whatever comes back.  Each build records what it published:
+
+  data/vintages/objects/ab/abcdef….json.gz   one chunk = one series-year,
+                                             named by the SHA-256 of its content
+  data/vintages/runs/20260615T101500.json    manifest: chunk key → hash
+
+Chunk keys are "<source>/<sector>/<field>/<year>", e.g. "census/72/me/2025"
+or "comext/steel/m/2025"; Comext partners other than the US carry their code
+in the source ("comext.CN/steel/m/2025"), so US chunks keep the keys they had
+before RAWEU was keyed by partner.  A chunk whose values did not change is stored
+once and only referenced again from the next manifest, so a run that revises
+a handful of months adds a few small objects plus one manifest.
+
+diff() compares two manifests key by key and only opens the chunks whose
+hashes differ, so "what changed since last month" reads a few files.
+
+Usage:
+  python python/vintages.py record        # snapshot docs/data/trade_data.json
+  python python/vintages.py list
+  python python/vintages.py diff [OLD] [NEW]   # default: the two latest runs
+"""
+
+from __future__ import annotations
+
+import gzip, hashlib, json, sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT       = Path(__file__).resolve().parents[1]
+STORE      = ROOT / "data" / "vintages"
+OBJECTS    = STORE / "objects"
+RUNS       = STORE / "runs"
+TRADE_JSON = ROOT / "docs" / "data" / "trade_data.json"
+
+
+# ---------------------------------------------------------------------------
+# Chunking
+# ---------------------------------------------------------------------------
+
+def _chunks(RAW: dict, RAWEU: dict) -> dict[str, dict]:
+    """Split RAW / RAWEU into {chunk key: {period: value}} by series and year."""
+    out: dict[str, dict] = {}
+    for sector, fields in RAW.items():
+        for field, series in fields.items():
+            for period, v in series.items():
+                out.setdefault(f"census/{sector}/{field}/{period[:4]}", {})[period] = v
+    for partner, sectors in RAWEU.items():
+        source = "comext" if partner == "US" else f"comext.{partner}"
+        for sector, series in sectors.items():
+            for period, v in series.items():
+                out.setdefault(f"{source}/{sector}/m/{period[:4]}", {})[period] = v
+    return out
+
+
+def _put(chunk: dict) -> str:
+    body   = json.dumps(chunk, sort_keys=True, separators=(",", ":")).encode()
+    digest = hashlib.sha256(body).hexdigest()
+    path   = OBJECTS / digest[:2] / f"{digest}.json.gz"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(gzip.compress(body, mtime=0))
+    return digest
+
+
+def _get(digest: str) -> dict:
+    return json.loads(gzip.decompress((OBJECTS / digest[:2] / f"{digest}.json.gz").read_bytes()))
+
+
+# ---------------------------------------------------------------------------
+# Runs
+# ---------------------------------------------------------------------------
+
+def record(RAW: dict, RAWEU: dict, label: str | None = None) -> Path:
+    """Store one vintage; returns the manifest path."""
+    chunks = {key: _put(chunk) for key, chunk in sorted(_chunks(RAW, RAWEU).items())}
+    label  = label or datetime.now().strftime("%Y%m%dT%H%M%S")
+    RUNS.mkdir(parents=True, exist_ok=True)
+    path = RUNS / f"{label}.json"
+    path.write_text(json.dumps({"run": label, "chunks": chunks}, indent=0))
+    return path
+
+
+def runs() -> list[str]:
+    return sorted(p.stem for p in RUNS.glob("*.json"))
+
+
+def _manifest(run: str) -> dict[str, str]:
+    return json.loads((RUNS / f"{run}.json").read_text())["chunks"]
+
+
+def diff(old: str, new: str) -> list[dict]:
+    """Revised, added and dropped observations between two runs."""
+    a, b = _manifest(old), _manifest(new)
+    changes: list[dict] = []
+    for key in sorted(a.keys() | b.keys()):
+        if a.get(key) == b.get(key):
+            continue
+        ca = _get(a[key]) if key in a else {}
+        cb = _get(b[key]) if key in b else {}
+        for period in sorted(ca.keys() | cb.keys()):
+            va, vb = ca.get(period), cb.get(period)
+            if va == vb:
+                continue
+            # RAWEU values are [EUR, tonnes]; compare on value
+            x = va[0] if isinstance(va, list) else va
+            y = vb[0] if isinstance(vb, list) else vb
+            series = key.rsplit("/", 1)[0]
+            changes.append({
+                "series": series, "period": period, "old": va, "new": vb,
+                "delta": None if x is None or y is None else y - x,
+                "pct":   None if not x or y is None else (y / x - 1) * 100,
+            })
+    return changes
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "list"
+
+    if cmd == "record":
+        data = json.loads(TRADE_JSON.read_text())
+        print(f"Recorded {record(data['RAW'], data['RAWEU'])}")
+
+    elif cmd == "list":
+        for run in runs():
+            print(run)
+
+    elif cmd == "diff":
+        all_runs = runs()
+        if len(sys.argv) < 4 and len(all_runs) < 2:
+            print("Need at least two recorded runs to diff.")
+            return
+        old, new = (sys.argv[2:4] if len(sys.argv) >= 4 else all_runs[-2:])
+        changes = diff(old, new)
+        print(f"{old} → {new}: {len(changes)} observations changed")
+        for c in changes:
+            pct = f"{c['pct']:+.1f}%" if c["pct"] is not None else "new" if c["old"] is None else "dropped"
+            print(f"  {c['series']:<22} {c['period']}  {c['old']} → {c['new']}  ({pct})")
+
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+import build_data
+import partitions
+import partners
+
+EU, CA = partners.iso2_id("EU"), partners.iso2_id("CA")
+GAP = (2024, 3)                     # the EU row is missing from this month's response
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(partitions, "STORE", tmp_path / "partitions")
+    monkeypatch.setattr(build_data.time, "sleep", lambda s: None)
+
+    def fetch_ytd(flow, year, month):
+        eu = (year, month) != GAP
+        partner = {("760110", CA): [7 * month, 100 * month]}      # the world rows
+        if eu:
+            partner[("760110", EU)] = [10 * month, 1000 * month]
+        return ({"76": 10 * month} if eu else {}, {"76": 1000 * month} if eu else {},
+                {"76": 7 * month}, {"76": 100 * month}, partner)
+
+    monkeypatch.setattr(build_data, "fetch_ytd", fetch_ytd)
+
+
+def _raw():
+    fields = ("me", "mew", "mw", "mi", "miw", "mwm", "awx", "awm")
+    return {k: {f: {} for f in fields} for k in build_data.RAW_KEYS}
+
+
+def test_ytd_walk_diffs_each_component_only_against_a_present_month():
+    RAW, notes = _raw(), {"eu_row_missing": [], "negative_diffs": []}
+    build_data.ytd_walk("export", RAW, notes)
+
+    me, mw = RAW["76"]["me"], RAW["76"]["mw"]
+    assert me["202402"] == 10 and mw["202402"] == 100
+    assert "202403" not in me and "202404" not in me    # no EU row, and no EU month to diff 202404 against
+    assert mw["202403"] == mw["202404"] == 100          # the world side diffs on its own
+    assert me["202405"] == 10 and me["202501"] == 10    # back once two present months meet; January resets
+    assert notes["eu_row_missing"] == [("me", "202403")] and not notes["negative_diffs"]
+
+    p = partitions.read("us_partner", "Export", only=["202404"], dtype={"sector": str, "hs6": str})
+    assert set(p["partner_id"]) == {CA}                 # partition keeps the same components
+    assert build_data.stored_month("export", "202404") == (None, {k: 100 if k == "76" else 0
+                                                                  for k in build_data.RAW_KEYS})
+
+
+def test_a_second_walk_reads_settled_years_back_unchanged(monkeypatch):
+    first, notes = _raw(), {"eu_row_missing": [], "negative_diffs": []}
+    build_data.ytd_walk("export", first, notes)
+    assert 2024 in build_data.stored_years("Export")
+
+    fetched, fetch = [], build_data.fetch_ytd
+    monkeypatch.setattr(build_data, "fetch_ytd", lambda f, y, m: fetched.append(y) or fetch(f, y, m))
+    second = _raw()
+    build_data.ytd_walk("export", second, {"eu_row_missing": [], "negative_diffs": []})
+    assert 2024 not in fetched and fetched
+    assert second == first
+
+
+def test_comext_responses_are_split_by_partner(monkeypatch):
+    slots = []
+
+    def request(batch, partner_codes):
+        slots.append(tuple(partner_codes))
+        return pd.DataFrame({"PARTNER": ["US", "US", "CA", "CA"], "PRODUCT": batch[0],
+                             "TIME_PERIOD": "2025-01",
+                             "INDICATORS": ["VALUE_IN_EUROS", "QUANTITY_IN_100KG"] * 2,
+                             "OBS_VALUE": [100, 2.5, 40, 1.0]})
+
+    monkeypatch.setattr(build_data, "_comext_request", request)
+    serial   = build_data.fetch_comext_monthly(["US", "CA"], workers=1)
+    parallel = build_data.fetch_comext_monthly(["US", "CA"], workers=4)
+    assert serial == parallel and set(serial) == {"US", "CA"}
+    assert set(slots) == {("US", "CA")}                 # one request per batch carries both partners
+
+    n = {s: sum(sector == s for sector, _ in build_data._comext_batches()) for s in build_data.COMEXT_SECTORS}
+    steel = serial["US"]["steel"]["202501"]
+    assert steel == [100 * n["steel"], build_data.units.tonnes(250 * n["steel"])]
+    assert serial["CA"]["steel"]["202501"][0] == 40 * n["steel"]
+
+
+def test_older_raweu_is_read_as_the_us_partner():
+    old = {"steel": {"202401": [1, 0.1]}}
+    assert build_data.raweu_by_partner(old) == {"US": old}
+    assert build_data.raweu_by_partner({"US": old, "CA": old}) == {"US": old, "CA": old}
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import cbam_exposure as ce
+import fx
+from benchmarks import load_cbam_factor
+
+
+def _direct(draws: int, chunk: int, seed: int) -> tuple[np.ndarray, list[str]]:
+    """Every draw of simulate() kept in memory: shape (draws, years, sectors)."""
+    df, sectors = ce.load_inputs()
+    factor_by_year = load_cbam_factor()
+    years  = sorted(factor_by_year)
+    factor = np.array([factor_by_year[y] for y in years])
+    markup = np.array([ce.MARKUP.get(y, ce.MARKUP_LATER) for y in years])
+    rng = np.random.default_rng(seed)
+    parts, done = [], 0
+    while done < draws:
+        n = min(chunk, draws - done)
+        parts.append(ce._chunk(rng, n, df["avg_tonnes"].to_numpy(float), df["benchmark"].to_numpy(float),
+                               df["sector_idx"].to_numpy(int), len(sectors), factor, markup, fx.latest()))
+        done += n
+    return np.concatenate(parts), sectors
+
+
+def test_histogram_bands_match_direct_percentiles():
+    draws, chunk, seed = 6_000, 1_000, 7
+    bands = ce.simulate(draws, chunk, seed)
+    exp, sectors = _direct(draws, chunk, seed)
+    years = sorted(load_cbam_factor())
+
+    assert list(bands) == sectors
+    for si, sector in enumerate(sectors):
+        for yi, year in enumerate(years):
+            band = bands[sector][str(year)]
+            want = np.percentile(exp[:, yi, si], ce.PERCENTILES, method="inverted_cdf")
+            got  = [band[f"p{p}"] for p in ce.PERCENTILES]
+            assert got == pytest.approx(want, rel=5e-3, abs=1)       # bin resolution ≈ 0.3%
+            assert band["mean"] == pytest.approx(exp[:, yi, si].mean(), abs=1)
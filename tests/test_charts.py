@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+import charts
+import partners
+from trade_cube import DIMS, Cube
+
+CA, MX = partners.iso2_id("CA"), partners.iso2_id("MX")
+
+
+@pytest.fixture
+def cube():
+    df = pd.DataFrame([
+        ("US", "Export", "iron_steel_72", CA, 2023, 10.0, 1.0),
+        ("US", "Export", "iron_steel_73", CA, 2023,  5.0, 1.0),
+        ("US", "Export", "iron_steel_72", MX, 2023, 12.0, 1.0),
+        ("US", "Export", "hydrogen_2804", MX, 2023, 99.0, 1.0),
+        ("US", "Export", "aluminum_76",   MX, 2024,  4.0, 1.0),
+        ("COMTRADE", "Export", "iron_steel_72", CA, 2023, 10.0, 1.0),
+        ("COMTRADE", "Export", "iron_steel_73", CA, 2023,  5.5, 1.0),
+        ("COMTRADE", "Export", "iron_steel_72", MX, 2023, 12.0, 1.0),
+        ("COMTRADE", "Export", "hydrogen_2804", MX, 2023, 99.0, 1.0),
+        ("COMTRADE", "Export", "aluminum_76",   MX, 2024,  4.0, 1.0),
+    ], columns=list(DIMS) + ["value", "quantity_t"])
+    return Cube.from_frame(df, DIMS, ["value", "quantity_t"])
+
+
+def test_tree_chart_writes_only_changed_files(cube, tmp_path):
+    chart = [charts.Chart("t", "US", ("Export",), "top", top=1)]
+    assert charts.export(chart, cube, tmp_path) == {"t": (4, 0, 0)}
+    assert (tmp_path / "t" / "2023" / "hydrogen_2804.csv").exists()
+    assert charts.export(chart, cube, tmp_path) == {"t": (0, 4, 0)}
+
+
+def test_single_file_chart_with_published_sector_keys(cube, tmp_path, monkeypatch):
+    monkeypatch.setattr(charts, "ROOT", tmp_path)
+    chart = charts.Chart("legacy", "COMTRADE", ("Export",), "top_legacy", top=3,
+                         sectors=charts.LEGACY_SECTORS, path="top3.csv")
+    assert charts.export([chart], cube, tmp_path / "charts") == {"legacy": (1, 0, 0)}
+
+    out = pd.read_csv(tmp_path / "top3.csv")
+    assert list(out.columns) == ["period", "sector", "partnerDesc", "export_value_usd",
+                                 "year_sector_total", "share"]
+    assert set(out["sector"]) == {"iron_steel", "aluminum"}                 # hydrogen left out
+    steel = out[out["sector"] == "iron_steel"]
+    assert steel[["partnerDesc", "export_value_usd"]].values.tolist() == [["Canada", 15.5], ["Mexico", 12]]
+    assert steel["share"].tolist() == pytest.approx([15.5 / 27.5, 12 / 27.5], abs=1e-15)   # unrounded
+    assert not (tmp_path / "charts").exists()
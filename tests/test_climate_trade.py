@@ -0,0 +1,43 @@
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import climate_trade
+
+PYTHON = Path(climate_trade.__file__).parent
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-c", f"import sys; sys.path.insert(0, {str(PYTHON)!r}); {code}"],
+                          capture_output=True, text=True, check=True)
+
+
+def test_help_loads_no_stage_module():
+    out = _run("import climate_trade; climate_trade.main(['--help']); "
+               "print(sorted(m for m in sys.modules if m in ('pandas', 'numpy', 'requests')))").stdout
+    assert "usage: climate-trade" in out and out.rstrip().endswith("[]")
+
+
+@pytest.mark.parametrize("command", sorted(climate_trade.COMMANDS))
+def test_every_command_module_has_main(command):
+    module = importlib.import_module(climate_trade.COMMANDS[command][0])
+    assert callable(module.main)
+
+
+def test_importing_every_module_writes_nothing():
+    root = PYTHON.parent
+    snapshot = lambda: {p: p.stat().st_mtime_ns for d in ("data", "docs", "reference")
+                        for p in (root / d).rglob("*") if p.is_file()}
+    before = snapshot()
+    modules = sorted({m for m, _ in climate_trade.COMMANDS.values()})
+    _run("import importlib; " + "; ".join(f"importlib.import_module({m!r})" for m in modules))
+    assert snapshot() == before
+
+
+def test_unknown_command_exits_2(capsys):
+    with pytest.raises(SystemExit) as exit_:
+        climate_trade.main(["nope"])
+    assert exit_.value.code == 2 and "unknown command" in capsys.readouterr().out
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+import comext_bulk as cb
+import partners
+from fetch_eu_trade_raw import FLOW_CODES, aggregate, clean_df
+from sectors import CN_CODES
+
+KEY = ["period", "flow", "sector", "partner_id"]
+
+
+@pytest.fixture(scope="module")
+def bulk(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("comext")
+    rows = cb.fixture(tmp, rows=400)
+    months: dict[str, pd.DataFrame] = {}
+    annual = cb.ingest(sorted(tmp.glob("*.zip")), months.__setitem__, chunksize=700)
+    return rows, months, annual
+
+
+def test_sector_of_takes_the_longest_listed_prefix():
+    assert cb.sector_of("84713000") is None
+    for code, sector in cb.PREFIX_INDEX.items():
+        assert cb.sector_of(code.ljust(8, "0")) == sector
+
+
+def test_bulk_path_is_identical_to_the_api_path(bulk):
+    rows, _, annual = bulk
+    got  = cb.partner_rows(annual)
+    want = aggregate([clean_df(cb._sdmx(rows, codes, flow_code), flow_name, sector)
+                      for sector, codes in CN_CODES.items() for flow_name, flow_code in FLOW_CODES.items()])
+    got, want = (df.sort_values(KEY, ignore_index=True) for df in (got, want))
+    pd.testing.assert_frame_equal(got, want[got.columns], check_dtype=False, check_exact=True)
+
+
+def test_every_month_is_handed_over_with_extra_eu_partners_only(bulk):
+    rows, months, _ = bulk
+    assert sorted(months) == [f"2024{m:02d}" for m in range(1, 13)]
+    ids = pd.concat(months.values())["partner_id"]
+    assert not ids.map(partners.table()["eu27"]).any()
+
+    us = rows[(rows["PARTNER"] == "US") & (rows["FLOW"] == 1)
+              & rows["REPORTER"].isin(partners.eu27_comext_codes())
+              & rows["PRODUCT_NC"].map(cb.sector_of).notna()]
+    got = sum(df.loc[(df["flow"] == "Import") & (df["partner_id"] == partners.comext_id("US")), "value_eur"].sum()
+              for df in months.values())
+    assert got == us["VALUE_EUR"].sum()
@@ -0,0 +1,22 @@
+import pandas as pd
+
+import comtrade
+
+
+def test_chunked_read_matches_a_single_pass():
+    whole   = comtrade.load(chunksize=None)
+    chunked = comtrade.load(chunksize=3_000)
+    pd.testing.assert_frame_equal(whole, chunked, check_exact=True)
+
+
+def test_committed_output_is_the_adapter_output():
+    committed = pd.read_csv(comtrade.OUT, float_precision="round_trip")
+    out = comtrade.load()
+    assert list(out.columns) == list(committed.columns)
+    pd.testing.assert_frame_equal(out.astype(committed.dtypes.to_dict()), committed, check_exact=True)
+
+
+def test_only_the_typed_columns_are_read():
+    (df,) = comtrade.read(chunksize=None)
+    assert set(df.columns) == set(comtrade.DTYPES)
+    assert df["partnerISO"].dtype == "category"
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+import concordance
+
+TABLE = """\
+# test table
+level,code,first_year,last_year,ref_code,weight,note
+hs6,111111,2019,2021,222222,0.5,split
+hs6,111111,2019,2021,333333,0.5,split
+hs6,444444,2019,2020,555555,1,renumbered in 2021
+hs6,666666,2019,2099,666666,1,reviewed
+cn,77777777,2019,2099,88888888,0.3,partly in scope
+"""
+
+
+@pytest.fixture(autouse=True)
+def table(tmp_path, monkeypatch):
+    path = tmp_path / "hs_concordance.csv"
+    path.write_text(TABLE)
+    monkeypatch.setattr(concordance, "CONCORDANCE_CSV", path)
+    concordance._rows.cache_clear()
+    concordance.table.cache_clear()
+    yield
+    concordance._rows.cache_clear()
+    concordance.table.cache_clear()
+
+
+def frame(codes, years, values):
+    return pd.DataFrame({"hs6": codes, "year": years,
+                         "usd": pd.Series(values, dtype="int64"),
+                         "t": [float(v) for v in values]})
+
+
+def test_split_sums_back_to_the_source_value():
+    out = concordance.remap(frame(["111111"], [2020], [5]), "hs6", "year", "hs6", ("usd", "t"))
+    assert sorted(out["hs6"]) == ["222222", "333333"]
+    assert out["usd"].dtype == "int64"
+    assert out["usd"].sum() == 5                  # 2.5 + 2.5 each round up; remainder fixed
+    assert out["t"].tolist() == [2.5, 2.5]
+
+
+def test_split_of_many_rows_is_exact_per_row():
+    values = [1, 3, 7, 1001, 999_999]
+    out = concordance.remap(frame(["111111"] * 5, [2019] * 5, values), "hs6", "year", "hs6", ("usd",))
+    assert len(out) == 10
+    assert out["usd"].sum() == sum(values)
+
+
+def test_partial_weight_keeps_the_rounded_share():
+    df = pd.DataFrame({"cn": ["77777777"], "period": ["202305"], "eur": pd.Series([10], dtype="int64")})
+    out = concordance.remap(df, "cn", "period", "cn", ("eur",))
+    assert out.to_dict("records") == [{"cn": "88888888", "period": "202305", "eur": 3}]
+
+
+def test_validity_window():
+    out = concordance.remap(frame(["444444", "444444"], [2020, 2021], [10, 20]), "hs6", "year", "hs6", ("usd",))
+    assert out[["hs6", "year", "usd"]].values.tolist() == [["555555", 2020, 10], ["444444", 2021, 20]]
+
+
+def test_year_for_the_whole_frame():
+    out = concordance.remap(frame(["444444"], [0], [10]), "hs6", 2019, "hs6", ("usd",))
+    assert out["hs6"].tolist() == ["555555"]
+
+
+def test_frame_without_listed_codes_is_returned_unchanged():
+    df = frame(["720110"], [2020], [10])
+    assert concordance.remap(df, "hs6", "year", "hs6", ("usd",)) is df
+
+
+def test_reviewed_rows_do_not_map_and_are_not_candidates():
+    df = frame(["666666"], [2020], [10])
+    assert concordance.remap(df, "hs6", "year", "hs6", ("usd",)) is df
+    assert concordance.reviewed("hs6") == {"666666"}
+
+    span = pd.DataFrame({"hs6": ["666666", "999999", "720110", "720110"],
+                         "year": [2020, 2020, 2019, 2021]})
+    assert concordance.candidates(span, "hs6", "hs6").index.tolist() == ["999999"]
+
+
+def test_source_codes_adds_predecessors():
+    assert concordance.source_codes(["222222", "555555"], "hs6") == ["222222", "555555", "111111", "444444"]
@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+import fetch_eu_trade_raw as eu
+import fetch_plan
+import partitions
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch_plan, "METRICS", tmp_path / "run_metrics.csv")
+    monkeypatch.setattr(partitions, "STORE", tmp_path / "partitions")
+
+
+def test_history_overrides_defaults_and_unknown_kinds_fall_back(capsys):
+    fetch_plan.log("census", "ytd_hs6", "202401", 2_000_000, 3.0)
+    fetch_plan.log("census", "ytd_hs6", "202402", 4_000_000, 5.0)
+    fetch_plan.report("t", [fetch_plan.Request("census", "ytd_hs6", "202403", cached=False),
+                            fetch_plan.Request("comtrade", "bulk", "2024", cached=True)])
+    out = capsys.readouterr().out
+    assert "census/ytd_hs6: ~3.0 MB, ~4.0 s per request (median of 2 logged)" in out
+    assert "comtrade/bulk: ~1.0 MB, ~5.0 s per request (default, no history)" in out
+
+
+def test_totals_leave_out_skipped_requests_and_divide_by_workers(capsys):
+    plan = [fetch_plan.Request("census", "ytd_hs6", "export YTD 202301", cached=True, sleep=0.5, skip=True),
+            fetch_plan.Request("census", "ytd_hs6", "export YTD 202501", cached=True, sleep=0.5, workers=2),
+            fetch_plan.Request("census", "ytd_hs6", "import YTD 202501", cached=False, sleep=0.5, workers=2),
+            fetch_plan.Request("comext", "monthly", "steel batch 1", cached=False, sleep=0.4, workers=4)]
+    nbytes, seconds = fetch_plan.report("t", plan)
+    assert nbytes == 45e6 + 45e6 + 0.2e6
+    assert seconds == pytest.approx(2 * (40.0 + 0.5) / 2 + (2.0 + 0.4) / 4)
+    out = capsys.readouterr().out
+    assert "3 requests (1 cached, 2 to fetch), 1 skipped" in out
+    assert "census/ytd_hs6: ~45.0 MB, ~40.0 s per request (default, no history, 2 in parallel)" in out
+
+
+def test_us_plan_skips_stored_years_before_the_refetch_window():
+    import fetch_us_trade_raw as us
+    rows = pd.DataFrame({"sector": ["aluminum_76"], "partner_id": [1], "primaryValue": [1]})
+    old, recent = us.START_YEAR, us.END_YEAR
+    partitions.write(us.PARTNER_DATASET, "Export", str(old), rows)
+    partitions.write(us.PARTNER_DATASET, "Export", str(recent), rows)
+
+    plan = {r.key: r for r in us.plan()}
+    assert plan[f"{old} Export"].skip and not plan[f"{old} Import"].skip
+    assert plan[f"{recent} Export"].cached and not plan[f"{recent} Export"].skip
+    assert not plan[f"{recent} Import"].cached
+
+
+def _store(months):
+    rows = pd.DataFrame({"sector": ["aluminum_76"], "partner_id": [1], "value_eur": [1], "quantity_kg": [1]})
+    for m in months:
+        eu.write_month("Import", m, rows)
+
+
+def test_monthly_plan_is_cached_once_the_partitions_hold_the_window():
+    assert not any(r.cached for r in eu.plan(monthly=True))
+
+    last = (date.today().replace(day=1) - timedelta(days=1)).strftime("%Y%m")
+    months = pd.period_range(pd.Period(eu.MONTHLY_FROM, "M"), pd.Period(last, "M"), freq="M")
+    _store(m.strftime("%Y%m") for m in months)
+    plan = eu.plan(monthly=True)
+    assert plan and all(r.cached for r in plan)       # one window, from the last stored month
+    assert {r.key[:4] for r in plan} == {last[:4]}
+
+
+def test_build_plan_skips_the_months_of_stored_years(tmp_path, monkeypatch, capsys):
+    import build_data
+    monkeypatch.setattr(build_data, "OUT", tmp_path / "trade_data.json")
+    rows = pd.DataFrame({"sector": ["aluminum_76"], "hs6": ["760110"], "partner_id": [1],
+                         "value_usd": [1], "quantity_kg": [1]})
+    year = build_data.MONTHLY_FROM[0]
+    for m in range(1, 13):
+        partitions.write("us_partner", "Export", f"{year}{m:02d}", rows)
+
+    plan = build_data.plan()
+    ytd = {r.key: r for r in plan if r.kind == "ytd_hs6"}
+    assert all(ytd[f"export YTD {year}{m:02d}"].skip for m in range(1, 13))
+    assert not any(ytd[f"import YTD {year}{m:02d}"].skip for m in range(1, 13))
+    fetch_plan.report("build_data", plan)
+    assert "12 skipped (stored in data/partitions" in capsys.readouterr().out
+
+
+def _sdmx(batch, lo):
+    return pd.DataFrame({"PARTNER": "US", "PRODUCT": batch[0], "TIME_PERIOD": lo,
+                         "INDICATORS": ["VALUE_IN_EUROS", "QUANTITY_IN_100KG"], "OBS_VALUE": [1000, 2.5]})
+
+
+def test_fetch_monthly_does_not_write_a_year_with_a_failed_batch(monkeypatch):
+    last_year = date.today().year - 1
+    broken = next(iter(eu.SECTORS))
+
+    def fetch_batch(batch, flow_code, freq, lo, hi):
+        if lo.startswith(str(last_year + 1)) and batch == eu._batches(eu.SECTORS[broken])[0]:
+            return None                                   # this year's first batch fails
+        return _sdmx(batch, lo)
+
+    monkeypatch.setattr(eu, "fetch_batch", fetch_batch)
+    monkeypatch.setattr(eu.time, "sleep", lambda s: None)
+
+    written = eu.fetch_monthly(since=f"{last_year}01")
+    assert written == [f"{last_year}01"]
+    assert partitions.periods(eu.MONTHLY_DATASET, "Import") == [f"{last_year}01"]
+    assert eu.monthly_start() == f"{last_year}01"         # the next run resumes there
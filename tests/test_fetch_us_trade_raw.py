@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+import fetch_us_trade_raw as us
+import partitions
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(partitions, "STORE", tmp_path / "partitions")
+    monkeypatch.setattr(us, "OUTDIR", tmp_path / "raw")
+    monkeypatch.setattr(us, "OUT_CSV", tmp_path / "raw" / "partner.csv")
+    monkeypatch.setattr(us, "EU27_CSV", tmp_path / "raw" / "eu27.csv")
+    monkeypatch.setattr(us.time, "sleep", lambda s: None)
+
+
+@pytest.fixture
+def census(monkeypatch):
+    """Fake Census responses; 2020 has no data.  Records every call."""
+    calls = []
+
+    def fetch_year_flow(flow_name, year):
+        calls.append((year, flow_name))
+        if year == 2020:
+            return pd.DataFrame()
+        cfg = us.FLOW_CONFIG[flow_name]
+        return pd.DataFrame({
+            cfg["cmd_col"]: ["760110", "760110", "847130"],
+            "CTY_CODE":     ["1220", "0003", "2010"],
+            "CTY_NAME":     ["CANADA", "EUROPEAN UNION", "MEXICO"],
+            cfg["val_col"]: [str(100 * year), "50", "7"],
+            "AIR_WGT_YR":   ["10", "5", "1"],
+            "VES_WGT_YR":   ["990", "0", "0"],
+        })
+
+    monkeypatch.setattr(us, "fetch_year_flow", fetch_year_flow)
+    return calls
+
+
+def test_backfill_streams_years_into_partitions_and_assemble_rebuilds_the_csvs(census):
+    us.backfill(2019, 2021)
+    assert sorted(census) == [(y, f) for y in (2019, 2020, 2021) for f in ("Export", "Import")]
+    assert partitions.periods(us.PARTNER_DATASET, "Export") == ["2019", "2021"]   # 2020: no data
+
+    us.assemble(2019, 2021)
+    partner = pd.read_csv(us.OUT_CSV)
+    assert partner[["period", "flow", "partnerDesc", "primaryValue", "quantity_kg"]].values.tolist() == [
+        [2019, "Export", "Canada", 201900, 1000], [2019, "Import", "Canada", 201900, 1000],
+        [2021, "Export", "Canada", 202100, 1000], [2021, "Import", "Canada", 202100, 1000]]
+    eu27 = pd.read_csv(us.EU27_CSV, dtype={"hs6": str})
+    assert set(eu27["hs6"]) == {"760110"} and set(eu27["primaryValue"]) == {50}
+
+
+def test_default_run_refetches_recent_and_missing_years_only(census):
+    us.backfill(2019, 2021)
+    census.clear()
+    us.backfill(2019, 2021, refetch_from=2021)
+    assert sorted(census) == [(y, f) for y in (2020, 2021) for f in ("Export", "Import")]
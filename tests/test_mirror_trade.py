@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+import fx
+import mirror_trade
+
+
+@pytest.fixture(autouse=True)
+def flat_rate(monkeypatch):
+    monkeypatch.setattr(fx, "rates_for", lambda periods: pd.Series(1.25, index=periods.index))
+
+
+def test_concordance_maps_both_steel_chapters_onto_one_comext_sector():
+    keys = mirror_trade.key_map()
+    assert keys["72"] == keys["73"] == "steel"
+    conc = mirror_trade.concordance()
+    assert set(conc["scope"]) <= {"exact", "partial", "eu_only"}
+    assert (conc.loc[conc["scope"] == "partial", "cn_code"].str.len() == 8).all()
+
+
+def test_reconcile_sums_raw_keys_and_keeps_months_on_both_sides():
+    RAW = {
+        "72": {"me": {"202401": 100, "202402": 40}, "mew": {"202401": 10, "202402": 4}},
+        "73": {"me": {"202401": 50},                "mew": {"202401": 5}},
+        "76": {"me": {"202401": 80},                "mew": {"202401": 2}},
+    }
+    RAWEU = {"steel": {"202401": [200, 16], "202403": [1, 1]},
+             "alu":   {"202401": [0, 0]}}
+    df = mirror_trade.reconcile(RAW, RAWEU).set_index(["sector", "period"])
+
+    assert list(df.index) == [("alu", "202401"), ("steel", "202401")]   # 202402 / 202403 one-sided
+    steel = df.loc[("steel", "202401")]
+    assert steel["us_exports_usd"] == 150 and steel["us_exports_t"] == 15
+    assert steel["eu_imports_usd"] == 250 and steel["gap_usd"] == 100
+    assert steel["gap_pct"] == pytest.approx(66.7) and steel["gap_t"] == 1
+    assert df.loc[("alu", "202401"), "gap_usd"] == -80
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+import build_data
+import partitions
+import partners
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(partitions, "STORE", tmp_path / "partitions")
+    return tmp_path / "partitions"
+
+
+def month(values):
+    return pd.DataFrame({"sector": ["76", "72", "72"][:len(values)],
+                         "hs6": ["760110", "720110", "720120"][:len(values)],
+                         "value_usd": pd.Series(values, dtype="int64")})
+
+
+def test_write_is_deterministic_and_reports_changes(store):
+    df = month([3, 1, 2])
+    assert partitions.write("us_partner", "Export", "202401", df)
+    body = partitions.path("us_partner", "Export", "202401").read_bytes()
+
+    # same rows in another order: byte-identical file, reported unchanged
+    assert not partitions.write("us_partner", "Export", "202401", df.iloc[::-1])
+    assert partitions.path("us_partner", "Export", "202401").read_bytes() == body
+
+    assert partitions.write("us_partner", "Export", "202401", month([3, 1, 5]))
+
+
+def test_periods_are_sorted_per_flow():
+    for p in ("202403", "202401", "202402"):
+        partitions.write("us_partner", "Export", p, month([1]))
+    partitions.write("us_partner", "Import", "202312", month([1]))
+    assert partitions.periods("us_partner", "Export") == ["202401", "202402", "202403"]
+    assert partitions.periods("us_partner", "Import") == ["202312"]
+    assert partitions.periods("us_partner", "Other") == []
+
+
+def test_read_concatenates_with_a_leading_period_column():
+    partitions.write("us_partner", "Export", "202401", month([1, 2]))
+    partitions.write("us_partner", "Export", "202402", month([3]))
+    df = partitions.read("us_partner", "Export", dtype={"sector": str, "hs6": str})
+    assert list(df.columns) == ["period", "sector", "hs6", "value_usd"]
+    assert df["period"].tolist() == ["202401", "202401", "202402"]
+    assert df["hs6"].tolist() == ["720110", "760110", "760110"]      # written sorted
+    assert df["value_usd"].sum() == 6
+
+
+def test_read_only_some_periods():
+    for p in ("202401", "202402", "202403"):
+        partitions.write("us_partner", "Export", p, month([1]))
+    df = partitions.read("us_partner", "Export", only=["202403", "202401", "209912"])
+    assert df["period"].tolist() == ["202401", "202403"]
+    assert partitions.read("us_partner", "Export", only=[]).empty
+
+
+def test_us_partner_month_rebuilds_the_series_exactly():
+    eu, ca = partners.iso2_id("EU"), partners.iso2_id("CA")
+    prev = {("720110", eu): [100, 10], ("720110", ca): [50, 5], ("760110", ca): [30, 3]}
+    curr = {("720110", eu): [160, 14], ("720110", ca): [40, 7]}       # CA revised down, 760110 gone
+    rows = build_data.partner_month(curr, prev)
+    assert sorted(rows[["hs6", "partner_id", "value_usd", "quantity_kg"]].values.tolist()) == \
+        [["720110", ca, -10, 2], ["720110", eu, 60, 4], ["760110", ca, -30, -3]]
+
+    partitions.write("us_partner", "Export", "202402", rows)
+    eu_d, world_d = build_data.stored_month("export", "202402")
+    assert eu_d["72"] == (60, 4) and eu_d["76"] == (0, 0)
+    assert world_d["72"] == 2 and world_d["76"] == -3                # exports: world kg
+    assert build_data.stored_month("export", "202403") == (None, None)
@@ -0,0 +1,65 @@
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import partners
+
+
+def _reset():
+    for d in (partners._rows, partners._census, partners._comext,
+              partners._comtrade, partners._iso2, partners._iso3):
+        d.clear()
+
+
+@pytest.fixture(autouse=True)
+def table(tmp_path, monkeypatch):
+    path = tmp_path / "partners.csv"
+    shutil.copy(partners.PARTNERS_CSV, path)
+    monkeypatch.setattr(partners, "PARTNERS_CSV", path)
+    monkeypatch.setattr(partners, "ADDED_CSV", tmp_path / "data" / "partners_added.csv")
+    _reset()
+    yield path
+    _reset()
+
+
+def test_known_names_and_codes():
+    ca = partners.iso2_id("CA")
+    assert partners.census_id("canada") == ca
+    assert partners.comext_id("CA") == ca
+    assert partners.comtrade_id("CAN") == ca
+    assert partners.is_aggregate(partners.census_id("CACM"))
+
+
+def test_unlisted_partner_is_registered_once_and_kept(table):
+    reference = table.read_bytes()
+    pid = partners.census_id("Republic of Nowhere")
+    assert pid == max(partners.table().index)
+    assert partners.census_id("REPUBLIC OF NOWHERE") == pid
+    assert table.read_bytes() == reference                # the reference table is never edited
+    assert len(partners.ADDED_CSV.read_text().splitlines()) == 2
+
+    _reset()                                              # a later run
+    assert partners.census_id("Republic of Nowhere") == pid
+    assert not partners.is_aggregate(pid)
+    assert partners.census_id("Terra Nova") == pid + 1
+
+
+def test_an_id_in_both_tables_is_an_error(table):
+    pid = partners.census_id("Republic of Nowhere")
+    with table.open("a") as f:                            # curated without deleting the overlay row
+        f.write(f"{pid},RN,RNW,Republic of Nowhere,REPUBLIC OF NOWHERE,,,0,0\n")
+    _reset()
+    with pytest.raises(ValueError, match=str(pid)):
+        partners.table()
+
+
+def test_unlisted_aggregate_is_flagged():
+    assert partners.is_aggregate(partners.census_id("Asean Plus Three"))
+
+
+def test_concurrent_lookups_register_one_id(table):
+    with ThreadPoolExecutor(8) as pool:
+        ids = set(pool.map(partners.census_id, ["Terra Incognita"] * 64))
+    assert len(ids) == 1
+    assert len(partners.ADDED_CSV.read_text().splitlines()) == 2
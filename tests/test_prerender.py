@@ -0,0 +1,32 @@
+import json
+import re
+
+import prerender
+
+
+def test_embed_is_idempotent_and_reproduces_the_committed_page(tmp_path):
+    data = json.loads(prerender.TRADE_JSON.read_text())
+    page = prerender.INDEX_HTML.read_text(encoding="utf-8")
+    blank = re.sub(r"(<!--pre:(\w+)-->).*?(<!--/pre:\2-->)", r"\1\3", page, flags=re.DOTALL)
+    assert blank != page
+
+    html = tmp_path / "index.html"
+    html.write_text(blank, encoding="utf-8")
+    assert prerender.embed(data, html) is True
+    assert html.read_text(encoding="utf-8") == page          # committed page is in sync with the JSON
+    assert prerender.embed(data, html) is False               # second call: nothing to write
+
+
+def test_embed_leaves_the_page_alone_without_current_year_months(tmp_path):
+    data = json.loads(prerender.TRADE_JSON.read_text())
+    year = str(prerender.YEAR)
+    # RAW {key: {field: {period: v}}} and RAWEU {partner: {sector: {period: v}}} without YEAR
+    old = {name: {a: {b: {p: v for p, v in series.items() if not p.startswith(year)}
+                          for b, series in inner.items()} for a, inner in data[name].items()}
+           for name in ("RAW", "RAWEU")}
+    html = tmp_path / "index.html"
+    html.write_text(prerender.INDEX_HTML.read_text(encoding="utf-8"), encoding="utf-8")
+    before = html.read_bytes()
+    assert prerender.render(old, before.decode()) is None
+    assert prerender.embed(old, html) is False
+    assert html.read_bytes() == before
@@ -0,0 +1,83 @@
+import pandas as pd
+
+import quality
+
+MONTHS = [f"2024{m:02d}" for m in range(1, 13)]
+
+
+def payload(me=None, sectors=("72", "76")):
+    """RAW / RAWEU with steady monthly series: 1000 USD and 1 t per month."""
+    RAW = {k: {"ae":  {"2024": 12_000},
+               "me":  dict(me) if me is not None and k == sectors[0] else {p: 1000 for p in MONTHS},
+               "mew": {p: 1.0 for p in MONTHS}}
+           for k in sectors}
+    RAWEU = {"US": {"steel": {p: [900, 1.0] for p in MONTHS}}}
+    return RAW, RAWEU
+
+
+def checks(findings: pd.DataFrame, severity: str) -> list[str]:
+    return sorted(findings.loc[findings["severity"] == severity, "check"])
+
+
+def test_clean_payload_has_no_findings():
+    findings = quality.check(*payload())
+    assert list(findings.columns) == quality.COLUMNS
+    assert findings.empty
+
+
+def test_month_missing_from_every_sector_is_an_error():
+    RAW, RAWEU = payload()
+    for k in RAW:
+        for f in ("me", "mew"):
+            del RAW[k][f]["202406"]
+    findings = quality.check(RAW, RAWEU)
+    missing = findings[findings["check"] == "missing_period"]
+    assert set(missing["field"]) == {"me", "mew"}
+    assert set(missing["period"]) == {"202406"}
+    assert (missing["severity"] == "error").all()
+
+
+def test_month_missing_from_one_sector_is_a_gap():
+    me = {p: 1000 for p in MONTHS if p != "202406"}
+    findings = quality.check(*payload(me=me))
+    assert checks(findings, "error") == []
+    gap = findings[findings["check"] == "gap"]
+    assert gap[["sector", "field", "period"]].values.tolist() == [["72", "me", "202406"]]
+
+
+def test_non_finite_and_negative_values_are_errors():
+    me = {p: 1000 for p in MONTHS} | {"202403": float("nan"), "202404": -5}
+    findings = quality.check(*payload(me=me))
+    bad = findings[findings["check"] == "non_finite"]
+    assert sorted(bad["period"]) == ["202403", "202404"]
+    assert (bad["severity"] == "error").all()
+
+
+def test_build_notes_become_findings():
+    notes = {"eu_row_missing": [("me", "202405")],
+             "negative_diffs": [("72", "me", "202407", -250)]}
+    findings = quality.check(*payload(), notes)
+    assert checks(findings, "error") == ["eu_row_missing"]
+    assert checks(findings, "warning") == ["negative_diff"]
+    assert findings.loc[findings["check"] == "negative_diff", "detail"].item() == "-250"
+
+
+def test_outlier_and_unit_value_warnings():
+    me = {p: 1000 for p in MONTHS} | {"202408": 50_000}
+    findings = quality.check(*payload(me=me))
+    flagged = findings[findings["period"] == "202408"]
+    assert sorted(flagged["check"]) == ["mom_outlier", "unit_value"]
+    assert checks(findings, "error") == []
+
+
+def test_monthly_sum_against_annual():
+    RAW, RAWEU = payload()
+    RAW["76"]["ae"]["2024"] = 20_000                  # monthly sum 12,000 is 40 % short
+    mismatch = quality.check(RAW, RAWEU).query("check == 'annual_mismatch'")
+    assert mismatch[["sector", "period", "detail"]].values.tolist() == [["76", "2024", "monthly sum -40% vs ae"]]
+
+
+def test_summarize_counts_errors(capsys):
+    notes = {"eu_row_missing": [("me", "202405"), ("mi", "202405")]}
+    assert quality.summarize(quality.check(*payload(), notes)) == 2
+    assert "eu_row_missing" in capsys.readouterr().out
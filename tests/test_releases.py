@@ -0,0 +1,39 @@
+import sys
+
+import pytest
+
+import releases
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(releases, "STATE", tmp_path / "release_check.json")
+    monkeypatch.setattr(releases, "published", lambda: {"census:export": "202405",
+                                                        "census:import": "202405",
+                                                        "comext": "202404"})
+    monkeypatch.setattr(sys, "argv", ["releases.py"])
+
+
+def test_next_month():
+    assert releases._next("202412") == "202501"
+    assert releases._next("202405") == "202406"
+
+
+def test_probe_errors_are_reported_and_never_trigger(monkeypatch, capsys):
+    def broken(*_):
+        raise ValueError("no CENSUS_API_KEY")
+    monkeypatch.setattr(releases, "check_census", broken)
+    monkeypatch.setattr(releases, "check_comext", lambda have, state: None)
+
+    assert releases.check() == {"census:export": None, "census:import": None, "comext": None}
+    out = capsys.readouterr().out
+    assert out.count("probe error") == 2 and out.count("probe failed") == 2
+    releases.main()                                      # returns: nothing due
+
+
+def test_refresh_due_exits_with_its_own_status(monkeypatch):
+    monkeypatch.setattr(releases, "check_census", lambda flow, have, state: None)
+    monkeypatch.setattr(releases, "check_comext", lambda have, state: "new period 202405")
+    with pytest.raises(SystemExit) as exit_:
+        releases.main()
+    assert exit_.value.code == releases.EXIT_DUE != 1
@@ -0,0 +1,21 @@
+import json
+
+import sectors
+
+
+def test_committed_codes_json_is_the_compiled_scope():
+    scope = sectors.compile_scope()
+    assert scope == json.loads(sectors.CODES_JSON.read_text(encoding="utf-8"))
+    assert sectors.CODES_JSON.read_text(encoding="utf-8") == json.dumps(scope, ensure_ascii=False, indent=1) + "\n"
+    assert sectors.SCOPE["source"] == scope["source"]           # loaded from the JSON, not stale
+
+
+def test_lookups_agree_with_the_scope():
+    for code, entry in sectors.SCOPE["cn"].items():
+        assert code in sectors.CN_CODES[entry["sector"]]
+        assert entry["sector"] in sectors.COMEXT_GROUPS[entry["raweu"]]
+        hs = code.ljust(6, "0")[:6]
+        assert sectors.is_cbam(hs)
+        if entry["raw_key"]:
+            assert sectors.hs6_to_key(hs) == entry["raw_key"] and entry["raw_key"] in sectors.RAW_KEYS
+    assert not sectors.is_cbam("847130")
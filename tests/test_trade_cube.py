@@ -0,0 +1,63 @@
+import math
+
+import pandas as pd
+import pytest
+
+import partners
+from trade_cube import DIMS, Cube
+
+CA, MX = partners.iso2_id("CA"), partners.iso2_id("MX")
+
+
+@pytest.fixture
+def cube():
+    df = pd.DataFrame([
+        # reporter, flow, sector, partner, period, value, quantity_t
+        ("US", "Export", "aluminum_76", CA, 2023, 10.0, 1.0),
+        ("US", "Export", "aluminum_76", CA, 2023,  5.0, 0.5),      # same key: adds up
+        ("US", "Export", "aluminum_76", MX, 2023,  7.0, None),
+        ("US", "Export", "cement_2523", CA, 2024,  2.0, 4.0),
+        ("US", "Import", "aluminum_76", MX, 2024,  3.0, 0.3),
+        ("EU", "Import", "aluminum_76", CA, 2024, 11.0, 1.1),
+    ], columns=list(DIMS) + ["value", "quantity_t"])
+    return Cube.from_frame(df, DIMS, ["value", "quantity_t"])
+
+
+def test_duplicate_keys_are_summed(cube):
+    assert cube.query(reporter="US", flow="Export", sector="aluminum_76", partner=CA, period=2023) == 15.0
+    assert cube.query("quantity_t", reporter="US", partner=CA, period=2023) == 1.5
+
+
+def test_total_and_slices(cube):
+    assert cube.query() == 38.0
+    assert cube.query(reporter="US") == 27.0
+    assert cube.query(reporter="US", period=[2023, 2024], flow="Export") == 24.0
+    assert cube.query(sector="cement_2523", period=range(2019, 2025)) == 2.0
+
+
+def test_group_by_keeps_labels_and_partner_names(cube):
+    s = cube.query(by=("partner", "period"), reporter="US")
+    assert s.index.names == ["partner", "period"]
+    assert s.to_dict() == {("Canada", 2023): 15.0, ("Canada", 2024): 2.0,
+                           ("Mexico", 2023): 7.0, ("Mexico", 2024): 3.0}
+
+
+def test_partner_by_name_or_iso2(cube):
+    assert cube.query(partner="Mexico") == cube.query(partner="mx") == cube.query(partner=MX) == 10.0
+    with pytest.raises(KeyError):
+        cube.query(partner="Atlantis")
+
+
+def test_empty_selection_is_nan(cube):
+    assert math.isnan(cube.query("quantity_t", partner=MX, period=2023))
+    assert math.isnan(cube.query(reporter="EU", flow="Export"))
+
+
+def test_unknown_dimension(cube):
+    with pytest.raises(KeyError, match="unknown dimension"):
+        cube.query(country="CA")
+
+
+def test_results_are_memoized(cube):
+    a = cube.query(by="sector", reporter="US")
+    assert cube.query(by="sector", reporter="US") is a
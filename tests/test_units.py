@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import units
+
+
+@pytest.mark.parametrize("cell, expected", [
+    ("123456789012", 123456789012),       # Census integer string, no float round trip
+    ("-42", -42),
+    ("2.5", 3),                           # half-up on the absolute value
+    ("-2.5", -3),
+    (2.4999, 2),
+    (np.int64(7), 7),
+    (None, 0),
+    ("", 0),
+    ("(D)", 0),                           # suppressed cell
+    (float("nan"), 0),
+    (float("inf"), 0),
+])
+def test_parse(cell, expected):
+    assert units.parse(cell) == expected
+
+
+def test_whole_rounds_floats_half_up():
+    out = units.whole(pd.Series([0.5, 1.5, -0.5, 2.49, None]))
+    assert out.dtype == "int64"
+    assert out.tolist() == [1, 2, -1, 2, 0]
+
+
+def test_whole_keeps_large_integers_exact():
+    big = 2**53 + 1                       # not representable as a float
+    out = units.whole(pd.Series([big, 1], dtype="int64"))
+    assert out.tolist() == [big, 1]
+
+
+def test_whole_accepts_nullable_integers():
+    out = units.whole(pd.Series([1, None, 3], dtype="Int64"), scale=10)
+    assert out.dtype == "int64"
+    assert out.tolist() == [10, 0, 30]
+
+
+def test_whole_keeps_the_index():
+    s = pd.Series(["1", "x"], index=[5, 9])
+    assert units.whole(s).index.tolist() == [5, 9]
+
+
+def test_kg_from_100kg():
+    assert units.kg(pd.Series([1.234, 0.005, None])).tolist() == [123, 1, 0]
+
+
+@pytest.mark.parametrize("kg, t", [(0, 0.0), (49, 0.0), (50, 0.1), (1_234_567, 1234.6), (-150, -0.2)])
+def test_tonnes_scalar(kg, t):
+    assert units.tonnes(kg) == t
+
+
+def test_tonnes_series_matches_scalar():
+    kg = pd.Series([0, 49, 50, 1_234_567, -150], dtype="int64")
+    assert units.tonnes(kg).tolist() == [units.tonnes(int(v)) for v in kg]
@@ -0,0 +1,50 @@
+import pytest
+
+import vintages
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(vintages, "STORE",   tmp_path)
+    monkeypatch.setattr(vintages, "OBJECTS", tmp_path / "objects")
+    monkeypatch.setattr(vintages, "RUNS",    tmp_path / "runs")
+
+
+def _objects():
+    return sorted(p.name for p in vintages.OBJECTS.rglob("*.json.gz"))
+
+
+def test_record_and_diff_round_trip():
+    RAW   = {"72": {"me": {"202312": 5, "202401": 10, "202402": 20}}}
+    RAWEU = {"US": {"steel": {"202401": [100, 1.5]}}, "CN": {"steel": {"202401": [7, 0.1]}}}
+    vintages.record(RAW, RAWEU, "r1")
+    assert set(vintages._manifest("r1")) == {"census/72/me/2023", "census/72/me/2024",
+                                             "comext/steel/m/2024", "comext.CN/steel/m/2024"}
+    first = _objects()
+
+    # revise one month, add one, drop a Comext partner
+    RAW2   = {"72": {"me": {"202312": 5, "202401": 12, "202402": 20, "202403": 30}}}
+    RAWEU2 = {"US": {"steel": {"202401": [100, 1.5]}}}
+    vintages.record(RAW2, RAWEU2, "r2")
+    assert vintages.runs() == ["r1", "r2"]
+    assert len(_objects()) == len(first) + 1                  # only the revised 2024 chunk is new
+
+    changes = {(c["series"], c["period"]): c for c in vintages.diff("r1", "r2")}
+    assert set(changes) == {("census/72/me", "202401"), ("census/72/me", "202403"),
+                            ("comext.CN/steel/m", "202401")}
+    rev = changes[("census/72/me", "202401")]
+    assert (rev["old"], rev["new"], rev["delta"], rev["pct"]) == (10, 12, 2, pytest.approx(20))
+    assert changes[("census/72/me", "202403")]["old"] is None
+    assert changes[("comext.CN/steel/m", "202401")]["new"] is None
+
+    for key, digest in vintages._manifest("r2").items():    # every chunk reads back
+        period_values = vintages._get(digest)
+        assert all(p[:4] == key.rsplit("/", 1)[1] for p in period_values)
+
+
+def test_identical_runs_add_no_objects_and_no_changes():
+    RAW = {"76": {"mi": {"202401": 1}}}
+    vintages.record(RAW, {}, "a")
+    n = len(_objects())
+    vintages.record(RAW, {}, "b")
+    assert len(_objects()) == n and vintages.diff("a", "b") == []
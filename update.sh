@@ -15,21 +15,69 @@ if [[ ! -x "$VENV" ]]; then
   exit 1
 fi
 
-echo "=== Step 1: Fetch EU trade data from Eurostat Comext ==="
-"$VENV" python/fetch_eu_trade_raw.py
+echo "=== Step 1: Compile the CBAM code lists and refresh ECB EUR/USD monthly rates ==="
+"$VENV" python/climate_trade.py codes
+"$VENV" python/climate_trade.py fx
 
 echo ""
-echo "=== Step 2: Fetch US trade data from Census Bureau ==="
-"$VENV" python/fetch_us_trade_raw.py
+echo "=== Step 2: Fetch EU trade data from Eurostat Comext ==="
+"$VENV" python/climate_trade.py fetch-eu
+"$VENV" python/climate_trade.py fetch-eu --monthly
 
 echo ""
-echo "=== Step 3: Build docs/data/trade_data.json ==="
-"$VENV" python/build_data.py
+echo "=== Step 3: Convert EU partner data to USD ==="
+"$VENV" python/climate_trade.py process-eu
 
 echo ""
-echo "=== Step 4: Commit and push ==="
+echo "=== Step 4: Fetch US trade data from Census Bureau ==="
+"$VENV" python/climate_trade.py fetch-us
+
+echo ""
+echo "=== Step 5: Embedded emissions by partner, sector and year ==="
+"$VENV" python/climate_trade.py emissions
+
+echo ""
+echo "=== Step 6: Top-k partner rankings by value and tonnage ==="
+"$VENV" python/climate_trade.py rankings
+
+echo ""
+echo "=== Step 7: Chart datasets for every year × sector (changed files only) ==="
+"$VENV" python/climate_trade.py charts
+
+echo ""
+echo "=== Step 8: Build docs/data/trade_data.json ==="
+"$VENV" python/climate_trade.py build
+
+echo ""
+echo "=== Step 9: Mirror-trade reconciliation (Census vs Comext) ==="
+"$VENV" python/climate_trade.py mirror
+
+echo ""
+echo "=== Step 10: CBAM exposure uncertainty bands ==="
+"$VENV" python/climate_trade.py exposure
+
+echo ""
+echo "=== Step 11: Commit and push ==="
 TODAY="$(date +%Y-%m-%d)"
-git add docs/data/trade_data.json
+# outputs a run may not produce (e.g. the FX table while the ECB is unreachable) are skipped
+OUTPUTS=(
+  data/partners_added.csv
+  docs/index.html
+  docs/data/trade_data.json
+  docs/data/cbam_codes.json
+  docs/data/cbam_exposure.json
+  reference/fx_eur_usd_monthly.csv
+  data/vintages
+  data/partitions
+  data/run_metrics.csv
+  data/processed/quality_report.csv
+  data/processed/eu_import_us_share.csv
+  data/charts
+  data/processed/us_exports_hard_to_abate_top3_partners.csv
+)
+for p in "${OUTPUTS[@]}"; do
+  if [[ -e "$p" ]]; then git add "$p"; fi
+done
 git commit -m "data: update trade data ${TODAY}" || echo "(nothing to commit)"
 git push
 